@@ -7,6 +7,7 @@ It packages a directory into a zip file and uploads it to the specified assignme
 
 Usage:
     python submit.py --list-assignments
+    python submit.py --status
     python submit.py --directory ./my-homework --assignment "Assignment 1"
     python submit.py -d ./project -a "Final Project" --server https://aicamp.iiis.co
 
@@ -14,475 +15,5177 @@ Author: AI+ Bootcamp
 """
 
 import argparse
+import asyncio
+import base64
+import collections
+import contextlib
+import cProfile
+import csv
+import functools
 import getpass
+import hashlib
+import heapq
+import http.client
+import io
 import json
 import mimetypes
+import mmap
 import os
+import pstats
+import queue
+import random
+import re
+import shutil
+import socket
+import ssl
+import stat
+import struct
 import sys
+import tempfile
+import threading
+import time
+import tracemalloc
 import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
-from urllib.request import Request, urlopen
-from urllib.error import URLError, HTTPError
-from urllib.parse import urlencode
+from typing import Optional, Dict, Any, List, BinaryIO, Callable, Set, Union
+from urllib.request import getproxies, proxy_bypass
+from urllib.parse import urlencode, urlsplit, unquote
 
 
-class SubmissionClient:
-    """Client for interacting with the homework submission system."""
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+# File data sent over TLS is mapped into memory this much at a time
+MMAP_WINDOW_SIZE = 8 * 1024 * 1024
+
 
-    def __init__(self, server_url: str):
+class MultipartEncoder:
+    """
+    Streaming multipart/form-data body.
+
+    All parts are described up front so the total Content-Length is known
+    before the first byte is sent. File contents are pulled lazily in
+    UPLOAD_CHUNK_SIZE pieces, so memory use does not grow with the size of
+    the uploaded files. Iterating the encoder again restarts the body from
+    the beginning (file objects are rewound to where they started).
+    ConnectionPool sends files given by path without copying them through
+    Python at all (see segments).
+    """
+
+    def __init__(self, fields: Dict[str, str], files: Union[Dict[str, tuple], List[tuple]],
+                 boundary: Optional[str] = None, chunk_size: int = UPLOAD_CHUNK_SIZE):
         """
-        Initialize the submission client.
+        Describe the multipart body.
 
         Args:
-            server_url: Base URL of the server (e.g., https://aicamp.iiis.co)
+            fields: Form fields
+            files: Files to upload {field_name: (filename, source, content_type[, size])},
+                   or a list of (field_name, spec) pairs to send several files
+                   under one field name. source may be bytes, a path, a binary
+                   file object, or an iterable of bytes chunks. A size of None
+                   for an iterable means its length is unknown until it is
+                   exhausted.
+            boundary: Multipart boundary (random if omitted)
+            chunk_size: Read size used when streaming file contents
         """
-        self.server_url = server_url.rstrip('/')
-        self.api_url = f"{self.server_url}/api"
-        self.token: Optional[str] = None
-        self.user_info: Optional[Dict[str, Any]] = None
+        self.boundary = boundary or f'----WebKitFormBoundary{os.urandom(16).hex()}'
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+        self.chunk_size = chunk_size
+        self._parts: List[tuple] = []
 
-    def _make_request(self, url: str, method: str = 'GET', data: Any = None,
-                     headers: Optional[Dict[str, str]] = None, timeout: int = 10) -> Dict[str, Any]:
+        for field_name, field_value in fields.items():
+            part = (f'--{self.boundary}\r\n'
+                    f'Content-Disposition: form-data; name="{field_name}"\r\n\r\n'
+                    f'{field_value}\r\n').encode('utf-8')
+            self._parts.append((part, None, 0, None))
+
+        for field_name, spec in (files.items() if isinstance(files, dict) else files):
+            filename, source, content_type = spec[:3]
+            size = spec[3] if len(spec) > 3 else None
+            start = None
+            if isinstance(source, (bytes, bytearray, memoryview)):
+                size = len(source)
+            elif isinstance(source, (str, os.PathLike)):
+                size = os.path.getsize(source) if size is None else size
+            elif hasattr(source, 'read'):
+                start = source.tell() if source.seekable() else None
+                if size is None:
+                    if start is None:
+                        raise ValueError(f"Size of non-seekable file '{filename}' must be given")
+                    size = os.fstat(source.fileno()).st_size - start
+
+            header = (f'--{self.boundary}\r\n'
+                      f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+                      f'Content-Type: {content_type}\r\n\r\n').encode('utf-8')
+            self._parts.append((header, source, size, start))
+
+        self._tail = f'--{self.boundary}--\r\n'.encode('utf-8')
+
+    @property
+    def replayable(self) -> bool:
+        """Whether iterating the body again produces the same bytes."""
+        for _, source, _, start in self._parts:
+            if source is None or isinstance(source, (bytes, bytearray, memoryview, str, os.PathLike)):
+                continue
+            if hasattr(source, 'read') and start is not None:
+                continue
+            return False
+        return True
+
+    @property
+    def content_length(self) -> Optional[int]:
+        """Total size of the encoded body in bytes, or None if a part is unsized."""
+        total = len(self._tail)
+        for header, source, size, _ in self._parts:
+            if source is not None and size is None:
+                return None
+            total += len(header)
+            if source is not None:
+                total += size + 2
+        return total
+
+    def __iter__(self):
+        for header, source, size, start in self._parts:
+            yield header
+            if source is None:
+                continue
+
+            sent = 0
+            for chunk in self._iter_source(source, start):
+                sent += len(chunk)
+                yield chunk
+            if size is not None and sent != size:
+                raise Exception(f'Upload size mismatch: expected {size} bytes, read {sent}')
+            yield b'\r\n'
+
+        yield self._tail
+
+    def segments(self):
         """
-        Make an HTTP request using urllib.
+        Yield the body as bytes-like objects, with files given by path as
+        FileRegion objects so they can be sent straight from disk.
+        """
+        for header, source, size, start in self._parts:
+            yield header
+            if source is None:
+                continue
+            if isinstance(source, (str, os.PathLike)):
+                yield FileRegion(source, 0, size)
+            elif isinstance(source, (bytes, bytearray, memoryview)):
+                yield source
+            else:
+                sent = 0
+                for chunk in self._iter_source(source, start):
+                    sent += len(chunk)
+                    yield chunk
+                if size is not None and sent != size:
+                    raise Exception(f'Upload size mismatch: expected {size} bytes, read {sent}')
+            yield b'\r\n'
+
+        yield self._tail
+
+    def _iter_source(self, source: Any, start: Optional[int]):
+        """Yield the contents of one file part in chunks."""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            view = memoryview(source)
+            for offset in range(0, len(view), self.chunk_size):
+                yield view[offset:offset + self.chunk_size]
+        elif isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                yield from iter(lambda: f.read(self.chunk_size), b'')
+        elif hasattr(source, 'read'):
+            if start is not None:
+                source.seek(start)
+            yield from iter(lambda: source.read(self.chunk_size), b'')
+        else:
+            for chunk in source:
+                if chunk:
+                    yield chunk
+
 
+class FileRegion:
+    """
+    A byte range of a file, used as a request body (or body segment).
+
+    ConnectionPool hands it to the kernel with sendfile() on plain
+    connections. TLS has to encrypt in user space, so there the file is
+    mapped into memory a window at a time and sent as memoryview slices of
+    the mapping; either way the data is never copied into Python bytes
+    objects, and memory use does not depend on the size of the file.
+    Iterating a region yields its contents in ordinary chunks instead.
+    """
+
+    def __init__(self, path: Union[str, Path], offset: int = 0, size: Optional[int] = None):
+        """
         Args:
-            url: URL to request
-            method: HTTP method (GET, POST, etc.)
-            data: Data to send (will be JSON encoded if dict)
-            headers: HTTP headers
-            timeout: Request timeout in seconds
+            path: File to send
+            offset: Position of the first byte
+            size: Number of bytes (the rest of the file if omitted)
+        """
+        self.path = path
+        self.offset = offset
+        self.size = os.path.getsize(path) - offset if size is None else size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            remaining = self.size
+            while remaining > 0:
+                chunk = f.read(min(UPLOAD_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        if remaining:
+            raise Exception(f'Upload size mismatch: {self.path} is shorter than expected')
+
+    def send(self, sock, limiter: Optional['RateLimiter'] = None):
+        """
+        Write the region to a connected socket.
 
-        Returns:
-            Response data as dictionary
+        Args:
+            sock: Socket to write to
+            limiter: Send in chunks at the rate it allows
 
         Raises:
-            Exception: On request failure
+            Exception: If the file is shorter than the region
+            OSError: On connection failure
         """
-        if headers is None:
-            headers = {}
+        if self.size <= 0:
+            return
+        with open(self.path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < self.offset + self.size:
+                raise Exception(f'Upload size mismatch: {self.path} is shorter than expected')
+            if not isinstance(sock, ssl.SSLSocket):
+                # socket.sendfile() falls back to read()/send() where
+                # os.sendfile() is unavailable
+                step = RATE_CHUNK_SIZE if limiter is not None else self.size
+                for start in range(self.offset, self.offset + self.size, step):
+                    count = min(step, self.offset + self.size - start)
+                    if limiter is not None:
+                        limiter.acquire(count)
+                    started = time.perf_counter()
+                    sent = sock.sendfile(f, start, count)
+                    if sent != count:
+                        raise Exception(f'Upload size mismatch: sent {sent} of {count} bytes')
+                    if limiter is not None:
+                        limiter.sent(count, time.perf_counter() - started)
+                return
+
+            position, end = self.offset, self.offset + self.size
+            while position < end:
+                # Mappings must start at a multiple of the allocation granularity
+                start = position - position % mmap.ALLOCATIONGRANULARITY
+                length = min(MMAP_WINDOW_SIZE, end - start)
+                with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ, offset=start) as mapped:
+                    with memoryview(mapped) as view:
+                        step = RATE_CHUNK_SIZE if limiter is not None else UPLOAD_CHUNK_SIZE
+                        for chunk_start in range(position - start, length, step):
+                            with view[chunk_start:chunk_start + step] as chunk:
+                                if limiter is not None:
+                                    limiter.acquire(len(chunk))
+                                sent_at = time.perf_counter()
+                                sock.sendall(chunk)
+                                if limiter is not None:
+                                    limiter.sent(len(chunk), time.perf_counter() - sent_at)
+                position = start + length
+
+
+class ChunkPipe:
+    """
+    Bounded in-memory pipe between a producer thread and an HTTP upload.
+
+    The producer side looks like a write-only binary file (so it can be
+    handed to zipfile.ZipFile); small writes are coalesced into chunks of
+    UPLOAD_CHUNK_SIZE bytes before being queued. The consumer side is an
+    iterator of those chunks, suitable as a streamed MultipartEncoder source.
+    At most max_chunks chunks are buffered, so a slow network throttles the
+    producer instead of letting memory grow.
+    """
 
-        # Prepare request data
-        request_data = None
-        if data is not None:
-            if isinstance(data, dict):
-                request_data = json.dumps(data).encode('utf-8')
-                headers['Content-Type'] = 'application/json'
-            elif isinstance(data, bytes):
-                request_data = data
-            else:
-                request_data = data.encode('utf-8')
+    _EOF = object()
+
+    def __init__(self, max_chunks: int = 16, chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self._queue: queue.Queue = queue.Queue(maxsize=max_chunks)
+        self._buffer = bytearray()
+        self._written = 0
+        self._aborted = threading.Event()
+
+    # Producer side
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        self._written += len(data)
+        if len(self._buffer) >= self.chunk_size:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+        return len(data)
 
-        # Create request
-        req = Request(url, data=request_data, headers=headers, method=method)
+    def tell(self) -> int:
+        return self._written
 
+    def flush(self):
+        pass
+
+    def close(self):
+        """Signal that the producer has finished writing."""
+        if self._buffer:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+        self._put(self._EOF)
+
+    def fail(self, error: BaseException):
+        """Signal that the producer failed; the consumer re-raises the error."""
         try:
-            with urlopen(req, timeout=timeout) as response:
-                response_data = response.read().decode('utf-8')
-                return json.loads(response_data) if response_data else {}
-        except HTTPError as e:
-            error_body = e.read().decode('utf-8')
+            self._put(error)
+        except Exception:
+            pass
+
+    def _put(self, item: Any):
+        while True:
+            if self._aborted.is_set():
+                raise Exception('Upload aborted')
             try:
-                error_data = json.loads(error_body)
-                raise Exception(error_data.get('error', f'HTTP {e.code}'))
-            except json.JSONDecodeError:
-                raise Exception(f'HTTP {e.code}: {error_body}')
-        except URLError as e:
-            raise Exception(f'Connection error: {e.reason}')
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
 
-    def _multipart_request(self, url: str, fields: Dict[str, str],
-                          files: Dict[str, tuple], headers: Optional[Dict[str, str]] = None,
-                          timeout: int = 60) -> Dict[str, Any]:
-        """
-        Make a multipart/form-data request.
+    # Consumer side
 
-        Args:
-            url: URL to request
-            fields: Form fields
-            files: Files to upload {field_name: (filename, file_data, content_type)}
-            headers: Additional headers
-            timeout: Request timeout in seconds
+    def abort(self):
+        """Stop the producer because the consumer gave up."""
+        self._aborted.set()
 
-        Returns:
-            Response data as dictionary
-        """
-        if headers is None:
-            headers = {}
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is self._EOF:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
 
-        boundary = f'----WebKitFormBoundary{os.urandom(16).hex()}'
-        headers['Content-Type'] = f'multipart/form-data; boundary={boundary}'
 
-        # Build multipart body
-        body = b''
+SESSION_FILE = Path.home() / '.aibootcamp' / 'sessions.json'
 
-        # Add form fields
-        for field_name, field_value in fields.items():
-            body += f'--{boundary}\r\n'.encode('utf-8')
-            body += f'Content-Disposition: form-data; name="{field_name}"\r\n\r\n'.encode('utf-8')
-            body += f'{field_value}\r\n'.encode('utf-8')
+# Saved tokens are not reused when they expire within this many seconds
+SESSION_EXPIRY_MARGIN = 300
 
-        # Add files
-        for field_name, (filename, file_data, content_type) in files.items():
-            body += f'--{boundary}\r\n'.encode('utf-8')
-            body += f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'.encode('utf-8')
-            body += f'Content-Type: {content_type}\r\n\r\n'.encode('utf-8')
-            body += file_data
-            body += b'\r\n'
 
-        # End boundary
-        body += f'--{boundary}--\r\n'.encode('utf-8')
+class APIError(Exception):
+    """Error response from the server; status holds the HTTP status code."""
 
-        # Create request
-        req = Request(url, data=body, headers=headers, method='POST')
+    def __init__(self, message: str, status: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
 
-        try:
-            with urlopen(req, timeout=timeout) as response:
-                response_data = response.read().decode('utf-8')
-                return json.loads(response_data) if response_data else {}
-        except HTTPError as e:
-            error_body = e.read().decode('utf-8')
-            try:
-                error_data = json.loads(error_body)
-                raise Exception(error_data.get('error', f'HTTP {e.code}'))
-            except json.JSONDecodeError:
-                raise Exception(f'HTTP {e.code}: {error_body}')
-        except URLError as e:
-            raise Exception(f'Connection error: {e.reason}')
 
-    def login(self, email: str, password: str) -> bool:
-        """
-        Authenticate with the server and obtain a JWT token.
+class TransportError(Exception):
+    """A request that failed without a response (refused, reset, timed out)."""
 
-        Args:
-            email: Student email address
-            password: Student password
 
-        Returns:
-            True if login successful, False otherwise
-        """
-        try:
-            data = self._make_request(
-                f"{self.api_url}/auth/login",
-                method='POST',
-                data={"email": email, "password": password}
-            )
+def _api_error(status: int, headers: Any, response_data: str) -> APIError:
+    """APIError for an error response, with the server's message if it sent one."""
+    try:
+        retry_after = float(headers.get('Retry-After', ''))
+    except ValueError:
+        retry_after = None
+    try:
+        error_data = json.loads(response_data)
+    except json.JSONDecodeError:
+        return APIError(f'HTTP {status}: {response_data}', status, retry_after)
+    return APIError(error_data.get('error', f'HTTP {status}'), status, retry_after)
 
-            self.token = data.get('token')
-            self.user_info = data.get('user')
-            print(f"✓ Logged in as {self.user_info.get('firstName')} {self.user_info.get('lastName')}")
-            print(f"  Email: {self.user_info.get('email')}")
-            print(f"  Role: {self.user_info.get('role')}")
-            return True
 
-        except Exception as e:
-            error_msg = str(e)
-            if 'Connection error' in error_msg:
-                print(f"✗ Connection error: Unable to reach server at {self.server_url}")
-                print("  Please check your internet connection and server URL")
-            elif 'Invalid credentials' in error_msg or 'Unauthorized' in error_msg:
-                print("✗ Login failed: Invalid email or password")
-            else:
-                print(f"✗ Login failed: {error_msg}")
-            return False
+def jwt_expiry(token: str) -> Optional[float]:
+    """
+    Read the exp claim of a JWT without verifying it.
 
-    def get_headers(self) -> Dict[str, str]:
-        """Get HTTP headers with authentication token."""
-        if not self.token:
-            raise ValueError("Not authenticated. Please login first.")
-        return {"Authorization": f"Bearer {self.token}"}
+    Args:
+        token: Encoded JWT
 
-    def list_assignments(self, show_all: bool = False) -> List[Dict[str, Any]]:
-        """
-        List all assignments.
+    Returns:
+        Expiry as a Unix timestamp, or None if it cannot be read
+    """
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
 
-        Args:
-            show_all: If True, show all assignments including past due
 
-        Returns:
-            List of assignment dictionaries
+def load_saved_session(server_url: str, email: str) -> Optional[Dict[str, Any]]:
+    """
+    Session saved by an earlier login, if its token is not about to expire.
+
+    Args:
+        server_url: Base URL of the server, without a trailing slash
+        email: Student email address
+
+    Returns:
+        {token, user}, or None if there is no usable saved session
+    """
+    session = _load_json_file(SESSION_FILE).get(f"{server_url} {email}")
+    if not session:
+        return None
+    expiry = jwt_expiry(session.get('token', ''))
+    if expiry is None or expiry - time.time() < SESSION_EXPIRY_MARGIN:
+        return None
+    return session
+
+
+def _load_json_file(path: Path) -> Dict[str, Any]:
+    """Read a JSON state file, returning {} if it is missing or corrupt."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json_file(path: Path, data: Dict[str, Any], private: bool = False):
+    """
+    Atomically replace a JSON state file.
+
+    Args:
+        path: File to write
+        data: JSON-serializable data
+        private: Create the file readable by the current user only
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600 if private else 0o666)
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _count_chunks(chunks: Any, counter: List[int]):
+    """Pass an iterable request body through, adding its size to counter[0]."""
+    for chunk in chunks:
+        counter[0] += len(chunk)
+        yield chunk
+
+
+# Rate limited uploads are sent in pieces of this size
+RATE_CHUNK_SIZE = 64 * 1024
+
+# The bucket of a RateLimiter holds this many seconds of data
+RATE_BURST_SECONDS = 0.25
+
+# Adaptive limits never go below this many bytes per second
+RATE_MIN = 16 * 1024
+
+# Adaptive limits change at most this often (seconds), dropping to this
+# fraction of the throughput achieved on congestion and growing by this
+# fraction otherwise
+RATE_ADJUST_INTERVAL = 1.0
+RATE_DECREASE = 0.85
+RATE_INCREASE = 0.1
+
+# The link is saturated when sending blocked for more than this fraction of
+# an interval, or when replies to small requests take this many times the
+# shortest reply time seen, plus RATE_RTT_MARGIN seconds
+RATE_BLOCKED_FRACTION = 0.5
+RATE_RTT_FACTOR = 2.0
+RATE_RTT_MARGIN = 0.05
+
+# Uploads pause for up to this long after a small request starts, to let
+# it through first
+RATE_PRIORITY_HOLD = 0.5
+
+# Socket send buffers of rate limited uploads hold about this many seconds
+# of data, so little is queued outside the limiter's control
+RATE_SNDBUF_SECONDS = 0.1
+
+
+class RateLimiter:
+    """
+    Token bucket shaping upload bytes, shared by all uploads of a pool.
+
+    Bulk request bodies are sent in chunks, each waiting for tokens, so a
+    busy shared uplink is not flooded. Small control requests (logins,
+    assignment lists, JSON calls) are charged for their bytes but never
+    wait, and bulk uploads pause while one has just been sent, so it is not
+    stuck behind a queue of upload data.
+
+    In adaptive mode the rate is lowered to below the throughput actually
+    achieved when the link looks saturated (the socket blocks for most of
+    an interval, or replies to small requests slow down), and raised a
+    little each interval while it is not, up to the configured maximum.
+    """
+
+    def __init__(self, rate: Optional[float] = None, adaptive: bool = False):
+        """
+        Args:
+            rate: Upload limit in bytes per second (None for no limit,
+                  which is only useful in adaptive mode)
+            adaptive: Adjust the rate to the observed link
         """
+        self.max_rate = rate
+        self.rate = rate
+        self.adaptive = adaptive
+        self._tokens = self._burst()
+        self._refilled = time.monotonic()
+        self._cond = threading.Condition()
+        self._control: List[float] = []  # start times of control requests in flight
+        # Adaptive state: bytes sent, time blocked in the socket and start
+        # of the current interval; shortest and smoothed reply times
+        self._window = [0, 0.0, time.monotonic()]
+        self.base_rtt: Optional[float] = None
+        self.rtt: Optional[float] = None
+
+    def _burst(self) -> float:
+        return max(RATE_CHUNK_SIZE, (self.rate or 0) * RATE_BURST_SECONDS)
+
+    def _refill(self, now: float):
+        if self.rate is not None:
+            self._tokens = min(self._burst(), self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def acquire(self, size: int):
+        """Wait until size bytes of a bulk upload may be sent."""
+        with self._cond:
+            while self._control:
+                hold = max(self._control) + RATE_PRIORITY_HOLD - time.monotonic()
+                if hold <= 0:
+                    break
+                self._cond.wait(hold)
+            if self.rate is None:
+                return
+            now = time.monotonic()
+            self._refill(now)
+            # Take the tokens now and sleep off any debt, so waiting
+            # uploads are served in turn
+            self._tokens -= size
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
+
+    def charge(self, size: int):
+        """Account for size bytes of a control request, which are sent at once."""
+        with self._cond:
+            if self.rate is not None:
+                self._refill(time.monotonic())
+                self._tokens -= size
+
+    @contextlib.contextmanager
+    def control(self):
+        """Mark a control request in flight, holding back bulk uploads for a while."""
+        started = time.monotonic()
+        with self._cond:
+            self._control.append(started)
         try:
-            data = self._make_request(
-                f"{self.api_url}/assignments",
-                headers=self.get_headers()
-            )
+            yield
+        finally:
+            with self._cond:
+                self._control.remove(started)
+                self._cond.notify_all()
+
+    def sent(self, size: int, seconds: float):
+        """Record size bulk bytes handed to the socket, which blocked for seconds."""
+        if not self.adaptive:
+            return
+        with self._cond:
+            self._window[0] += size
+            self._window[1] += seconds
+            self._adjust()
+
+    def replied(self, seconds: float):
+        """Record how long the reply to a control request took."""
+        if not self.adaptive or seconds <= 0:
+            return
+        with self._cond:
+            self.base_rtt = seconds if self.base_rtt is None else min(self.base_rtt, seconds)
+            self.rtt = seconds if self.rtt is None else self.rtt + 0.3 * (seconds - self.rtt)
+            self._adjust()
+
+    def _adjust(self):
+        """Lower or raise the rate once per interval (with self._cond held)."""
+        size, blocked, started = self._window
+        now = time.monotonic()
+        elapsed = now - started
+        if elapsed < RATE_ADJUST_INTERVAL:
+            return
+        self._window = [0, 0.0, now]
+        achieved = size / elapsed
+        delayed = self.rtt is not None and self.rtt > self.base_rtt * RATE_RTT_FACTOR + RATE_RTT_MARGIN
+        if size and (blocked > elapsed * RATE_BLOCKED_FRACTION or delayed):
+            self._refill(now)
+            self.rate = max(RATE_MIN, achieved * RATE_DECREASE)
+            # Forget the slow replies, or the next interval backs off again
+            self.rtt = self.base_rtt
+        elif size and self.rate is not None:
+            self._refill(now)
+            self.rate *= 1 + RATE_INCREASE
+            if self.max_rate is not None:
+                self.rate = min(self.rate, self.max_rate)
+
+    def shape(self, sock):
+        """Shrink the send buffer of a socket used for limited uploads."""
+        if self.rate is None:
+            return
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF,
+                            max(RATE_CHUNK_SIZE, int(self.rate * RATE_SNDBUF_SECONDS)))
+        except (OSError, AttributeError):
+            pass
 
-            # Handle both array and object responses
-            assignments = data.get('assignments', data) if isinstance(data, dict) else data
 
-            # Filter out past due assignments unless show_all is True
-            if not show_all:
-                now = datetime.now()
-                active_assignments = []
-                for assignment in assignments:
-                    due_date = datetime.fromisoformat(assignment['dueDate'].replace('Z', '+00:00'))
-                    # Remove timezone info for comparison
-                    due_date_naive = due_date.replace(tzinfo=None)
-                    if due_date_naive > now or assignment.get('allowLateSubmission'):
-                        active_assignments.append(assignment)
-                return active_assignments
-
-            return assignments
+def _throttle_chunks(chunks: Any, limiter: RateLimiter):
+    """Pass an iterable request body through at the rate allowed by limiter."""
+    if hasattr(chunks, 'read'):
+        f = chunks
+        chunks = iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b'')
+    for chunk in chunks:
+        view = memoryview(chunk)
+        for start in range(0, len(view), RATE_CHUNK_SIZE):
+            piece = view[start:start + RATE_CHUNK_SIZE]
+            limiter.acquire(len(piece))
+            started = time.perf_counter()
+            yield piece
+            # The piece has been written when the next one is asked for
+            limiter.sent(len(piece), time.perf_counter() - started)
 
-        except Exception as e:
-            print(f"✗ Error fetching assignments: {e}")
-            return []
 
-    def find_assignment(self, assignment_name: str) -> Optional[Dict[str, Any]]:
+class ConnectionPool:
+    """
+    Thread-safe pool of persistent HTTP/1.1 connections.
+
+    Idle connections are kept per (scheme, host, port) and reused by later
+    requests, so a login, an assignment lookup and an upload share one
+    TCP/TLS handshake. A connection is only ever used by one thread at a
+    time; concurrent requests simply open additional connections. Servers
+    close idle keep-alive connections after a few seconds (Node's default
+    is 5 s), so connections idle longer than max_idle_seconds are dropped,
+    and a request that fails on a reused connection before any response
+    arrives is retried once on a fresh one when its body can be replayed.
+    Proxies from the usual *_proxy environment variables are honoured.
+
+    If observer is set, it is called after each completed request with
+    (method, url, status, bytes sent, bytes received, seconds spent sending,
+    seconds waiting for the response headers after sending). If limiter is
+    set, request bodies other than bytes are sent at the rate it allows and
+    give way to requests with small bodies, see RateLimiter.
+    """
+
+    RETRYABLE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                        ConnectionResetError, ConnectionAbortedError, BrokenPipeError)
+
+    def __init__(self, max_idle_per_host: int = 4, max_idle_seconds: float = 4.0,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        """
+        Args:
+            max_idle_per_host: Idle connections kept per host
+            max_idle_seconds: Idle time after which a connection is not reused
+            ssl_context: TLS settings for https (system defaults if omitted)
+        """
+        self.max_idle_per_host = max_idle_per_host
+        self.max_idle_seconds = max_idle_seconds
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self._idle: Dict[tuple, List[tuple]] = {}
+        self._lock = threading.Lock()
+        self.observer: Optional[Callable[..., None]] = None
+        self.limiter: Optional[RateLimiter] = None
+
+    def _new_connection(self, scheme: str, host: str, port: int,
+                        timeout: float) -> tuple:
+        """Open a connection, through a proxy if one is configured for host."""
+        proxy = getproxies().get(scheme)
+        if proxy and not proxy_bypass(host):
+            proxy_url = urlsplit(proxy if '://' in proxy else f'http://{proxy}')
+            proxy_headers = {}
+            if proxy_url.username:
+                credentials = f'{unquote(proxy_url.username)}:{unquote(proxy_url.password or "")}'
+                proxy_headers['Proxy-Authorization'] = \
+                    'Basic ' + base64.b64encode(credentials.encode('utf-8')).decode('ascii')
+            if scheme == 'https':
+                conn = http.client.HTTPSConnection(proxy_url.hostname, proxy_url.port or 80,
+                                                   timeout=timeout, context=self.ssl_context)
+                conn.set_tunnel(host, port, headers=proxy_headers)
+                return conn, False, {}
+            conn = http.client.HTTPConnection(proxy_url.hostname, proxy_url.port or 80,
+                                              timeout=timeout)
+            return conn, True, proxy_headers
+
+        if scheme == 'https':
+            conn = http.client.HTTPSConnection(host, port, timeout=timeout, context=self.ssl_context)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        return conn, False, {}
+
+    def _checkout(self, key: tuple) -> Optional[tuple]:
+        """Take the most recently used idle connection for key, if still fresh."""
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                entry, last_used = idle.pop()
+                if now - last_used < self.max_idle_seconds:
+                    return entry
+                entry[0].close()
+        return None
+
+    def _checkin(self, key: tuple, entry: tuple):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append((entry, time.monotonic()))
+                return
+        entry[0].close()
+
+    def request(self, method: str, url: str, body: Any = None,
+                headers: Optional[Dict[str, str]] = None, timeout: float = 10,
+                replayable: bool = True,
+                sink: Optional[Callable[[int, http.client.HTTPMessage], BinaryIO]] = None) -> tuple:
         """
-        Find an assignment by name.
+        Send a request and read the whole response.
 
         Args:
-            assignment_name: Name of the assignment to find
+            method: HTTP method
+            url: Absolute http:// or https:// URL
+            body: Request body (bytes, file object, FileRegion,
+                  MultipartEncoder or iterable of bytes); sent with chunked
+                  encoding if no Content-Length is given
+            headers: HTTP headers
+            timeout: Socket timeout in seconds
+            replayable: Whether body can be sent a second time. Bodies that
+                        cannot are always sent on a new connection.
+            sink: Called with the status and headers of a successful (2xx)
+                  response; returns the file to write the body to as it
+                  arrives, instead of returning it. If the transfer fails,
+                  the file holds the part received so far.
 
         Returns:
-            Assignment data if found, None otherwise
+            (status, response headers, response body bytes, or b'' if it
+            was written to the sink)
+
+        Raises:
+            OSError, http.client.HTTPException: On connection failure
         """
-        try:
-            assignments = self.list_assignments(show_all=True)
+        limiter = self.limiter
+        if limiter is None or (body is not None and not isinstance(body, (bytes, bytearray))):
+            return self._request(method, url, body, headers, timeout, replayable, sink)
+        # A control request goes out at once, while uploads wait for it
+        limiter.charge(len(body or b''))
+        with limiter.control():
+            return self._request(method, url, body, headers, timeout, replayable, sink)
+
+    def _request(self, method: str, url: str, body: Any, headers: Optional[Dict[str, str]],
+                 timeout: float, replayable: bool,
+                 sink: Optional[Callable[[int, http.client.HTTPMessage], BinaryIO]]) -> tuple:
+        """Send a request and read the whole response, see request()."""
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or '/'
+        if parts.query:
+            path += f'?{parts.query}'
+        headers = dict(headers or {})
+        limiter = self.limiter
+        bulk = limiter is not None and body is not None and not isinstance(body, (bytes, bytearray))
+
+        entry = self._checkout(key) if replayable else None
+        reused = entry is not None
+        while True:
+            if entry is None:
+                entry = self._new_connection(scheme, parts.hostname, port, timeout)
+            conn, absolute, proxy_headers = entry
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            sent = [0]
+            received = 0
+            request_body = body
+            if self.observer is not None and body is not None and 'Content-Length' not in headers:
+                if isinstance(body, (bytes, bytearray)):
+                    sent[0] = len(body)
+                else:
+                    request_body = _count_chunks(body, sent)
+            try:
+                if bulk:
+                    if conn.sock is None:
+                        conn.connect()
+                    limiter.shape(conn.sock)
+                started = time.perf_counter()
+                if request_body is body and 'Content-Length' in headers and \
+                        (isinstance(body, FileRegion) or hasattr(body, 'segments')):
+                    self._send_segments(conn, method, url if absolute else path,
+                                        {**proxy_headers, **headers}, body, limiter if bulk else None)
+                else:
+                    if bulk:
+                        request_body = _throttle_chunks(request_body, limiter)
+                    conn.request(method, url if absolute else path, body=request_body,
+                                 headers={**proxy_headers, **headers})
+                finished_sending = time.perf_counter()
+                response = conn.getresponse()
+                answered = time.perf_counter()
+                if limiter is not None and not bulk:
+                    limiter.replied(answered - finished_sending)
+                if sink is not None and 200 <= response.status < 300:
+                    data = b''
+                    output = sink(response.status, response.headers)
+                    for block in iter(lambda: response.read(ZIP_READ_SIZE), b''):
+                        output.write(block)
+                        received += len(block)
+                else:
+                    data = response.read()
+                    received = len(data)
+            except self.RETRYABLE_ERRORS:
+                conn.close()
+                if not reused or received:
+                    raise
+                # The server dropped the idle connection; retry on a new one
+                entry, reused = None, False
+                continue
+            except BaseException:
+                conn.close()
+                raise
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(key, entry)
+            if self.observer is not None:
+                self.observer(method, url, response.status,
+                              int(headers.get('Content-Length', sent[0])), received,
+                              finished_sending - started, answered - finished_sending)
+            return response.status, response.headers, data
+
+    @staticmethod
+    def _send_segments(conn: http.client.HTTPConnection, method: str, target: str,
+                       headers: Dict[str, str], body: Any, limiter: Optional[RateLimiter] = None):
+        """Send a request whose body has FileRegion parts, bypassing http.client's copying."""
+        conn.putrequest(method, target)
+        for name, value in headers.items():
+            conn.putheader(name, value)
+        conn.endheaders()
+        for segment in ([body] if isinstance(body, FileRegion) else body.segments()):
+            if isinstance(segment, FileRegion):
+                segment.send(conn.sock, limiter)
+            elif limiter is not None:
+                for chunk in _throttle_chunks([segment], limiter):
+                    conn.send(chunk)
+            else:
+                conn.send(segment)
 
-            # Try exact match first
-            for assignment in assignments:
-                if assignment['title'] == assignment_name:
-                    return assignment
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            for idle in self._idle.values():
+                for entry, _ in idle:
+                    entry[0].close()
+            self._idle.clear()
 
-            # Try case-insensitive match
-            for assignment in assignments:
-                if assignment['title'].lower() == assignment_name.lower():
-                    return assignment
 
-            # Try partial match
-            for assignment in assignments:
-                if assignment_name.lower() in assignment['title'].lower():
-                    print(f"Found similar assignment: {assignment['title']}")
-                    confirm = input("Is this the correct assignment? (y/n): ").strip().lower()
-                    if confirm == 'y':
-                        return assignment
+# Requests the asyncio client keeps in flight at once
+ASYNC_MAX_CONCURRENCY = 8
 
-            print(f"✗ Assignment '{assignment_name}' not found")
-            print("\nAvailable assignments:")
-            for assignment in assignments:
-                due_date = datetime.fromisoformat(assignment['dueDate'].replace('Z', '+00:00'))
-                print(f"  - {assignment['title']} (Due: {due_date.strftime('%Y-%m-%d %H:%M')})")
-            return None
 
-        except Exception as e:
-            print(f"✗ Error fetching assignments: {e}")
-            return None
+class AsyncConnectionPool:
+    """
+    asyncio counterpart of ConnectionPool, for requests with small bodies.
+
+    At most max_connections requests are in flight at a time; the others
+    wait for a free slot. Idle keep-alive connections are reused like in
+    ConnectionPool, including the retry of a request whose reused
+    connection turns out to have been closed by the server. Proxies from
+    the *_proxy environment variables are honoured. A pool belongs to the
+    event loop it is first used in; observer works as in ConnectionPool.
+    """
 
-    def create_submission(self, assignment_id: str, zip_path: str, text_content: str = "") -> bool:
+    RETRYABLE_ERRORS = (asyncio.IncompleteReadError, http.client.BadStatusLine,
+                        ConnectionResetError, ConnectionAbortedError, BrokenPipeError)
+
+    def __init__(self, max_connections: int = ASYNC_MAX_CONCURRENCY,
+                 max_idle_seconds: float = 4.0, ssl_context: Optional[ssl.SSLContext] = None):
         """
-        Submit an assignment with a zip file.
+        Args:
+            max_connections: Requests sent concurrently
+            max_idle_seconds: Idle time after which a connection is not reused
+            ssl_context: TLS settings for https (system defaults if omitted)
+        """
+        self.max_connections = max_connections
+        self.max_idle_seconds = max_idle_seconds
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self._idle: Dict[tuple, List[tuple]] = {}
+        # Created on first use, as before Python 3.10 it binds to the current loop
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.observer: Optional[Callable[..., None]] = None
+
+    async def _new_connection(self, scheme: str, host: str, port: int) -> tuple:
+        """Open a connection, through a proxy if one is configured for host."""
+        tls = self.ssl_context if scheme == 'https' else None
+        proxy = getproxies().get(scheme)
+        if not proxy or proxy_bypass(host):
+            reader, writer = await asyncio.open_connection(host, port, ssl=tls)
+            return reader, writer, False, {}
+
+        proxy_url = urlsplit(proxy if '://' in proxy else f'http://{proxy}')
+        proxy_headers = {}
+        if proxy_url.username:
+            credentials = f'{unquote(proxy_url.username)}:{unquote(proxy_url.password or "")}'
+            proxy_headers['Proxy-Authorization'] = \
+                'Basic ' + base64.b64encode(credentials.encode('utf-8')).decode('ascii')
+        if scheme == 'https':
+            reader, writer = await asyncio.open_connection(proxy_url.hostname, proxy_url.port or 80)
+            connect = [f'CONNECT {host}:{port} HTTP/1.1', f'Host: {host}:{port}']
+            connect += [f'{name}: {value}' for name, value in proxy_headers.items()]
+            writer.write(('\r\n'.join(connect) + '\r\n\r\n').encode('latin-1'))
+            status, headers, _ = await self._read_response(reader, 'CONNECT')
+            if status != 200:
+                writer.close()
+                raise OSError(f'Tunnel connection failed: {status}')
+            # Python 3.7 has no StreamWriter.start_tls, so reopen on the tunnelled socket
+            sock = writer.get_extra_info('socket').dup()
+            writer.close()
+            reader, writer = await asyncio.open_connection(sock=sock, ssl=tls, server_hostname=host)
+            return reader, writer, False, {}
+        reader, writer = await asyncio.open_connection(proxy_url.hostname, proxy_url.port or 80)
+        return reader, writer, True, proxy_headers
+
+    def _checkout(self, key: tuple) -> Optional[tuple]:
+        """Take the most recently used idle connection for key, if still fresh."""
+        now = time.monotonic()
+        idle = self._idle.get(key, [])
+        while idle:
+            entry, last_used = idle.pop()
+            if now - last_used < self.max_idle_seconds and not entry[0].at_eof():
+                return entry
+            entry[1].close()
+        return None
+
+    def _checkin(self, key: tuple, entry: tuple):
+        idle = self._idle.setdefault(key, [])
+        if len(idle) < self.max_connections:
+            idle.append((entry, time.monotonic()))
+        else:
+            entry[1].close()
+
+    async def request(self, method: str, url: str, body: Optional[bytes] = None,
+                      headers: Optional[Dict[str, str]] = None, timeout: float = 10) -> tuple:
+        """
+        Send a request and read the whole response.
 
         Args:
-            assignment_id: ID of the assignment
-            zip_path: Path to the zip file to upload
-            text_content: Optional text content/comments
+            method: HTTP method
+            url: Absolute http:// or https:// URL
+            body: Request body
+            headers: HTTP headers
+            timeout: Seconds allowed for the whole exchange, waiting for a
+                     free slot not included
 
         Returns:
-            True if submission successful, False otherwise
+            (status, response headers, response body bytes)
+
+        Raises:
+            OSError, EOFError, asyncio.TimeoutError, asyncio.LimitOverrunError,
+            http.client.HTTPException: On connection failure
         """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+        async with self._slots:
+            return await asyncio.wait_for(self._request(method, url, body, headers or {}), timeout)
+
+    async def _request(self, method: str, url: str, body: Optional[bytes],
+                       headers: Dict[str, str]) -> tuple:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or '/'
+        if parts.query:
+            path += f'?{parts.query}'
+        default_port = port == (443 if scheme == 'https' else 80)
+        headers = {
+            'Host': parts.hostname if default_port else f'{parts.hostname}:{port}',
+            'Accept-Encoding': 'identity',
+            **headers,
+        }
+        if body is not None or method in ('POST', 'PUT', 'PATCH'):
+            headers['Content-Length'] = str(len(body or b''))
+
+        entry = self._checkout(key)
+        reused = entry is not None
+        while True:
+            if entry is None:
+                entry = await self._new_connection(scheme, parts.hostname, port)
+            reader, writer, absolute, proxy_headers = entry
+            lines = [f'{method} {url if absolute else path} HTTP/1.1']
+            lines += [f'{name}: {value}' for name, value in {**proxy_headers, **headers}.items()]
+            try:
+                started = time.perf_counter()
+                writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (body or b''))
+                await writer.drain()
+                finished_sending = time.perf_counter()
+                status, response_headers, data = await self._read_response(reader, method)
+                answered = time.perf_counter()
+            except self.RETRYABLE_ERRORS:
+                writer.close()
+                if not reused:
+                    raise
+                # The server dropped the idle connection; retry on a new one
+                entry, reused = None, False
+                continue
+            except BaseException:
+                writer.close()
+                raise
+
+            if self._will_close(response_headers):
+                writer.close()
+            else:
+                self._checkin(key, entry)
+            if self.observer is not None:
+                # Time to the first response byte is not measured separately here
+                self.observer(method, url, status, len(body or b''), len(data),
+                              finished_sending - started, answered - finished_sending)
+            return status, response_headers, data
+
+    @staticmethod
+    def _will_close(headers: http.client.HTTPMessage) -> bool:
+        connection = headers.get('Connection', '').lower()
+        framed = 'Content-Length' in headers or 'chunked' in headers.get('Transfer-Encoding', '').lower()
+        return 'close' in connection or not framed
+
+    @staticmethod
+    async def _read_response(reader: asyncio.StreamReader, method: str) -> tuple:
+        """Read one response: (status, headers, body)."""
+        head = await reader.readuntil(b'\r\n\r\n')
+        status_line, _, header_block = head.partition(b'\r\n')
         try:
-            # Read the zip file
-            with open(zip_path, 'rb') as f:
-                file_data = f.read()
+            version, status, _ = (status_line.decode('latin-1') + ' ').split(' ', 2)
+            status = int(status)
+        except ValueError:
+            raise http.client.BadStatusLine(status_line.decode('latin-1', 'replace'))
+        if not version.startswith('HTTP/'):
+            raise http.client.BadStatusLine(status_line.decode('latin-1', 'replace'))
+        headers = http.client.parse_headers(io.BytesIO(header_block))
+
+        if method in ('HEAD', 'CONNECT') or status in (204, 304) or 100 <= status < 200:
+            return status, headers, b''
+        if 'chunked' in headers.get('Transfer-Encoding', '').lower():
+            chunks = []
+            while True:
+                line = await reader.readuntil(b'\r\n')
+                try:
+                    size = int(line.split(b';')[0], 16)
+                except ValueError:
+                    raise http.client.IncompleteRead(b''.join(chunks))
+                if size == 0:
+                    while await reader.readuntil(b'\r\n') != b'\r\n':
+                        pass
+                    return status, headers, b''.join(chunks)
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+        if 'Content-Length' in headers:
+            return status, headers, await reader.readexactly(int(headers['Content-Length']))
+        return status, headers, await reader.read()
+
+    async def close(self):
+        """Close all idle connections."""
+        for idle in self._idle.values():
+            for entry, _ in idle:
+                entry[1].close()
+        self._idle.clear()
+        # The pool may be used again from another event loop
+        self._slots = None
+
+
+# Server limit on the size of each uploaded file (multer's MAX_FILE_SIZE).
+# multer also takes at most 10 files per request, which split archives stay
+# within by sending their volumes one request each (see submit_parts).
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+
+# Files and downloaded bodies are read in blocks of this size
+ZIP_READ_SIZE = 1024 * 1024
+
+# Volumes of a split archive uploaded at the same time
+UPLOAD_WORKERS = 4
+
+# Statuses worth retrying: timeouts, rate limiting and an overloaded server
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+# Upload timeouts allow this many times the expected transfer time, on top
+# of a fixed allowance for the server to store the files and reply
+UPLOAD_BASE_TIMEOUT = 30
+UPLOAD_TIMEOUT_FACTOR = 4
+UPLOAD_MAX_TIMEOUT = 900
+
+# Throughput assumed before the first upload has been measured (1 Mbit/s)
+ASSUMED_UPLOAD_RATE = 128 * 1024
+
+# Resumable uploads send chunks of about this many seconds each
+RESUMABLE_CHUNK_SECONDS = 5
+RESUMABLE_MIN_CHUNK = 256 * 1024
+RESUMABLE_MAX_CHUNK = 8 * 1024 * 1024
+
+# Smaller archives are always sent as one multipart request
+RESUMABLE_MIN_SIZE = 1024 * 1024
+
+UPLOADS_FILE = Path.home() / '.aibootcamp' / 'uploads.json'
+
+# Unfinished uploads older than this are not resumed
+UPLOAD_STATE_TTL = 24 * 3600
+
+# Which optional endpoints each server has, so one found missing is not
+# tried again on every run, only once this many seconds have passed
+FEATURES_FILE = Path.home() / '.aibootcamp' / 'features.json'
+FEATURES_TTL = 24 * 3600
+
+# Submissions requested per page when listing all submissions to an assignment
+DOWNLOAD_PAGE_SIZE = 100
+
+# Record of downloaded attachments, kept in the download directory
+DOWNLOAD_STATE_FILE = '.downloads.json'
+
+# Suffix of attachments still being downloaded
+PARTIAL_SUFFIX = '.part'
+
+
+class RetryPolicy:
+    """
+    Retry transient failures with exponential backoff and full jitter.
 
-            filename = os.path.basename(zip_path)
+    Attempt n waits a random time between 0 and min(max_delay,
+    base_delay * 2**(n-1)) seconds, so clients that failed together during a
+    deadline rush do not come back together. A Retry-After sent by the
+    server is honoured as a lower bound.
+    """
 
-            # Prepare multipart form data
-            fields = {
-                'assignmentId': assignment_id,
-                'textContent': text_content,
-                'status': 'submitted'
-            }
+    def __init__(self, retries: int = 5, base_delay: float = 1.0, max_delay: float = 30.0):
+        """
+        Args:
+            retries: Retries after the first attempt (0 disables retrying)
+            base_delay: Upper bound of the first delay in seconds
+            max_delay: Upper bound of any delay in seconds
+        """
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @staticmethod
+    def is_transient(error: BaseException) -> bool:
+        """Whether a failed request may succeed if repeated."""
+        if isinstance(error, APIError):
+            return error.status in RETRYABLE_STATUSES
+        return isinstance(error, TransportError)
+
+    def delay(self, attempt: int, error: BaseException) -> float:
+        """Seconds to wait before retry number attempt (1-based), saying why."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if isinstance(error, APIError) and error.retry_after:
+            delay = max(delay, error.retry_after)
+        print(f"Warning: {error}; retrying in {delay:.1f}s (retry {attempt} of {self.retries})")
+        return delay
+
+    def wait(self, attempt: int, error: BaseException):
+        """Sleep before retry number attempt (1-based), saying why."""
+        time.sleep(self.delay(attempt, error))
+
+    def call(self, operation: Callable[[], Any]) -> Any:
+        """
+        Run operation, repeating it while it fails transiently.
 
-            files = {
-                'files': (filename, file_data, 'application/zip')
-            }
+        Raises:
+            Exception: The last error, once retries are used up or if the
+                       error is not transient
+        """
+        attempt = 0
+        while True:
+            try:
+                return operation()
+            except Exception as e:
+                if attempt >= self.retries or not self.is_transient(e):
+                    raise
+                attempt += 1
+                self.wait(attempt, e)
+
+    async def call_async(self, operation: Callable[[], Any]) -> Any:
+        """Like call, for an operation returning an awaitable; waits without blocking the loop."""
+        attempt = 0
+        while True:
+            try:
+                return await operation()
+            except Exception as e:
+                if attempt >= self.retries or not self.is_transient(e):
+                    raise
+                attempt += 1
+                await asyncio.sleep(self.delay(attempt, e))
 
-            print(f"Uploading submission...")
-            data = self._multipart_request(
-                f"{self.api_url}/submissions",
-                fields=fields,
-                files=files,
-                headers=self.get_headers()
-            )
 
-            print(f"✓ Submission successful!")
-            print(f"  Submission ID: {data['id']}")
-            print(f"  Status: {data['status']}")
-            if data.get('submittedAt'):
-                submitted_at = datetime.fromisoformat(data['submittedAt'].replace('Z', '+00:00'))
-                print(f"  Submitted at: {submitted_at.strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"  Attachments: {len(data.get('attachments', []))} file(s)")
-            return True
+class ThroughputEstimator:
+    """
+    Smoothed estimate of upload throughput, used to size timeouts and chunks.
 
-        except Exception as e:
-            print(f"✗ Submission error: {e}")
-            return False
+    Samples are (bytes, seconds) of completed uploads, server processing
+    included; small transfers say more about latency than bandwidth and are
+    ignored.
+    """
 
+    MIN_SAMPLE_SIZE = 64 * 1024
 
-def create_zip_archive(directory: str, output_path: str, exclude_patterns: list = None) -> bool:
-    """
-    Create a zip archive from a directory.
+    def __init__(self, rate: Optional[float] = None, smoothing: float = 0.5):
+        """
+        Args:
+            rate: Initial estimate in bytes per second (ASSUMED_UPLOAD_RATE
+                  until something has been measured)
+            smoothing: Weight of each new sample
+        """
+        self.rate = rate
+        self.smoothing = smoothing
+
+    def record(self, size: int, seconds: float):
+        """Add a completed transfer of size bytes."""
+        if size < self.MIN_SAMPLE_SIZE or seconds <= 0:
+            return
+        sample = size / seconds
+        if self.rate is None:
+            self.rate = sample
+        else:
+            self.rate += self.smoothing * (sample - self.rate)
 
-    Args:
-        directory: Directory to zip
-        output_path: Path for the output zip file
-        exclude_patterns: List of patterns to exclude
+    def timeout(self, size: int) -> float:
+        """Socket timeout for a request that uploads size bytes."""
+        rate = self.rate or ASSUMED_UPLOAD_RATE
+        return min(UPLOAD_MAX_TIMEOUT, UPLOAD_BASE_TIMEOUT + UPLOAD_TIMEOUT_FACTOR * size / rate)
 
-    Returns:
-        True if successful, False otherwise
-    """
-    if exclude_patterns is None:
-        exclude_patterns = [
-            '__pycache__', '*.pyc', '*.pyo', '.git', '.gitignore',
-            '.DS_Store', 'node_modules', '.env', 'venv', '.venv',
-            '*.egg-info', '.pytest_cache', '.coverage'
-        ]
+    def chunk_size(self) -> int:
+        """Resumable chunk size that takes about RESUMABLE_CHUNK_SECONDS to send."""
+        size = int((self.rate or ASSUMED_UPLOAD_RATE) * RESUMABLE_CHUNK_SECONDS)
+        return max(RESUMABLE_MIN_CHUNK, min(RESUMABLE_MAX_CHUNK, size))
 
-    try:
-        directory_path = Path(directory).resolve()
-        if not directory_path.exists():
-            print(f"✗ Directory not found: {directory}")
-            return False
 
-        if not directory_path.is_dir():
-            print(f"✗ Path is not a directory: {directory}")
-            return False
+def file_sha256(path: Union[str, Path]) -> str:
+    """Hex SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
 
-        print(f"Creating zip archive from: {directory_path}")
 
-        file_count = 0
-        total_size = 0
+def safe_filename(name: str) -> str:
+    """A name from the server made safe to use as a single path component."""
+    name = re.sub(r'[\x00-\x1f<>:"/\\|?*]', '_', name).strip().lstrip('.')
+    return name or 'unnamed'
 
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, dirs, files in os.walk(directory_path):
-                # Filter out excluded directories
-                dirs[:] = [d for d in dirs if not any(
-                    Path(d).match(pattern) for pattern in exclude_patterns
-                )]
 
-                for file in files:
-                    # Skip excluded files
-                    if any(Path(file).match(pattern) for pattern in exclude_patterns):
-                        continue
+class DownloadStats:
+    """Counts of what a bulk download did, updated by its worker threads."""
 
-                    file_path = Path(root) / file
-                    arcname = file_path.relative_to(directory_path.parent)
+    def __init__(self):
+        self.submissions = 0
+        self.downloaded = 0
+        self.resumed = 0  # downloads that continued a partial file
+        self.skipped = 0  # attachments already present
+        self.bytes = 0
+        self.failed: List[tuple] = []  # (path, error)
+        self._lock = threading.Lock()
 
-                    zipf.write(file_path, arcname)
-                    file_count += 1
-                    total_size += file_path.stat().st_size
+    def add(self, outcome: str, size: int = 0):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            self.bytes += size
 
-        zip_size = Path(output_path).stat().st_size
-        print(f"✓ Zip archive created: {output_path}")
-        print(f"  Files: {file_count}")
-        print(f"  Original size: {total_size / 1024:.1f} KB")
-        print(f"  Compressed size: {zip_size / 1024:.1f} KB")
-        if total_size > 0:
-            print(f"  Compression ratio: {(1 - zip_size/total_size)*100:.1f}%")
+    def fail(self, path: Path, error: BaseException):
+        with self._lock:
+            self.failed.append((path, error))
+
+
+CATALOG_FILE = Path.home() / '.aibootcamp' / 'assignments.json'
+
+# Seconds a cached assignment list is trusted before it is revalidated
+CATALOG_TTL = 300
 
-        return True
 
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp from the API (which uses a 'Z' suffix)."""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def normalize_title(title: str) -> str:
+    """Case- and whitespace-insensitive form of an assignment title."""
+    return ' '.join(title.split()).casefold()
+
+
+class AssignmentCatalog:
+    """
+    Indexed snapshot of the server's assignment list.
+
+    Due dates are parsed once, and assignments are indexed by ID, exact
+    title and normalized title, so lookups do not rescan the list. The
+    catalog also carries the validators (ETag, Last-Modified) and fetch
+    time used to revalidate it against the server.
+    """
+
+    def __init__(self, assignments: List[Dict[str, Any]], etag: Optional[str] = None,
+                 last_modified: Optional[str] = None, fetched_at: float = 0.0):
+        self.assignments = assignments
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.due_dates = {a['id']: parse_timestamp(a['dueDate']) for a in assignments}
+        self.by_id = {a['id']: a for a in assignments}
+        self.by_title: Dict[str, Dict[str, Any]] = {}
+        self.by_normalized_title: Dict[str, Dict[str, Any]] = {}
+        for assignment in assignments:
+            self.by_title.setdefault(assignment['title'], assignment)
+            self.by_normalized_title.setdefault(normalize_title(assignment['title']), assignment)
+
+    def due_date(self, assignment: Dict[str, Any]) -> datetime:
+        """Parsed due date of an assignment in the catalog."""
+        return self.due_dates[assignment['id']]
+
+    def active(self) -> List[Dict[str, Any]]:
+        """Assignments not yet due, or accepting late submissions."""
+        now = datetime.now()
+        return [
+            a for a in self.assignments
+            # Remove timezone info for comparison
+            if self.due_dates[a['id']].replace(tzinfo=None) > now or a.get('allowLateSubmission')
+        ]
+
+    def lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        """Find an assignment by exact title, normalized title or ID."""
+        return (self.by_title.get(name)
+                or self.by_normalized_title.get(normalize_title(name))
+                or self.by_id.get(name))
+
+    def similar(self, name: str) -> List[Dict[str, Any]]:
+        """Assignments whose normalized title contains the normalized name."""
+        needle = normalize_title(name)
+        return [a for a in self.assignments if needle in normalize_title(a['title'])]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'assignments': self.assignments,
+            'etag': self.etag,
+            'lastModified': self.last_modified,
+            'fetchedAt': self.fetched_at,
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> 'AssignmentCatalog':
+        return cls(data['assignments'], data.get('etag'), data.get('lastModified'),
+                   data.get('fetchedAt', 0.0))
+
+
+ENDPOINTS_FILE = Path.home() / '.aibootcamp' / 'endpoints.json'
+
+# Seconds the measured round-trip time and health of an endpoint are trusted
+ENDPOINT_TTL = 600
+
+# Seconds an endpoint probe may take
+ENDPOINT_PROBE_TIMEOUT = 5
+
+# Endpoints are probed with an unauthenticated GET of this API route, which
+# the server answers with a JSON error. /health would not do: in the
+# monolithic deployment nginx serves the web app's index.html for it, even
+# when the API server behind it is down.
+ENDPOINT_PROBE_PATH = '/api/auth/me'
+
+# Statuses after which requests move to another endpoint: the ingress or
+# proxy in front of the server is in trouble
+FAILOVER_STATUSES = {502, 503, 504}
+
+
+def server_urls(value: Union[str, List[str]]) -> List[str]:
+    """Base URLs from a --server value or config entry (a URL, comma-separated URLs or a list)."""
+    urls: List[str] = []
+    for item in (value.split(',') if isinstance(value, str) else value):
+        url = item.strip().rstrip('/')
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+class EndpointSelector:
+    """
+    Several base URLs of the same server, such as its ingress endpoints.
+
+    Before the first request the endpoints are probed concurrently with
+    GET ENDPOINT_PROBE_PATH, unless ENDPOINTS_FILE has results younger than
+    ENDPOINT_TTL, and requests go to the healthy one with the shortest
+    round-trip time. When it fails (no connection, or a status in
+    FAILOVER_STATUSES) they move to the next best endpoint that has not
+    failed yet, and the failure is recorded so later runs avoid it until
+    it is probed again. A single URL is used without probing.
+    """
+
+    def __init__(self, urls: List[str]):
+        """
+        Args:
+            urls: Base URLs without trailing slashes; the first is used
+                  when no endpoint answers
+        """
+        self.urls = urls
+        self.active: Optional[str] = urls[0] if len(urls) == 1 else None
+        self.failed: Set[str] = set()
+        self.rtts: Dict[str, Optional[float]] = {}
+        self._lock = threading.Lock()
+
+    def _base(self, url: str) -> Optional[str]:
+        for base in self.urls:
+            if url == base or url.startswith(base + '/'):
+                return base
+        return None
+
+    def route(self, url: str, pool: ConnectionPool) -> str:
+        """Move a URL of any endpoint to the active one, choosing it first if needed."""
+        if self.active is None:
+            with self._lock:
+                if self.active is None:
+                    self._select(pool)
+        base = self._base(url)
+        return url if base is None else self.active + url[len(base):]
+
+    @staticmethod
+    def probe(url: str, pool: ConnectionPool) -> Dict[str, Any]:
+        """Time GET ENDPOINT_PROBE_PATH on one endpoint; it is healthy if the API answers with JSON."""
+        started = time.perf_counter()
+        try:
+            status, headers, body = pool.request('GET', f'{url}{ENDPOINT_PROBE_PATH}',
+                                                 timeout=ENDPOINT_PROBE_TIMEOUT)
+        except (OSError, http.client.HTTPException):
+            status, headers, body = None, {}, b''
+        # The expected answer is 401; a proxy error or the web app is not the API
+        healthy = status is not None and status < 500 and 'json' in (headers.get('Content-Type') or '')
+        if healthy:
+            try:
+                json.loads(body.decode('utf-8'))
+            except ValueError:
+                healthy = False
+        return {'rtt': time.perf_counter() - started if healthy else None,
+                'healthy': healthy, 'checkedAt': time.time()}
+
+    def _select(self, pool: ConnectionPool):
+        now = time.time()
+        cached = _load_json_file(ENDPOINTS_FILE)
+        results = {url: cached[url] for url in self.urls if isinstance(cached.get(url), dict)
+                   and now - cached[url].get('checkedAt', 0) < ENDPOINT_TTL}
+        # Probe the endpoints without recent results, or all of them if
+        # none of the recent ones was healthy
+        stale = [url for url in self.urls if url not in results]
+        if not any(result.get('healthy') for result in results.values()):
+            stale = self.urls
+        if stale:
+            with ThreadPoolExecutor(max_workers=len(stale)) as executor:
+                results.update(zip(stale, executor.map(lambda url: self.probe(url, pool), stale)))
+            self._record({url: results[url] for url in stale})
+
+        self.rtts = {url: results[url]['rtt'] if results[url].get('healthy') else None
+                     for url in self.urls}
+        self.active = self._best() or self.urls[0]
+        if self.rtts[self.active] is None:
+            print(f"Warning: No server endpoint answered; trying {self.active}")
+        elif stale:
+            print(f"Using {self.active} ({self.rtts[self.active] * 1000:.0f} ms, "
+                  f"fastest of {len(self.urls)} endpoints)")
+
+    def _best(self) -> Optional[str]:
+        """The healthy endpoint with the shortest round-trip time that has not failed."""
+        healthy = [url for url in self.urls if url not in self.failed and self.rtts.get(url) is not None]
+        return min(healthy, key=lambda url: self.rtts[url]) if healthy else None
+
+    @staticmethod
+    def _record(results: Dict[str, Dict[str, Any]]):
+        cached = _load_json_file(ENDPOINTS_FILE)
+        cached.update(results)
+        try:
+            _write_json_file(ENDPOINTS_FILE, cached)
+        except OSError:
+            pass
+
+    def fail_over(self, url: str, error: BaseException) -> bool:
+        """
+        Stop using the endpoint a failed request was sent to.
+
+        Args:
+            url: URL the request was sent to
+            error: What went wrong
+
+        Returns:
+            True if requests now go to another endpoint
+        """
+        base = self._base(url)
+        with self._lock:
+            if base is None or self.active is None:
+                return False
+            if base != self.active:
+                # Another request has moved on already
+                return base in self.failed
+            self.failed.add(base)
+            candidates = [url for url in self.urls if url not in self.failed]
+            if not candidates:
+                return False
+            self.active = self._best() or candidates[0]
+        self._record({base: {'rtt': None, 'healthy': False, 'checkedAt': time.time()}})
+        print(f"Warning: {base} failed ({error}); switching to {self.active}")
+        return True
+
+
+class SubmissionClient:
+    """Client for interacting with the homework submission system."""
+
+    # Serializes updates of UPLOADS_FILE between upload threads and clients
+    _uploads_lock = threading.Lock()
+    # Serializes updates of FEATURES_FILE
+    _features_lock = threading.Lock()
+
+    def __init__(self, server_url: Union[str, List[str]], pool: Optional[ConnectionPool] = None,
+                 password_prompt: Optional[Callable[[], str]] = None):
+        """
+        Initialize the submission client.
+
+        Args:
+            server_url: Base URL of the server (e.g., https://aicamp.iiis.co),
+                        or several URLs of the same server to choose from
+                        (see EndpointSelector); saved sessions, caches and
+                        upload state are kept under the first
+            pool: Connection pool to send requests through (a private one
+                  is created if omitted)
+            password_prompt: Called to ask for the password again when a
+                             saved session is rejected by the server
+        """
+        self.endpoints = EndpointSelector(server_urls(server_url))
+        self.server_url = self.endpoints.urls[0]
+        self.api_url = f"{self.server_url}/api"
+        self.token: Optional[str] = None
+        self.user_info: Optional[Dict[str, Any]] = None
+        self.pool = pool or ConnectionPool()
+        self.password_prompt = password_prompt
+        self.email: Optional[str] = None
+        self.save_session = False
+        self._session_restored = False
+        self._catalog: Optional[AssignmentCatalog] = None
+        self.catalog_ttl = CATALOG_TTL
+        self.retry = RetryPolicy()
+        self.throughput = ThroughputEstimator()
+        # Whether the server has resumable uploads and merges deltas; looked
+        # up in FEATURES_FILE, and found out by trying if unknown there
+        self.resumable: Optional[bool] = None
+        self.volume_size = MAX_UPLOAD_SIZE
+        self.deltas: Optional[bool] = None
+
+    def close(self):
+        """Close the client's idle connections."""
+        self.pool.close()
+
+    def supports(self, feature: str) -> Optional[bool]:
+        """
+        Whether the server has an optional feature, as far as is known.
+
+        Args:
+            feature: 'resumable' or 'deltas'
+
+        Returns:
+            True or False as last found out for this server (by this client,
+            or by a run within FEATURES_TTL), None if unknown
+        """
+        if getattr(self, feature) is None:
+            known = _load_json_file(FEATURES_FILE).get(self.server_url, {}).get(feature)
+            if isinstance(known, dict) and time.time() - known.get('checkedAt', 0) < FEATURES_TTL:
+                setattr(self, feature, known.get('supported'))
+        return getattr(self, feature)
+
+    def _record_support(self, feature: str, supported: bool):
+        """Remember whether the server has a feature, see supports."""
+        if self.supports(feature) == supported:
+            return
+        setattr(self, feature, supported)
+        with self._features_lock:
+            features = _load_json_file(FEATURES_FILE)
+            features.setdefault(self.server_url, {})[feature] = {'supported': supported,
+                                                                 'checkedAt': time.time()}
+            try:
+                _write_json_file(FEATURES_FILE, features)
+            except OSError:
+                pass
+
+    def _send(self, url: str, method: str = 'GET', body: Any = None,
+              headers: Optional[Dict[str, str]] = None, timeout: float = 10,
+              replayable: bool = True) -> Dict[str, Any]:
+        """
+        Send a request through the connection pool and decode the JSON reply.
+
+        Args:
+            url: URL to request
+            method: HTTP method
+            body: Encoded request body
+            headers: HTTP headers
+            timeout: Request timeout in seconds
+            replayable: Whether the body may be sent again after a stale connection
+
+        Returns:
+            Response data as dictionary
+
+        Raises:
+            APIError: If the server returns an error status
+            Exception: On connection failure
+        """
+        return self._exchange(url, method, body, headers, timeout, replayable)[2]
+
+    def _exchange(self, url: str, method: str = 'GET', body: Any = None,
+                  headers: Optional[Dict[str, str]] = None, timeout: float = 10,
+                  replayable: bool = True, sink: Optional[Callable[..., BinaryIO]] = None) -> tuple:
+        """
+        Like _send, but also return the status and response headers.
+
+        Args:
+            sink: Picks the file to stream a successful response body to,
+                  see ConnectionPool.request
+
+        Returns:
+            (status, response headers, response data); data is {} for a
+            304 Not Modified reply or a body written to the sink
+        """
+        routed = self.endpoints.route(url, self.pool)
+        # After a failover, send the request again at once if it can be;
+        # otherwise the next retry goes to the new endpoint
+        resend = replayable and sink is None
+        try:
+            status, response_headers, response_body = self.pool.request(
+                method, routed, body=body, headers=headers, timeout=timeout, replayable=replayable,
+                sink=sink
+            )
+        except (OSError, http.client.HTTPException) as e:
+            error = TransportError(f'Connection error: {e}')
+            if not (self.endpoints.fail_over(routed, error) and resend):
+                raise error
+            return self._exchange(url, method, body, headers, timeout, replayable, sink)
+
+        if status == 401 and replayable and self._reauthenticate():
+            # The saved session was rejected; retry with the new token
+            return self._exchange(url, method, body, {**(headers or {}), **self.get_headers()},
+                                  timeout, replayable, sink)
+
+        response_data = response_body.decode('utf-8')
+        if status >= 400:
+            error = _api_error(status, response_headers, response_data)
+            if not (status in FAILOVER_STATUSES and self.endpoints.fail_over(routed, error) and resend):
+                raise error
+            return self._exchange(url, method, body, headers, timeout, replayable, sink)
+        return status, response_headers, json.loads(response_data) if response_data else {}
+
+    def _reauthenticate(self) -> bool:
+        """Replace a rejected saved session with an interactive login."""
+        if not self._session_restored or not self.password_prompt:
+            return False
+        self._session_restored = False
+        self.clear_session()
+        print("Saved session is no longer valid, please log in again.")
+        return self.login(self.email, self.password_prompt(), save_session=self.save_session)
+
+    def _make_request(self, url: str, method: str = 'GET', data: Any = None,
+                     headers: Optional[Dict[str, str]] = None, timeout: int = 10) -> Dict[str, Any]:
+        """
+        Make an HTTP request over a pooled keep-alive connection.
+
+        Transient failures are retried according to self.retry.
+
+        Args:
+            url: URL to request
+            method: HTTP method (GET, POST, etc.)
+            data: Data to send (will be JSON encoded if dict)
+            headers: HTTP headers
+            timeout: Request timeout in seconds
+
+        Returns:
+            Response data as dictionary
+
+        Raises:
+            Exception: On request failure
+        """
+        if headers is None:
+            headers = {}
+
+        # Prepare request data
+        request_data = None
+        if data is not None:
+            if isinstance(data, dict):
+                request_data = json.dumps(data).encode('utf-8')
+                headers['Content-Type'] = 'application/json'
+            elif isinstance(data, bytes):
+                request_data = data
+            else:
+                request_data = data.encode('utf-8')
+
+        return self.retry.call(lambda: self._send(url, method, request_data, headers, timeout))
+
+    def _multipart_request(self, url: str, fields: Dict[str, str],
+                          files: Union[Dict[str, tuple], List[tuple]],
+                          headers: Optional[Dict[str, str]] = None,
+                          timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Make a multipart/form-data request.
+
+        Transient failures are retried according to self.retry when the
+        body can be sent again.
+
+        Args:
+            url: URL to request
+            fields: Form fields
+            files: Files to upload {field_name: (filename, source, content_type[, size])},
+                   see MultipartEncoder for the accepted sources
+            headers: Additional headers
+            timeout: Request timeout in seconds (scaled to the body size and
+                     measured throughput if omitted)
+
+        Returns:
+            Response data as dictionary
+        """
+        if headers is None:
+            headers = {}
+
+        body = MultipartEncoder(fields, files)
+        headers['Content-Type'] = body.content_type
+        size = body.content_length
+        if size is not None:
+            headers['Content-Length'] = str(size)
+        # Otherwise http.client falls back to chunked transfer encoding
+        if timeout is None:
+            timeout = self.throughput.timeout(MAX_UPLOAD_SIZE if size is None else size)
+
+        def send():
+            started = time.perf_counter()
+            data = self._send(url, 'POST', body, headers, timeout, replayable=body.replayable)
+            if size is not None:
+                self.throughput.record(size, time.perf_counter() - started)
+            return data
+
+        if not body.replayable:
+            return send()
+        return self.retry.call(send)
+
+    def login(self, email: str, password: str, save_session: bool = False) -> bool:
+        """
+        Authenticate with the server and obtain a JWT token.
+
+        Args:
+            email: Student email address
+            password: Student password
+            save_session: Save the token to SESSION_FILE for later runs
+
+        Returns:
+            True if login successful, False otherwise
+        """
+        self.email = email
+        self.save_session = save_session
+        self._session_restored = False
+        try:
+            data = self._make_request(
+                f"{self.api_url}/auth/login",
+                method='POST',
+                data={"email": email, "password": password}
+            )
+
+            self.token = data.get('token')
+            self.user_info = data.get('user')
+            print(f"✓ Logged in as {self.user_info.get('firstName')} {self.user_info.get('lastName')}")
+            print(f"  Email: {self.user_info.get('email')}")
+            print(f"  Role: {self.user_info.get('role')}")
+            if save_session:
+                sessions = _load_json_file(SESSION_FILE)
+                sessions[self._session_key()] = {'token': self.token, 'user': self.user_info}
+                self._save_sessions(sessions)
+            return True
+
+        except Exception as e:
+            error_msg = str(e)
+            if 'Connection error' in error_msg:
+                print(f"✗ Connection error: Unable to reach server at {self.endpoints.active or self.server_url}")
+                print("  Please check your internet connection and server URL")
+            elif 'Invalid credentials' in error_msg or 'Unauthorized' in error_msg:
+                print("✗ Login failed: Invalid email or password")
+            else:
+                print(f"✗ Login failed: {error_msg}")
+            return False
+
+    def _session_key(self) -> str:
+        return f"{self.server_url} {self.email}"
+
+    @staticmethod
+    def _save_sessions(sessions: Dict[str, Any]):
+        try:
+            _write_json_file(SESSION_FILE, sessions, private=True)
+        except OSError as e:
+            print(f"Warning: Failed to save session to {SESSION_FILE}: {e}")
+
+    def restore_session(self, email: str) -> bool:
+        """
+        Reuse a token saved by an earlier login, if it is not about to expire.
+
+        The token is not checked with the server here; if the server later
+        rejects it, requests fall back to an interactive login through
+        password_prompt.
+
+        Args:
+            email: Student email address
+
+        Returns:
+            True if a saved session was restored
+        """
+        self.email = email
+        self.save_session = True
+        session = load_saved_session(self.server_url, email)
+        if not session:
+            return False
+
+        self.token = session['token']
+        self.user_info = session.get('user') or {}
+        self._session_restored = True
+        return True
+
+    def clear_session(self):
+        """Remove this client's saved session, if any."""
+        sessions = _load_json_file(SESSION_FILE)
+        if sessions.pop(self._session_key(), None) is not None:
+            self._save_sessions(sessions)
+
+    def get_headers(self) -> Dict[str, str]:
+        """Get HTTP headers with authentication token."""
+        if not self.token:
+            raise ValueError("Not authenticated. Please login first.")
+        return {"Authorization": f"Bearer {self.token}"}
+
+    def get_catalog(self, refresh: bool = False) -> AssignmentCatalog:
+        """
+        Return the assignment catalog, revalidating it only when needed.
+
+        The catalog is kept in CATALOG_FILE per server. Within catalog_ttl
+        seconds of the last check it is used without contacting the server;
+        after that (or with refresh=True) it is revalidated with a
+        conditional request, and the list is only downloaded again if the
+        server reports a change. A stale catalog is used, with a warning,
+        if the server cannot be reached.
+
+        Args:
+            refresh: Revalidate even if the cached catalog is recent
+
+        Returns:
+            The assignment catalog
+
+        Raises:
+            Exception: If there is no usable catalog and the request fails
+        """
+        catalog = self._catalog
+        if catalog is None:
+            cached = _load_json_file(CATALOG_FILE).get(self.server_url)
+            if cached:
+                try:
+                    catalog = AssignmentCatalog.from_json(cached)
+                except (KeyError, TypeError, ValueError):
+                    catalog = None
+
+        if catalog and not refresh and time.time() - catalog.fetched_at < self.catalog_ttl:
+            self._catalog = catalog
+            return catalog
+
+        headers = self.get_headers()
+        if catalog and catalog.etag:
+            headers['If-None-Match'] = catalog.etag
+        if catalog and catalog.last_modified:
+            headers['If-Modified-Since'] = catalog.last_modified
+
+        def fetch() -> tuple:
+            return self._exchange(f"{self.api_url}/assignments", headers=headers)
+
+        try:
+            # Without a cached copy to fall back on, retry transient failures
+            status, response_headers, data = fetch() if catalog else self.retry.call(fetch)
+        except Exception as e:
+            if catalog is None or (isinstance(e, APIError) and e.status in (401, 403)):
+                raise
+            print(f"Warning: Using cached assignment list ({e})")
+            self._catalog = catalog
+            return catalog
+
+        if status == 304 and catalog:
+            catalog.fetched_at = time.time()
+        else:
+            # Handle both array and object responses
+            assignments = data.get('assignments', data) if isinstance(data, dict) else data
+            catalog = AssignmentCatalog(assignments, response_headers.get('ETag'),
+                                        response_headers.get('Last-Modified'), time.time())
+
+        self._catalog = catalog
+        catalogs = _load_json_file(CATALOG_FILE)
+        catalogs[self.server_url] = catalog.to_json()
+        try:
+            _write_json_file(CATALOG_FILE, catalogs)
+        except OSError as e:
+            print(f"Warning: Failed to cache assignment list in {CATALOG_FILE}: {e}")
+        return catalog
+
+    def list_assignments(self, show_all: bool = False) -> List[Dict[str, Any]]:
+        """
+        List all assignments.
+
+        Args:
+            show_all: If True, show all assignments including past due
+
+        Returns:
+            List of assignment dictionaries
+        """
+        try:
+            catalog = self.get_catalog()
+
+            # Filter out past due assignments unless show_all is True
+            if not show_all:
+                return catalog.active()
+
+            return catalog.assignments
+
+        except Exception as e:
+            print(f"✗ Error fetching assignments: {e}")
+            return []
+
+    def find_assignment(self, assignment_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Find an assignment by name (or ID).
+
+        Args:
+            assignment_name: Name of the assignment to find
+
+        Returns:
+            Assignment data if found, None otherwise
+        """
+        try:
+            catalog = self.get_catalog()
+            if catalog.lookup(assignment_name) is None:
+                # Maybe the assignment was created after the cached list
+                catalog = self.get_catalog(refresh=True)
+
+            # Try exact, then case-insensitive match
+            assignment = catalog.lookup(assignment_name)
+            if assignment:
+                return assignment
+
+            # Try partial match
+            for assignment in catalog.similar(assignment_name):
+                print(f"Found similar assignment: {assignment['title']}")
+                confirm = input("Is this the correct assignment? (y/n): ").strip().lower()
+                if confirm == 'y':
+                    return assignment
+
+            print(f"✗ Assignment '{assignment_name}' not found")
+            print("\nAvailable assignments:")
+            for assignment in catalog.assignments:
+                due_date = catalog.due_date(assignment)
+                print(f"  - {assignment['title']} (Due: {due_date.strftime('%Y-%m-%d %H:%M')})")
+            return None
+
+        except Exception as e:
+            print(f"✗ Error fetching assignments: {e}")
+            return None
+
+    def create_submission(self, assignment_id: str, zip_path: str, text_content: str = "") -> bool:
+        """
+        Submit an assignment with a zip file.
+
+        Args:
+            assignment_id: ID of the assignment
+            zip_path: Path to the zip file to upload
+            text_content: Optional text content/comments
+
+        Returns:
+            True if submission successful, False otherwise
+        """
+        size = os.path.getsize(zip_path)
+        if size > self.volume_size:
+            volumes = -(-size // self.volume_size)
+            print(f"Archive is {size / 1024 / 1024:.1f} MB, more than the server accepts per file "
+                  f"({self.volume_size / 1024 / 1024:.0f} MB); uploading it in {volumes} volumes")
+        print(f"Uploading submission...")
+        try:
+            data = self.submit_archive(assignment_id, zip_path, text_content)
+        except Exception as e:
+            print(f"✗ Submission error: {e}")
+            return False
+
+        self._report_submission(data)
+        return True
+
+    def create_delta_submission(self, assignment_id: str, zip_path: str, base: str,
+                                deletions: List[str], text_content: str = "") -> Optional[bool]:
+        """
+        Submit an archive of changes with submit_delta, reporting the result.
+
+        Returns:
+            True if submission successful, False if it failed, None if the
+            previous submission changed in the meantime and everything has
+            to be submitted instead
+        """
+        print(f"Uploading changes...")
+        try:
+            data = self.submit_delta(assignment_id, zip_path, base, deletions, text_content)
+        except APIError as e:
+            if e.status == 409:
+                print(f"Warning: {e}; submitting all files instead")
+                return None
+            print(f"✗ Submission error: {e}")
+            return False
+        except Exception as e:
+            print(f"✗ Submission error: {e}")
+            return False
+
+        self._report_submission(data)
+        return True
+
+    def submit_archive(self, assignment_id: str, zip_path: str,
+                       text_content: str = "") -> Dict[str, Any]:
+        """
+        Upload a zip file, split into volumes if it is too large.
+
+        Archives larger than volume_size are cut with split_archive and sent
+        as several attachments of the same submission, together with the
+        manifest that join_volumes uses to put them back together.
+
+        Args:
+            assignment_id: ID of the assignment
+            zip_path: Path to the zip file to upload
+            text_content: Optional text content/comments
+
+        Returns:
+            Submission data from the server
+
+        Raises:
+            Exception: On request failure
+        """
+        size = os.path.getsize(zip_path)
+        if size <= self.volume_size:
+            return self.submit_parts(assignment_id, [(zip_path, 'application/zip')], text_content)
+
+        paths = split_archive(zip_path, self.volume_size)
+        try:
+            # The manifest goes last, so it is only attached once every volume is
+            parts = [(str(path), 'application/zip') for path in paths[1:]]
+            parts.append((str(paths[0]), 'application/json'))
+            return self.submit_parts(assignment_id, parts, text_content)
+        finally:
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def submit_parts(self, assignment_id: str, parts: List[tuple],
+                     text_content: str = "") -> Dict[str, Any]:
+        """
+        Upload files as the attachments of one submission.
+
+        Several files, or one of RESUMABLE_MIN_SIZE or more, are first
+        offered to the server's resumable upload endpoint, several at a time;
+        servers without one are not asked again for FEATURES_TTL (see
+        supports) and get one multipart request per file instead, as the
+        proxy in front of the server limits the size of a request body and
+        the server appends the files of each request to the submission. The
+        first of those requests creates the submission and the last is only
+        sent once the others have succeeded; the ones in between are sent
+        several at a time.
+
+        Args:
+            assignment_id: ID of the assignment
+            parts: (path, content type) of each file
+            text_content: Optional text content/comments
+
+        Returns:
+            Submission data from the server
+
+        Raises:
+            Exception: On request failure
+        """
+        resumable = len(parts) > 1 or os.path.getsize(parts[0][0]) >= RESUMABLE_MIN_SIZE
+        if resumable and self.supports('resumable') is not False:
+            # Each file is hashed just before its upload, so a server without
+            # resumable uploads costs the hash of one file only
+            digests: List[Optional[str]] = [None] * len(parts)
+
+            def upload(i: int) -> Optional[str]:
+                path = parts[i][0]
+                digests[i] = file_sha256(path)
+                return self.upload_resumable(path, os.path.basename(path), digests[i],
+                                             parts[i][1])
+
+            # The first upload finds out whether the server supports them;
+            # the smallest file (a volume manifest) is the cheapest to hash
+            first = min(range(len(parts)), key=lambda i: os.path.getsize(parts[i][0]))
+            upload_ids: List[Optional[str]] = [None] * len(parts)
+            upload_ids[first] = upload(first)
+            if upload_ids[first] is not None:
+                rest = [i for i in range(len(parts)) if i != first]
+                with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+                    for i, upload_id in zip(rest, executor.map(upload, rest)):
+                        upload_ids[i] = upload_id
+                fields = {
+                    'assignmentId': assignment_id,
+                    'textContent': text_content,
+                    'status': 'submitted',
+                    'uploadIds': upload_ids,
+                }
+                data = self._make_request(f"{self.api_url}/submissions", method='POST',
+                                          data=fields, headers=self.get_headers())
+                for digest in digests:
+                    self._forget_upload(digest)
+                return data
+
+        def send(part: tuple) -> Dict[str, Any]:
+            path, content_type = part
+            files = {'files': (os.path.basename(path), path, content_type)}
+            return self.submit_files(assignment_id, files, text_content)
+
+        data = send(parts[0])
+        try:
+            if len(parts) > 2:
+                with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+                    list(executor.map(send, parts[1:-1]))
+            if len(parts) > 1:
+                data = send(parts[-1])
+        except Exception as e:
+            # The submission now ends with some of the files and no manifest
+            raise Exception(f"{e}; only some of the {len(parts)} files were attached, so the "
+                            f"submission is incomplete: please submit again") from e
+        return data
+
+    def upload_resumable(self, path: str, filename: str, digest: str,
+                         content_type: str = 'application/zip') -> Optional[str]:
+        """
+        Upload a file in chunks that survive dropped connections.
+
+        The upload is registered with the server (or, if an earlier run was
+        interrupted, picked up where the server says it stopped) and sent
+        with PATCH requests from the last acknowledged offset. After a
+        failure the offset is asked for again, so only the unacknowledged
+        part is repeated. Chunk sizes and timeouts follow the measured
+        throughput.
+
+        Args:
+            path: File to upload
+            filename: File name reported to the server
+            digest: Hex SHA-256 of the file, which identifies the upload
+                    across runs
+            content_type: MIME type reported to the server
+
+        Returns:
+            ID of the completed upload, or None if the server does not
+            support resumable uploads
+
+        Raises:
+            Exception: If the upload fails after all retries
+        """
+        size = os.path.getsize(path)
+        uploads_url = f"{self.api_url}/uploads"
+        state_key = f"{self.server_url} {digest}"
+        upload = None
+
+        saved = _load_json_file(UPLOADS_FILE).get(state_key)
+        if saved and time.time() - saved.get('createdAt', 0) < UPLOAD_STATE_TTL:
+            try:
+                upload = self._make_request(f"{uploads_url}/{saved['id']}",
+                                            headers=self.get_headers())
+            except APIError as e:
+                if e.status not in (404, 410):
+                    raise
+            if upload is not None and upload.get('size') != size:
+                upload = None
+
+        if upload is None:
+            try:
+                upload = self._make_request(
+                    uploads_url, method='POST',
+                    data={'filename': filename, 'size': size, 'sha256': digest,
+                          'contentType': content_type},
+                    headers=self.get_headers())
+            except APIError as e:
+                if e.status in (404, 405, 501):
+                    self._record_support('resumable', False)
+                    return None
+                raise
+            now = time.time()
+            with self._uploads_lock:
+                uploads = {key: value for key, value in _load_json_file(UPLOADS_FILE).items()
+                           if now - value.get('createdAt', 0) < UPLOAD_STATE_TTL}
+                uploads[state_key] = {'id': upload['id'], 'createdAt': now}
+                try:
+                    _write_json_file(UPLOADS_FILE, uploads, private=True)
+                except OSError as e:
+                    print(f"Warning: Failed to record upload in {UPLOADS_FILE}: {e}")
+        self._record_support('resumable', True)
+
+        upload_url = f"{uploads_url}/{upload['id']}"
+        offset = upload['offset']
+        if offset:
+            print(f"Resuming upload at {offset / 1024 / 1024:.1f} of {size / 1024 / 1024:.1f} MB")
+
+        failures = 0
+        while offset < size:
+            chunk = FileRegion(path, offset, min(self.throughput.chunk_size(), size - offset))
+            headers = self.get_headers()
+            headers['Content-Type'] = 'application/offset+octet-stream'
+            headers['Content-Length'] = str(len(chunk))
+            headers['Upload-Offset'] = str(offset)
+            started = time.perf_counter()
+            try:
+                reply = self._send(upload_url, 'PATCH', chunk, headers,
+                                   timeout=self.throughput.timeout(len(chunk)))
+            except Exception as e:
+                # A conflict means the offset is out of date; like other
+                # failures it counts against the retries, so a server that
+                # keeps answering 409 cannot hold the upload forever
+                conflict = isinstance(e, APIError) and e.status == 409
+                if failures >= self.retry.retries or not (conflict or self.retry.is_transient(e)):
+                    raise
+                failures += 1
+                self.retry.wait(failures, e)
+                # Continue from whatever the server has kept
+                offset = self._make_request(upload_url, headers=self.get_headers())['offset']
+                continue
+
+            self.throughput.record(len(chunk), time.perf_counter() - started)
+            if reply['offset'] > offset:
+                failures = 0
+            else:
+                error = Exception(f"Upload is not advancing at {offset} of {size} bytes")
+                if failures >= self.retry.retries:
+                    raise error
+                failures += 1
+                self.retry.wait(failures, error)
+            offset = reply['offset']
+
+        return upload['id']
+
+    def _forget_upload(self, digest: str):
+        """Drop the saved state of a resumable upload that has been submitted."""
+        with self._uploads_lock:
+            uploads = _load_json_file(UPLOADS_FILE)
+            if uploads.pop(f"{self.server_url} {digest}", None) is not None:
+                try:
+                    _write_json_file(UPLOADS_FILE, uploads, private=True)
+                except OSError:
+                    pass
+
+    def stream_submission(self, assignment_id: str, directory: str, filename: str,
+                          text_content: str = "", **archive_options: Any) -> Optional['ArchiveStats']:
+        """
+        Zip a directory and upload it in one pass, reporting the result.
+
+        Args:
+            assignment_id: ID of the assignment
+            directory: Directory to zip
+            filename: File name reported for the uploaded archive
+            text_content: Optional text content/comments
+            **archive_options: Keyword arguments passed to build_zip_archive
+
+        Returns:
+            Statistics about the uploaded archive if submission successful,
+            None otherwise
+        """
+        try:
+            if archive_options.get('scan') is None:
+                archive_options['scan'] = scan_submission(directory, **archive_options)
+                print(f"Checking files in: {archive_options['scan'].directory_path}")
+                archive_options['scan'].print_report()
+            print(f"Packing and uploading submission...")
+            data, stats = self.upload_directory(assignment_id, directory, filename,
+                                                text_content, **archive_options)
+        except ArchiveError as e:
+            print(f"✗ {e}")
+            return None
+        except Exception as e:
+            print(f"✗ Submission error: {e}")
+            return None
+
+        print(f"✓ Zip archive streamed from: {stats.directory_path}")
+        stats.print_summary()
+        self._report_submission(data)
+        return stats
+
+    def upload_directory(self, assignment_id: str, directory: str, filename: str,
+                         text_content: str = "", **archive_options: Any) -> tuple:
+        """
+        Zip a directory and upload it in one pass, without a temporary file.
+
+        A background thread writes the archive into a bounded ChunkPipe while
+        the upload drains it onto the connection, so compression and network
+        transfer overlap. The request is sent with chunked transfer encoding
+        because the archive size is not known in advance. Nothing is printed.
+
+        Args:
+            assignment_id: ID of the assignment
+            directory: Directory to zip
+            filename: File name reported for the uploaded archive
+            text_content: Optional text content/comments
+            **archive_options: Keyword arguments passed to build_zip_archive
+
+        Returns:
+            (submission data from the server, ArchiveStats)
+
+        Raises:
+            ArchiveError: If the directory cannot be archived
+            Exception: If packing or uploading fails
+        """
+        # Scan once, not again on every retry
+        if archive_options.get('scan') is None:
+            archive_options['scan'] = scan_submission(directory, **archive_options)
+
+        def attempt() -> tuple:
+            pipe = ChunkPipe()
+            result: Dict[str, Any] = {}
+
+            def produce():
+                try:
+                    result['stats'] = build_zip_archive(directory, pipe, **archive_options)
+                    pipe.close()
+                except Exception as e:
+                    result['error'] = e
+                    pipe.fail(e)
+
+            files = {
+                'files': (filename, pipe, 'application/zip', None)
+            }
+
+            producer = threading.Thread(target=produce, name='zip-producer', daemon=True)
+            producer.start()
+            started = time.perf_counter()
+            try:
+                data = self.submit_files(assignment_id, files, text_content)
+            except Exception:
+                if 'error' in result:
+                    # Report the archive problem, not the aborted upload
+                    raise result['error']
+                raise
+            finally:
+                pipe.abort()
+                producer.join()
+            self.throughput.record(result['stats'].zip_size, time.perf_counter() - started)
+            return data, result['stats']
+
+        # A streamed body cannot be replayed, so a retry packs the directory
+        # again (cheap when the archive cache is enabled)
+        return self.retry.call(attempt)
+
+    def submit_files(self, assignment_id: str, files: Union[Dict[str, tuple], List[tuple]],
+                     text_content: str = "",
+                     extra_fields: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        POST prepared file parts to the submissions endpoint.
+
+        Args:
+            assignment_id: ID of the assignment
+            files: File parts in the format accepted by MultipartEncoder
+            text_content: Optional text content/comments
+            extra_fields: Additional form fields
+
+        Returns:
+            Submission data from the server
+
+        Raises:
+            Exception: On request failure
+        """
+        # Prepare multipart form data
+        fields = {
+            'assignmentId': assignment_id,
+            'textContent': text_content,
+            'status': 'submitted',
+            **(extra_fields or {})
+        }
+
+        return self._multipart_request(
+            f"{self.api_url}/submissions",
+            fields=fields,
+            files=files,
+            headers=self.get_headers()
+        )
+
+    def get_latest_submission(self, assignment_id: str) -> Optional[Dict[str, Any]]:
+        """The student's submission to an assignment, or None if there is none yet."""
+        submissions = self._make_request(
+            f"{self.api_url}/submissions/my?{urlencode({'assignmentId': assignment_id})}",
+            headers=self.get_headers()
+        )
+        return next((s for s in submissions if s.get('assignmentId') == assignment_id), None)
+
+    def is_latest_upload(self, assignment_id: str, filename: str, text_content: str = "") -> bool:
+        """
+        Whether the last upload to an assignment was the file named filename.
+
+        Reproducible archives are named after their content digest, so
+        this tells whether the same content was already submitted (with
+        the same text). Volumes and delta submissions of an archive carry
+        its name too. Earlier uploads do not count, as resubmissions
+        append attachments and only the newest ones are current.
+
+        Args:
+            assignment_id: ID of the assignment
+            filename: Name the archive would be uploaded as
+            text_content: Text that would be submitted with it
+        """
+        previous = self.get_latest_submission(assignment_id)
+        if (not previous or previous.get('status') != 'submitted' or not previous.get('attachments')
+                or (previous.get('textContent') or '') != text_content):
+            return False
+        newest = max(previous['attachments'], key=lambda a: a.get('uploadedAt') or '')
+        return newest.get('fileName', '').startswith(filename)
+
+    def get_archive_manifest(self, assignment_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the content manifest of the archive last submitted for an assignment.
+
+        Servers that can rebuild a submission from a delta answer
+        GET /api/submissions/:id/manifest with {base, files: {arcname:
+        sha256}}; others answer 404 and are not asked again for FEATURES_TTL
+        (see supports).
+
+        Args:
+            assignment_id: ID of the assignment
+
+        Returns:
+            The manifest, with the textContent of the submission it belongs
+            to added, or None if there is no previous submission or the
+            server does not support delta submissions
+        """
+        if self.supports('deltas') is False:
+            return None
+        previous = self.get_latest_submission(assignment_id)
+        if previous is None:
+            return None
+        try:
+            manifest = self._make_request(f"{self.api_url}/submissions/{previous['id']}/manifest",
+                                          headers=self.get_headers())
+        except APIError as e:
+            if e.status not in (404, 405, 501):
+                raise
+            self._record_support('deltas', False)
+            return None
+        self._record_support('deltas', True)
+        if not manifest.get('base'):
+            return None
+        return {**manifest, 'textContent': previous.get('textContent') or ''}
+
+    def submit_delta(self, assignment_id: str, zip_path: str, base: str,
+                     deletions: List[str], text_content: str = "") -> Dict[str, Any]:
+        """
+        Upload an archive of changed files, for the server to merge into the previous one.
+
+        Args:
+            assignment_id: ID of the assignment
+            zip_path: Archive of the changed and added files
+            base: The 'base' of the manifest the delta was computed against
+            deletions: Arcnames to remove from the previous archive
+            text_content: Optional text content/comments
+
+        Returns:
+            Submission data from the server
+
+        Raises:
+            APIError: With status 409 if another submission was made since
+                      the manifest was fetched
+            Exception: On any other request failure
+        """
+        files = {'files': (os.path.basename(zip_path), zip_path, 'application/zip')}
+        return self.submit_files(assignment_id, files, text_content, extra_fields={
+            'deltaBase': base,
+            'deletions': json.dumps(deletions),
+        })
+
+    def list_assignment_submissions(self, assignment_id: str,
+                                    page_size: int = DOWNLOAD_PAGE_SIZE) -> List[Dict[str, Any]]:
+        """
+        All submissions to an assignment (TAs, instructors and admins only).
+
+        Args:
+            assignment_id: ID of the assignment
+            page_size: Submissions requested per page
+
+        Returns:
+            Submissions without attachments, as listed by the server
+        """
+        submissions: List[Dict[str, Any]] = []
+        page = 1
+        while True:
+            query = urlencode({'page': page, 'limit': page_size})
+            data = self._make_request(f"{self.api_url}/submissions/by-assignment/{assignment_id}?{query}",
+                                      headers=self.get_headers())
+            submissions.extend(data.get('submissions', []))
+            if not data.get('submissions') or page >= data.get('totalPages', 1):
+                return submissions
+            page += 1
+
+    def get_submission(self, submission_id: str) -> Dict[str, Any]:
+        """A submission with its attachments and feedback."""
+        return self._make_request(f"{self.api_url}/submissions/{submission_id}",
+                                  headers=self.get_headers())
+
+    def download_attachment(self, attachment: Dict[str, Any], path: Path) -> bool:
+        """
+        Download an attachment, continuing an earlier partial download.
+
+        The file is written to path + PARTIAL_SUFFIX and renamed to path
+        once complete. If a partial file is there, only the rest is
+        requested with a Range header; a server that ignores the range
+        sends the whole file, which then replaces the partial one.
+        Transient failures are retried according to self.retry, each retry
+        continuing where the previous attempt stopped.
+
+        Args:
+            attachment: Attachment record from the server ({id, fileSize, ...})
+            path: Where to save the attachment
+
+        Returns:
+            True if a partial download was continued
+
+        Raises:
+            APIError, TransportError: If the download fails
+        """
+        part_path = path.with_name(path.name + PARTIAL_SUFFIX)
+        url = f"{self.api_url}/submissions/attachments/{attachment['id']}/download"
+        size = attachment.get('fileSize')
+        resumed = False
+        files: List[BinaryIO] = []
+
+        def open_part(status: int, headers: http.client.HTTPMessage) -> BinaryIO:
+            nonlocal resumed
+            if status != 206:
+                files.append(open(part_path, 'wb'))
+                return files[-1]
+            match = re.match(r'bytes (\d+)-', headers.get('Content-Range', ''))
+            if not match or int(match.group(1)) != offset:
+                raise ValueError(f"Server sent an unexpected range: {headers.get('Content-Range')}")
+            resumed = True
+            files.append(open(part_path, 'ab'))
+            return files[-1]
+
+        def fetch():
+            nonlocal offset
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            headers = self.get_headers()
+            if offset:
+                headers['Range'] = f'bytes={offset}-'
+            try:
+                self._exchange(url, headers=headers, timeout=UPLOAD_BASE_TIMEOUT, sink=open_part)
+            except APIError as e:
+                if e.status != 416:
+                    raise
+                # The partial file is as long as the attachment (or longer)
+                if offset != size:
+                    os.remove(part_path)
+                    raise TransportError(f'Partial download of {path.name} does not match, restarting')
+            finally:
+                while files:
+                    files.pop().close()
+            received = part_path.stat().st_size
+            if size is not None and received != size:
+                if received > size:
+                    os.remove(part_path)
+                raise TransportError(f'Received {received} of {size} bytes of {path.name}')
+
+        offset = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.retry.call(fetch)
+        os.replace(part_path, path)
+        return resumed
+
+    def download_assignment(self, assignment_id: str, output_dir: Union[str, Path],
+                            workers: int = 4) -> DownloadStats:
+        """
+        Download every submission to an assignment into a directory.
+
+        Each student's attachments go to a subdirectory named after the
+        student. Submission details are fetched and attachments downloaded
+        by a pool of workers, downloads starting as soon as their
+        submission's details arrive. Attachments already on disk with the
+        size the server reports are skipped; if such a file was modified
+        since this client wrote it, it is only kept if its SHA-256 still
+        matches. What was downloaded is recorded in DOWNLOAD_STATE_FILE,
+        so a second run fetches only new attachments.
+
+        Args:
+            assignment_id: ID of the assignment
+            output_dir: Directory to download into
+            workers: Requests in flight at once
+
+        Returns:
+            What was downloaded, skipped and failed
+
+        Raises:
+            APIError, TransportError: If the submissions cannot be listed
+        """
+        output_dir = Path(output_dir)
+        state_path = output_dir / DOWNLOAD_STATE_FILE
+        state = _load_json_file(state_path)
+        state_lock = threading.Lock()
+        print_lock = threading.Lock()
+        stats = DownloadStats()
+
+        def present(attachment: Dict[str, Any], path: Path) -> bool:
+            try:
+                st = path.stat()
+            except OSError:
+                return False
+            if attachment.get('fileSize') is not None and st.st_size != attachment['fileSize']:
+                return False
+            entry = state.get(attachment['id'])
+            if entry is None or (entry['size'] == st.st_size and entry['mtime'] == st.st_mtime_ns):
+                return True
+            if file_sha256(path) != entry['sha256']:
+                return False
+            with state_lock:
+                entry['mtime'] = st.st_mtime_ns
+            return True
+
+        def download(attachment: Dict[str, Any], path: Path):
+            if present(attachment, path):
+                stats.add('skipped')
+                return
+            try:
+                resumed = self.download_attachment(attachment, path)
+            except Exception as e:
+                with print_lock:
+                    print(f"  ✗ {path.relative_to(output_dir)}: {e}")
+                stats.fail(path, e)
+                return
+            st = path.stat()
+            entry = {'path': str(path.relative_to(output_dir)), 'size': st.st_size,
+                     'mtime': st.st_mtime_ns, 'sha256': file_sha256(path)}
+            with state_lock:
+                state[attachment['id']] = entry
+            stats.add('downloaded', st.st_size)
+            if resumed:
+                stats.add('resumed')
+            with print_lock:
+                print(f"  ✓ {path.relative_to(output_dir)} ({_format_size(st.st_size)})"
+                      f"{' (resumed)' if resumed else ''}")
+
+        submissions = self.list_assignment_submissions(assignment_id)
+        stats.submissions = len(submissions)
+        print(f"Found {len(submissions)} submission(s)")
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            details = {executor.submit(self.get_submission, submission['id']): submission
+                       for submission in submissions}
+            downloads = []
+            try:
+                for future in as_completed(details):
+                    submission = details[future]
+                    student = safe_filename(f"{submission.get('studentName') or 'student'}"
+                                            f"_{str(submission.get('studentId', ''))[:8]}")
+                    try:
+                        attachments = future.result().get('attachments', [])
+                    except Exception as e:
+                        with print_lock:
+                            print(f"  ✗ {student}: {e}")
+                        stats.fail(output_dir / student, e)
+                        continue
+                    # Same order every run, so duplicate names get the same suffixes
+                    names: Set[str] = set()
+                    for attachment in sorted(attachments, key=lambda a: (a.get('uploadedAt') or '', a['id'])):
+                        name = safe_filename(attachment.get('fileName') or attachment['id'])
+                        if name in names:
+                            stem, dot, suffix = name.rpartition('.')
+                            name = (f"{stem}_{attachment['id'][:8]}.{suffix}" if dot
+                                    else f"{name}_{attachment['id'][:8]}")
+                        names.add(name)
+                        downloads.append(executor.submit(download, attachment, output_dir / student / name))
+                for future in downloads:
+                    future.result()
+            finally:
+                with state_lock:
+                    try:
+                        _write_json_file(state_path, state)
+                    except OSError as e:
+                        print(f"Warning: Failed to save {state_path}: {e}")
+        return stats
+
+    @staticmethod
+    def _report_submission(data: Dict[str, Any]):
+        """Print the server's reply to a successful submission."""
+        print(f"✓ Submission successful!")
+        print(f"  Submission ID: {data['id']}")
+        print(f"  Status: {data['status']}")
+        if data.get('submittedAt'):
+            submitted_at = parse_timestamp(data['submittedAt'])
+            print(f"  Submitted at: {submitted_at.strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"  Attachments: {len(data.get('attachments', []))} file(s)")
+
+
+class AsyncSubmissionClient:
+    """
+    asyncio client for logging in and reading assignments and submissions.
+
+    Meant for dashboards and automation that need many reads at once:
+    requests can be awaited concurrently (e.g. with asyncio.gather) and the
+    connection pool bounds how many are in flight. Uploads stay with
+    SubmissionClient. Failures are raised (APIError, TransportError), not
+    printed. An instance is used within one event loop::
+
+        async with AsyncSubmissionClient(server_url) as client:
+            await client.login(email, password)
+            assignments, submissions = await asyncio.gather(
+                client.get_assignments(), client.get_my_submissions())
+    """
+
+    def __init__(self, server_url: str, token: Optional[str] = None,
+                 pool: Optional[AsyncConnectionPool] = None,
+                 max_concurrency: int = ASYNC_MAX_CONCURRENCY,
+                 session_url: Optional[str] = None):
+        """
+        Args:
+            server_url: Base URL of the server (e.g., https://aicamp.iiis.co)
+            token: JWT of an existing session, e.g. SubmissionClient.token
+            pool: Connection pool to send requests through (a private one
+                  is created if omitted)
+            max_concurrency: Requests in flight at once, for a private pool
+            session_url: Base URL saved sessions are kept under, if not
+                         server_url (SubmissionClient.server_url when
+                         server_url is the endpoint it chose)
+        """
+        self.server_url = server_url.rstrip('/')
+        self.session_url = (session_url or server_url).rstrip('/')
+        self.api_url = f"{self.server_url}/api"
+        self.token = token
+        self.user_info: Optional[Dict[str, Any]] = None
+        self.pool = pool or AsyncConnectionPool(max_concurrency)
+        self.retry = RetryPolicy()
+
+    async def __aenter__(self) -> 'AsyncSubmissionClient':
+        return self
+
+    async def __aexit__(self, *exc_info: Any):
+        await self.close()
+
+    async def close(self):
+        """Close the client's idle connections."""
+        await self.pool.close()
+
+    def get_headers(self) -> Dict[str, str]:
+        """Get HTTP headers with authentication token."""
+        if not self.token:
+            raise ValueError("Not authenticated. Please login first.")
+        return {"Authorization": f"Bearer {self.token}"}
+
+    async def _request(self, path: str, method: str = 'GET', data: Any = None,
+                       authenticated: bool = True, timeout: float = 10) -> Any:
+        """
+        Send an API request, retrying transient failures according to self.retry.
+
+        Args:
+            path: Path below /api, with any query string
+            method: HTTP method
+            data: JSON-serializable request body
+            authenticated: Send the session token
+            timeout: Seconds allowed for each attempt
+
+        Returns:
+            Decoded JSON response
+
+        Raises:
+            APIError: If the server returns an error status
+            TransportError: On connection failure
+        """
+        headers = self.get_headers() if authenticated else {}
+        body = None
+        if data is not None:
+            body = json.dumps(data).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+
+        async def send() -> Any:
+            try:
+                status, response_headers, response_body = await self.pool.request(
+                    method, f"{self.api_url}{path}", body, headers, timeout)
+            except (OSError, EOFError, asyncio.TimeoutError, asyncio.LimitOverrunError,
+                    http.client.HTTPException) as e:
+                raise TransportError(f'Connection error: {str(e) or type(e).__name__}')
+            response_data = response_body.decode('utf-8')
+            if status >= 400:
+                raise _api_error(status, response_headers, response_data)
+            return json.loads(response_data) if response_data else {}
+
+        return await self.retry.call_async(send)
+
+    async def login(self, email: str, password: str) -> Dict[str, Any]:
+        """
+        Authenticate with the server and obtain a JWT token.
+
+        Returns:
+            The logged-in user
+
+        Raises:
+            APIError: If the credentials are rejected
+        """
+        data = await self._request('/auth/login', 'POST', {"email": email, "password": password},
+                                   authenticated=False)
+        self.token = data.get('token')
+        self.user_info = data.get('user')
+        return self.user_info
+
+    def restore_session(self, email: str) -> bool:
+        """Reuse a token saved by an earlier SubmissionClient login, see load_saved_session."""
+        session = load_saved_session(self.session_url, email)
+        if not session:
+            return False
+        self.token = session['token']
+        self.user_info = session.get('user') or {}
+        return True
+
+    async def get_assignments(self) -> List[Dict[str, Any]]:
+        """All assignments, including past due ones."""
+        data = await self._request('/assignments')
+        # Handle both array and object responses
+        return data.get('assignments', data) if isinstance(data, dict) else data
+
+    async def get_my_submissions(self, assignment_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """The student's submissions (to one assignment if assignment_id is given), newest first."""
+        query = f"?{urlencode({'assignmentId': assignment_id})}" if assignment_id else ''
+        return await self._request(f'/submissions/my{query}')
+
+    async def get_submission(self, submission_id: str) -> Dict[str, Any]:
+        """A submission with its attachments and feedback."""
+        return await self._request(f'/submissions/{submission_id}')
+
+    async def get_status(self) -> List[Dict[str, Any]]:
+        """
+        Every assignment with the student's submission to it.
+
+        The assignment list and the submissions are fetched together, then
+        the details (with feedback) of all submissions at once.
+
+        Returns:
+            [{'assignment': assignment, 'submission': submission details,
+            or None if not submitted}] in the server's assignment order
+        """
+        assignments, submissions = await asyncio.gather(self.get_assignments(),
+                                                        self.get_my_submissions())
+        latest: Dict[str, Dict[str, Any]] = {}
+        for submission in submissions:
+            latest.setdefault(submission['assignmentId'], submission)
+        details = await asyncio.gather(*(self.get_submission(submission['id'])
+                                         for submission in latest.values()))
+        by_assignment = {submission['assignmentId']: submission for submission in details}
+        return [{'assignment': assignment, 'submission': by_assignment.get(assignment['id'])}
+                for assignment in assignments]
+
+
+ZIP64_LIMIT = (1 << 31) - 1
+ZIP_SPOOL_SIZE = 8 * 1024 * 1024
+
+
+class ZipMember:
+    """
+    A zip member whose data has already been compressed.
+
+    The compressed bytes live in a SpooledTemporaryFile, so small members
+    stay in memory and large ones spill to disk instead of growing the
+    process. Members are produced by compress_zip_member (possibly on a
+    worker thread) and consumed by ZipStreamWriter in archive order.
+    """
+
+    def __init__(self, arcname: str, date_time: tuple, external_attr: int,
+                 method: int, crc: int, file_size: int, compress_size: int,
+                 data: BinaryIO, flag_bits: int = 0, sha256: Optional[str] = None,
+                 elapsed: float = 0.0):
+        self.arcname = arcname
+        self.date_time = date_time
+        self.external_attr = external_attr
+        self.method = method
+        self.crc = crc
+        self.file_size = file_size
+        self.compress_size = compress_size
+        self.data = data
+        self.flag_bits = flag_bits
+        self.sha256 = sha256
+        self.elapsed = elapsed
+
+
+# Earliest timestamp a zip member can have
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+def zip_date_time(st: os.stat_result) -> tuple:
+    """Zip timestamp for a file's mtime (zip dates cannot precede 1980)."""
+    date_time = time.localtime(st.st_mtime)[:6]
+    if date_time[0] < 1980:
+        date_time = ZIP_EPOCH
+    return date_time
+
+
+def reproducible_date_time() -> tuple:
+    """
+    Timestamp of every member of a reproducible archive: SOURCE_DATE_EPOCH
+    (in UTC) if that is set, as in other reproducible builds, else ZIP_EPOCH.
+    """
+    try:
+        return max(tuple(time.gmtime(int(os.environ['SOURCE_DATE_EPOCH']))[:6]), ZIP_EPOCH)
+    except (KeyError, ValueError, OverflowError, OSError):
+        return ZIP_EPOCH
+
+
+def normalized_mode(st: os.stat_result) -> int:
+    """File mode recorded in reproducible archives: rwxr-xr-x if executable, else rw-r--r--."""
+    return stat.S_IFREG | (0o755 if st.st_mode & 0o111 else 0o644)
+
+
+def compress_zip_member(file_path: Union[str, Path], arcname: str,
+                        method: int = zipfile.ZIP_DEFLATED, level: int = 6,
+                        st: Optional[os.stat_result] = None,
+                        transform: Optional[Callable[[Any], BinaryIO]] = None) -> ZipMember:
+    """
+    Read and compress one file into a ZipMember.
+
+    This only touches the file and its own compressor object, so it is safe
+    to run on a worker thread; zlib and lzma release the GIL while
+    compressing.
+
+    Args:
+        file_path: File to compress
+        arcname: Name of the member inside the archive
+        method: zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED or zipfile.ZIP_LZMA
+        level: Deflate compression level (ignored for other methods)
+        st: The file's stat result if already known (its mtime and mode
+            are recorded in the archive)
+        transform: Called with file_path to open the content to store
+                   instead of the file itself, e.g. NotebookSlimmer.open
+
+    Returns:
+        The compressed member
+    """
+    started = time.perf_counter()
+    data = tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_SIZE)
+    if method == zipfile.ZIP_DEFLATED:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    elif method == zipfile.ZIP_LZMA:
+        compressor = zipfile.LZMACompressor()
+    else:
+        compressor = None
+    digest = hashlib.sha256()
+    crc = 0
+    file_size = 0
+
+    with (transform(file_path) if transform else open(file_path, 'rb')) as f:
+        if st is None:
+            st = os.stat(file_path) if transform else os.fstat(f.fileno())
+        for block in iter(lambda: f.read(ZIP_READ_SIZE), b''):
+            digest.update(block)
+            crc = zlib.crc32(block, crc)
+            file_size += len(block)
+            data.write(compressor.compress(block) if compressor else block)
+    if compressor:
+        data.write(compressor.flush())
+
+    compress_size = data.tell()
+    data.seek(0)
+
+    return ZipMember(
+        arcname=arcname,
+        date_time=zip_date_time(st),
+        external_attr=(st.st_mode & 0xFFFF) << 16,
+        method=method,
+        crc=crc,
+        file_size=file_size,
+        compress_size=compress_size,
+        data=data,
+        sha256=digest.hexdigest(),
+        elapsed=time.perf_counter() - started,
+    )
+
+
+# Notebook outputs larger than this are replaced by a note when slimming
+NOTEBOOK_MAX_OUTPUT = 256 * 1024
+
+# Editor state and timings in cell and notebook metadata, dropped when slimming
+VOLATILE_CELL_METADATA = ('execution', 'ExecuteTime', 'collapsed', 'scrolled', 'jupyter')
+VOLATILE_NOTEBOOK_METADATA = ('widgets',)
+
+
+class _JSONStream:
+    """Reads one JSON value after another from a text file without loading all of it."""
+
+    def __init__(self, f, chunk_size: int = ZIP_READ_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size: int) -> bool:
+        """Append at least size characters if the file has them; False at end of file."""
+        chunk = self.f.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """The next non-whitespace character ('' at end of file)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill(self.chunk_size):
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, allowed: str) -> str:
+        """Consume the next character, which must be one of allowed."""
+        char = self.peek()
+        if not char or char not in allowed:
+            raise ValueError(f"Expected one of {allowed!r} in notebook JSON, found {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next value, reading more of the file until it is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Read as much again as is buffered, so a large value costs
+                # a few decode attempts rather than one per chunk
+                if not self._fill(max(self.chunk_size, len(self.buffer) - self.pos)):
+                    raise
+                continue
+            if end == len(self.buffer) and not self.eof and self._fill(self.chunk_size):
+                continue  # a number may continue in the next chunk
+            self.pos = end
+            return value
+
+
+class NotebookSlimmer:
+    """
+    Shrinks Jupyter notebooks before they are archived.
+
+    Outputs whose JSON exceeds max_output bytes are replaced by a short
+    note (stream output keeps its beginning), images repeated within a
+    notebook are kept only the first time, and editor state such as
+    execution timings and widget state is dropped from the metadata. With
+    max_output 0 all outputs are removed. Cells are read one at a time, so
+    memory use is bounded by the largest cell rather than the notebook.
+    Files that are not valid notebook JSON are archived unchanged.
+    The instance can be shared by compression worker threads.
+    """
+
+    def __init__(self, max_output: int = NOTEBOOK_MAX_OUTPUT):
+        self.max_output = max_output
+        # Recorded by the archive cache, so slimmed and original contents are told apart
+        self.key = f'slim-{max_output}'
+        self.notebooks = 0
+        self.original_size = 0
+        self.slimmed_size = 0
+        self.unparsed: Set[str] = set()  # paths archived unchanged as they are not notebook JSON
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def applies(file_path: Union[str, Path]) -> bool:
+        return str(file_path).lower().endswith('.ipynb')
+
+    def record(self, original_size: int, slimmed_size: int):
+        """Count one slimmed notebook."""
+        with self._lock:
+            self.notebooks += 1
+            self.original_size += original_size
+            self.slimmed_size += slimmed_size
+
+    def open(self, file_path: Union[str, Path]) -> BinaryIO:
+        """Open the slimmed notebook for reading (the original file if it cannot be parsed)."""
+        output = tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_SIZE)
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                self._slim(_JSONStream(f), output)
+        except (ValueError, UnicodeDecodeError, RecursionError):
+            output.close()
+            with self._lock:
+                self.unparsed.add(str(file_path))
+            return open(file_path, 'rb')
+
+        self.record(os.path.getsize(file_path), output.tell())
+        output.seek(0)
+        return output
+
+    def _slim(self, stream: _JSONStream, output: BinaryIO):
+        """Copy a notebook from stream to output, slimming it on the way."""
+        def write(text: str):
+            output.write(text.encode('utf-8'))
+
+        def dump(value: Any, indent: str) -> str:
+            # nbformat's layout (indent=1, sorted keys), nested below indent
+            return json.dumps(value, indent=1, sort_keys=True,
+                              ensure_ascii=False).replace('\n', '\n' + indent)
+
+        stream.expect('{')
+        write('{')
+        separator = '\n'
+        images: Dict[str, int] = {}
+        while stream.peek() != '}':
+            key = stream.value()
+            stream.expect(':')
+            write(f'{separator} {json.dumps(key)}: ')
+            separator = ',\n'
+            if key == 'cells':
+                stream.expect('[')
+                write('[')
+                number = 0
+                while stream.peek() != ']':
+                    number += 1
+                    cell = self._slim_cell(stream.value(), number, images)
+                    write(f"{',' if number > 1 else ''}\n  {dump(cell, '  ')}")
+                    if stream.expect(',]') == ']':
+                        break
+                else:
+                    stream.expect(']')
+                write('\n ]')
+            else:
+                value = stream.value()
+                if key == 'metadata' and isinstance(value, dict):
+                    value = {k: v for k, v in value.items() if k not in VOLATILE_NOTEBOOK_METADATA}
+                write(dump(value, ' '))
+            if stream.expect(',}') == '}':
+                break
+        else:
+            stream.expect('}')
+        write('\n}\n')
+        if stream.peek():
+            raise ValueError("Trailing data after notebook JSON")
+
+    def _slim_cell(self, cell: Any, number: int, images: Dict[str, int]) -> Any:
+        """Slim one cell; images maps digests of images seen so far to their cell numbers."""
+        if not isinstance(cell, dict):
+            raise ValueError("Notebook cell is not an object")
+        if isinstance(cell.get('metadata'), dict):
+            cell['metadata'] = {k: v for k, v in cell['metadata'].items()
+                                if k not in VOLATILE_CELL_METADATA}
+        outputs = cell.get('outputs')
+        if not isinstance(outputs, list):
+            return cell
+        if self.max_output == 0:
+            cell['outputs'] = []
+            return cell
+
+        slimmed = []
+        for output in outputs:
+            if isinstance(output, dict) and isinstance(output.get('data'), dict):
+                self._dedupe_images(output, number, images)
+            size = len(json.dumps(output, ensure_ascii=False).encode('utf-8'))
+            if size > self.max_output and isinstance(output, dict):
+                output = self._cap_output(output, size)
+            slimmed.append(output)
+        cell['outputs'] = slimmed
+        return cell
+
+    @staticmethod
+    def _dedupe_images(output: Dict[str, Any], number: int, images: Dict[str, int]):
+        """Replace images already seen in an earlier cell by a note."""
+        data = output['data']
+        for mime in [m for m in data if m.startswith('image/')]:
+            content = data[mime]
+            content = ''.join(content) if isinstance(content, list) else str(content)
+            digest = hashlib.sha1(content.encode('utf-8')).hexdigest()
+            if digest not in images:
+                images[digest] = number
+                continue
+            del data[mime]
+            if isinstance(output.get('metadata'), dict):
+                output['metadata'].pop(mime, None)
+            data['text/plain'] = [f"[same image as in cell {images[digest]}, removed by submit.py]"]
+
+    def _cap_output(self, output: Dict[str, Any], size: int) -> Dict[str, Any]:
+        """Shorten or replace one output that is larger than max_output."""
+        note = f"[{size / 1024:.0f} KB of output removed by submit.py]"
+        if output.get('output_type') == 'stream':
+            text = output.get('text', '')
+            text = ''.join(text) if isinstance(text, list) else str(text)
+            keep = text[:self.max_output // 2]
+            return {**output, 'text': [keep, f"\n... {note}\n"]}
+        if 'data' in output:
+            return {**output, 'data': {'text/plain': [note]}, 'metadata': {}}
+        return output
+
+
+# Formats that are already compressed and barely shrink when deflated again
+INCOMPRESSIBLE_EXTENSIONS = {
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.heic', '.mp3', '.mp4', '.m4a',
+    '.mov', '.avi', '.mkv', '.webm', '.ogg', '.flac', '.zip', '.gz', '.tgz',
+    '.bz2', '.xz', '.lzma', '.zst', '.7z', '.rar', '.jar', '.whl', '.npz',
+    '.pt', '.pth', '.ckpt', '.pkl', '.h5', '.keras', '.onnx', '.parquet',
+    '.docx', '.xlsx', '.pptx', '.pdf',
+}
+
+# Extensions known to compress well, so they are never sampled
+COMPRESSIBLE_EXTENSIONS = {
+    '.py', '.ipynb', '.txt', '.md', '.csv', '.tsv', '.json', '.jsonl', '.xml',
+    '.html', '.css', '.js', '.ts', '.tsx', '.c', '.h', '.cpp', '.java', '.r',
+    '.sql', '.yaml', '.yml', '.toml', '.cfg', '.ini', '.log', '.tex', '.svg',
+}
+
+COMPRESSION_SAMPLE_SIZE = 64 * 1024
+COMPRESSION_SAMPLE_RATIO = 0.9
+
+METHOD_NAMES = {
+    zipfile.ZIP_STORED: 'Stored',
+    zipfile.ZIP_DEFLATED: 'Deflate',
+    zipfile.ZIP_LZMA: 'LZMA',
+}
+
+
+class CompressionPolicy:
+    """
+    Chooses a zip compression method for each file.
+
+    Files with a known compressed format (images, archives, checkpoints, ...)
+    are stored as-is. Files with other unknown extensions are sampled: if
+    the first COMPRESSION_SAMPLE_SIZE bytes do not shrink below
+    COMPRESSION_SAMPLE_RATIO at deflate level 1 they are stored too.
+    Everything else is compressed according to the policy name:
+
+        fast      deflate level 1
+        balanced  deflate level 6 (zipfile's default)
+        max       LZMA (smallest, but needs an unzip tool with LZMA support)
+    """
+
+    PRESETS = {
+        'fast': (zipfile.ZIP_DEFLATED, 1),
+        'balanced': (zipfile.ZIP_DEFLATED, 6),
+        'max': (zipfile.ZIP_LZMA, 0),
+    }
+
+    def __init__(self, name: str = 'balanced', slimmer: Optional[NotebookSlimmer] = None):
+        """
+        Args:
+            name: Preset name
+            slimmer: Applied to notebooks before they are compressed
+        """
+        if name not in self.PRESETS:
+            raise ValueError(f"Unknown compression policy '{name}'")
+        self.name = name
+        self.slimmer = slimmer
+
+    def transform_for(self, file_path: Union[str, Path]) -> Optional[NotebookSlimmer]:
+        """The slimmer to apply to a file, if any."""
+        if self.slimmer is not None and self.slimmer.applies(file_path):
+            return self.slimmer
+        return None
+
+    def choose(self, file_path: Union[str, Path]) -> tuple:
+        """
+        Pick the compression for one file.
+
+        Args:
+            file_path: File about to be added to the archive
+
+        Returns:
+            (method, level) tuple
+        """
+        extension = os.path.splitext(str(file_path))[1].lower()
+        if extension in INCOMPRESSIBLE_EXTENSIONS:
+            return zipfile.ZIP_STORED, 0
+        if extension not in COMPRESSIBLE_EXTENSIONS:
+            with open(file_path, 'rb') as f:
+                sample = f.read(COMPRESSION_SAMPLE_SIZE)
+            if len(zlib.compress(sample, 1)) > len(sample) * COMPRESSION_SAMPLE_RATIO:
+                return zipfile.ZIP_STORED, 0
+        return self.PRESETS[self.name]
+
+    def compress(self, file_path: Union[str, Path], arcname: str,
+                 st: Optional[os.stat_result] = None) -> ZipMember:
+        """Compress one file with the method chosen for it."""
+        method, level = self.choose(file_path)
+        slimmer = self.transform_for(file_path)
+        return compress_zip_member(file_path, arcname, method, level, st,
+                                   slimmer.open if slimmer else None)
+
+
+class ZipStreamWriter:
+    """
+    Minimal zip writer for pre-compressed members.
+
+    Because each member's CRC and sizes are known before it is written, no
+    data descriptors or seeking are needed, so the output may be any
+    writable binary stream (a file, a ChunkPipe, ...). The output bytes
+    depend only on the members and their order, which keeps archives built
+    with one or many compression workers identical. ZIP64 records are
+    emitted only when sizes, offsets or the entry count require them.
+    """
+
+    def __init__(self, fp: BinaryIO, create_system: Optional[int] = None):
+        """
+        Args:
+            fp: Output stream
+            create_system: "Made by" host system recorded for each member
+                           (0 MS-DOS, 3 Unix; the current system's if omitted)
+        """
+        self.fp = fp
+        self.offset = 0
+        self._central_dir: List[bytes] = []
+        self._create_system = create_system if create_system is not None else \
+            0 if sys.platform == 'win32' else 3
+
+    def _write(self, data: bytes):
+        self.fp.write(data)
+        self.offset += len(data)
+
+    def add(self, member: ZipMember):
+        """Write a member's local header and compressed data."""
+        name = member.arcname.encode('utf-8')
+        flag_bits = member.flag_bits
+        if member.method == zipfile.ZIP_LZMA:
+            # Streams written by zipfile.LZMACompressor end with an EOS marker
+            flag_bits |= 0x02
+        try:
+            member.arcname.encode('ascii')
+        except UnicodeEncodeError:
+            flag_bits |= 0x800
+
+        year, month, day, hour, minute, second = member.date_time
+        dos_date = (year - 1980) << 9 | month << 5 | day
+        dos_time = hour << 11 | minute << 5 | (second // 2)
+
+        version = 63 if member.method == zipfile.ZIP_LZMA else 20
+        header_offset = self.offset
+
+        local_extra = b''
+        file_size, compress_size = member.file_size, member.compress_size
+        if file_size > ZIP64_LIMIT or compress_size > ZIP64_LIMIT:
+            local_extra = struct.pack('<HHQQ', 1, 16, file_size, compress_size)
+            file_size = compress_size = 0xFFFFFFFF
+            version = max(version, 45)
+
+        self._write(struct.pack(
+            '<4s2B4HL2L2H', b'PK\x03\x04', version, 0, flag_bits, member.method,
+            dos_time, dos_date, member.crc, compress_size, file_size,
+            len(name), len(local_extra)))
+        self._write(name)
+        self._write(local_extra)
+
+        for block in iter(lambda: member.data.read(ZIP_READ_SIZE), b''):
+            self._write(block)
+        member.data.close()
+
+        central_values = []
+        file_size, compress_size = member.file_size, member.compress_size
+        if file_size > ZIP64_LIMIT or compress_size > ZIP64_LIMIT:
+            central_values += [file_size, compress_size]
+            file_size = compress_size = 0xFFFFFFFF
+        if header_offset > ZIP64_LIMIT:
+            central_values.append(header_offset)
+            header_offset = 0xFFFFFFFF
+        central_extra = b''
+        if central_values:
+            central_extra = struct.pack(f'<HH{len(central_values)}Q', 1,
+                                        8 * len(central_values), *central_values)
+            version = max(version, 45)
+
+        self._central_dir.append(struct.pack(
+            '<4s4B4HL2L5H2L', b'PK\x01\x02', version, self._create_system, version, 0,
+            flag_bits, member.method, dos_time, dos_date, member.crc,
+            compress_size, file_size, len(name), len(central_extra), 0, 0, 0,
+            member.external_attr, header_offset) + name + central_extra)
+
+    def close(self):
+        """Write the central directory and end-of-archive records."""
+        start_dir = self.offset
+        for record in self._central_dir:
+            self._write(record)
+        size_dir = self.offset - start_dir
+        count = len(self._central_dir)
+
+        if count > 0xFFFF or start_dir > ZIP64_LIMIT or size_dir > ZIP64_LIMIT:
+            zip64_offset = self.offset
+            self._write(struct.pack('<4sQ2H2L4Q', b'PK\x06\x06', 44, 45, 45, 0, 0,
+                                    count, count, size_dir, start_dir))
+            self._write(struct.pack('<4sLQL', b'PK\x06\x07', 0, zip64_offset, 1))
+            count = min(count, 0xFFFF)
+            start_dir = min(start_dir, 0xFFFFFFFF)
+            size_dir = min(size_dir, 0xFFFFFFFF)
+
+        self._write(struct.pack('<4s4H2LH', b'PK\x05\x06', 0, 0, count, count,
+                                size_dir, start_dir, 0))
+        self.fp.flush()
+
+
+CACHE_DIR = Path.home() / '.aibootcamp' / 'cache'
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024
+
+
+class ArchiveCache:
+    """
+    Cache of compressed zip members, reused across runs on the same directory.
+
+    Each submitted directory gets a manifest recording, for every member,
+    the file's size, mtime and SHA-256. Compressed member data is stored
+    once per (content hash, method, level) under CACHE_DIR/members and
+    shared by all manifests. When a file's size and mtime still match its
+    manifest entry, the stored bytes are copied into the new archive
+    without reading or recompressing the file.
+
+    Stored members are evicted least-recently-used first once their total
+    size exceeds max_bytes. Entries whose mtime is too close to the time
+    the manifest was written are always re-read, since a same-size edit
+    within the filesystem's timestamp granularity would otherwise go unseen.
+    All methods are safe to call from compression worker threads.
+    """
+
+    # Files modified this close to the manifest write time are re-read
+    RACY_WINDOW_NS = 2 * 10**9
+
+    def __init__(self, directory_path: Path, root: Path = CACHE_DIR,
+                 max_bytes: int = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            directory_path: Resolved directory being archived
+            root: Cache directory
+            max_bytes: Total size budget for stored members
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.members_dir = self.root / 'members'
+        self.index_path = self.root / 'index.json'
+        key = hashlib.sha1(str(directory_path).encode('utf-8')).hexdigest()
+        self.manifest_path = self.root / 'manifests' / f'{key}.json'
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] = _load_json_file(self.index_path)
+        manifest = _load_json_file(self.manifest_path)
+        self._written_ns = manifest.get('writtenAt', 0)
+        self._old_files: Dict[str, Dict[str, Any]] = manifest.get('files', {})
+        self._new_files: Dict[str, Dict[str, Any]] = {}
+
+    def _blob_path(self, key: str) -> Path:
+        return self.members_dir / key[:2] / key
+
+    def known_digest(self, arcname: str, st: os.stat_result,
+                     transform: Optional[str] = None) -> Optional[str]:
+        """
+        SHA-256 of a member recorded by an earlier run, if its file has not
+        changed since and was stored with the same transform (e.g. the key
+        of a NotebookSlimmer).
+        """
+        entry = self._old_files.get(arcname)
+        if (entry and entry['size'] == st.st_size and entry['mtime'] == st.st_mtime_ns
+                and entry.get('transform') == transform
+                and st.st_mtime_ns < self._written_ns - self.RACY_WINDOW_NS):
+            return entry['sha256']
+        return None
+
+    def get_member(self, file_path: Union[str, Path], arcname: str,
+                   policy: CompressionPolicy, st: Optional[os.stat_result] = None) -> ZipMember:
+        """
+        Return a ZipMember for a file, from the cache when possible.
+
+        Args:
+            file_path: File to add to the archive
+            arcname: Name of the member inside the archive
+            policy: Compression policy used for files that must be compressed
+            st: The file's stat result, if the caller already has it
+
+        Returns:
+            The compressed member (its data may be a cached file)
+        """
+        if st is None:
+            st = os.stat(file_path)
+        slimmer = policy.transform_for(file_path)
+        transform = slimmer.key if slimmer else None
+        entry = self._old_files.get(arcname)
+        if (entry and entry['size'] == st.st_size and entry['mtime'] == st.st_mtime_ns
+                and entry.get('policy') == policy.name and entry.get('transform') == transform
+                and st.st_mtime_ns < self._written_ns - self.RACY_WINDOW_NS):
+            method, level = entry['method'], entry['level']
+            key = f"{entry['sha256']}-{method}-{level}"
+            with self._lock:
+                info = self._index.get(key)
+            if info is not None:
+                try:
+                    data = open(self._blob_path(key), 'rb')
+                except OSError:
+                    data = None
+                if data is not None and os.fstat(data.fileno()).st_size != info['size']:
+                    # Truncated or replaced behind our back; compress the file again
+                    data.close()
+                    data = None
+                    with self._lock:
+                        self._index.pop(key, None)
+                if data is not None:
+                    with self._lock:
+                        info['lastUsed'] = time.time()
+                        self._new_files[arcname] = entry
+                        self.hits += 1
+                    file_size = entry.get('memberSize', st.st_size)
+                    if 'memberSize' in entry:
+                        slimmer.record(st.st_size, file_size)
+                    return ZipMember(
+                        arcname=arcname,
+                        date_time=zip_date_time(st),
+                        external_attr=(st.st_mode & 0xFFFF) << 16,
+                        method=method,
+                        crc=info['crc'],
+                        file_size=file_size,
+                        compress_size=info['size'],
+                        data=data,
+                        sha256=entry['sha256'],
+                    )
+
+        method, level = policy.choose(file_path)
+        member = compress_zip_member(file_path, arcname, method, level, st,
+                                     slimmer.open if slimmer else None)
+        key = f'{member.sha256}-{method}-{level}'
+        blob_path = self._blob_path(key)
+        with self._lock:
+            known = key in self._index
+        if not known:
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = blob_path.with_name(f'{key}.{threading.get_ident()}.tmp')
+            with open(tmp_path, 'wb') as f:
+                shutil.copyfileobj(member.data, f, ZIP_READ_SIZE)
+            os.replace(tmp_path, blob_path)
+            member.data.seek(0)
+
+        with self._lock:
+            self._index[key] = {
+                'size': member.compress_size,
+                'crc': member.crc,
+                'lastUsed': time.time(),
+            }
+            self._new_files[arcname] = {
+                'size': st.st_size,
+                'mtime': st.st_mtime_ns,
+                'sha256': member.sha256,
+                'policy': policy.name,
+                'method': method,
+                'level': level,
+            }
+            if slimmer:
+                self._new_files[arcname]['transform'] = transform
+                if str(file_path) not in slimmer.unparsed:
+                    self._new_files[arcname]['memberSize'] = member.file_size
+            self.misses += 1
+        return member
+
+    def save(self):
+        """Write this run's manifest and evict members over the size budget."""
+        try:
+            with self._lock:
+                _write_json_file(self.manifest_path, {
+                    'writtenAt': time.time_ns(),
+                    'files': self._new_files,
+                })
+                # Keep members recorded by other runs since this one started
+                for key, info in _load_json_file(self.index_path).items():
+                    if key not in self._index or self._index[key]['lastUsed'] < info['lastUsed']:
+                        self._index[key] = info
+
+                total = sum(info['size'] for info in self._index.values())
+                for key, info in sorted(self._index.items(), key=lambda item: item[1]['lastUsed']):
+                    if total <= self.max_bytes:
+                        break
+                    try:
+                        os.remove(self._blob_path(key))
+                    except OSError:
+                        pass
+                    total -= info['size']
+                    del self._index[key]
+                _write_json_file(self.index_path, self._index)
+        except OSError as e:
+            print(f"Warning: Failed to update archive cache in {self.root}: {e}")
+
+
+def _compress_members(entries: Any, jobs: int = 1, compress: Any = compress_zip_member):
+    """
+    Compress (file_path, arcname, stat result) entries, yielding ZipMembers in input order.
+
+    With jobs > 1 the files are compressed on a thread pool. At most
+    2 * jobs members are in flight at once, so memory stays bounded while
+    results are still handed out in the original order. compress is called
+    as compress(file_path, arcname, st=st), e.g. CompressionPolicy.compress.
+    """
+    if jobs <= 1:
+        for file_path, arcname, st in entries:
+            yield compress(file_path, arcname, st=st)
+        return
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending: collections.deque = collections.deque()
+        for file_path, arcname, st in entries:
+            pending.append(executor.submit(compress, file_path, arcname, st=st))
+            if len(pending) >= jobs * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+DEFAULT_EXCLUDE_PATTERNS = [
+    '__pycache__', '*.pyc', '*.pyo', '.git', '.gitignore', '.submitignore',
+    '.DS_Store', 'node_modules', '.env', 'venv', '.venv',
+    '*.egg-info', '.pytest_cache', '.coverage'
+]
+
+# Per-directory ignore files honoured while walking, in increasing precedence
+IGNORE_FILES = ('.gitignore', '.submitignore')
+
+
+def _translate_glob(pattern: str) -> str:
+    """Translate one gitignore glob into a regular expression fragment."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        at_segment_start = i == 0 or pattern[i - 1] == '/'
+        if at_segment_start and pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif at_segment_start and pattern.startswith('**', i) and i + 2 == n:
+            out.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            out.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            out.append('[^/]')
+            i += 1
+        elif pattern[i] == '[':
+            j = i + 1
+            if j < n and pattern[j] in '!^':
+                j += 1
+            if j < n and pattern[j] == ']':
+                j += 1
+            while j < n and pattern[j] != ']':
+                j += 1
+            if j >= n:
+                out.append(re.escape('['))
+                i += 1
+                continue
+            body = pattern[i + 1:j].replace('\\', '\\\\')
+            if body[0] in '!^':
+                body = '^' + body[1:]
+            out.append(f'(?!/)[{body}]')
+            i = j + 1
+        elif pattern[i] == '\\' and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return ''.join(out)
+
+
+class IgnoreMatcher:
+    """
+    Compiled gitignore-style exclusion rules.
+
+    Patterns follow .gitignore semantics: a leading '!' negates, a trailing
+    '/' only matches directories, a '/' anywhere else anchors the pattern to
+    the directory the rules came from, and '**' matches across directories.
+    The last matching rule wins. Consecutive rules with the same polarity are
+    merged into one alternation regex, so a lookup costs a regex match per
+    run of rules instead of one per pattern. Matchers are immutable; extend()
+    returns a new matcher, which lets a directory walk hand each
+    subdirectory the rules in effect for it.
+    """
+
+    def __init__(self, rules: Optional[List[tuple]] = None):
+        """
+        Args:
+            rules: Ordered (negate, regex_source) pairs
+        """
+        self.rules = list(rules or [])
+        self._runs: List[tuple] = []
+        for negate, source in self.rules:
+            if self._runs and self._runs[-1][0] == negate:
+                self._runs[-1][1].append(source)
+            else:
+                self._runs.append((negate, [source]))
+        self._runs = [
+            (negate, re.compile('|'.join(f'(?:{source})' for source in sources)))
+            for negate, sources in reversed(self._runs)
+        ]
+
+    def extend(self, patterns: List[str], base: str = '') -> 'IgnoreMatcher':
+        """
+        Return a matcher with additional rules appended.
+
+        Args:
+            patterns: Lines in .gitignore syntax (blank lines and comments allowed)
+            base: Directory the patterns are relative to, as a '/'-terminated
+                  path relative to the walk root ('' for the root itself)
+
+        Returns:
+            New matcher; self is left unchanged
+        """
+        rules = list(self.rules)
+        prefix = re.escape(base)
+        for line in patterns:
+            line = line.rstrip('\n')
+            if not line.endswith('\\ '):
+                line = line.rstrip(' ')
+            if not line or line.startswith('#'):
+                continue
+
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            elif line.startswith('\\#') or line.startswith('\\!'):
+                line = line[1:]
+
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+
+            if '/' in line:
+                glob = _translate_glob(line.lstrip('/'))
+                source = f'^{prefix}{glob}'
+            else:
+                source = f'^{prefix}(?:.*/)?{_translate_glob(line)}'
+            source += '/$' if dir_only else '/?$'
+            rules.append((negate, source))
+
+        return IgnoreMatcher(rules)
+
+    def is_excluded(self, relpath: str, is_dir: bool = False) -> bool:
+        """
+        Check a path against the rules.
+
+        Args:
+            relpath: '/'-separated path relative to the walk root
+            is_dir: Whether the path is a directory
+
+        Returns:
+            True if the path should be left out of the archive
+        """
+        if is_dir:
+            relpath += '/'
+        for negate, regex in self._runs:
+            if regex.match(relpath):
+                return not negate
+        return False
+
+
+def walk_submission_files(directory_path: Path, exclude_patterns: List[str],
+                          use_ignore_files: bool = True, skipped: Optional[List[tuple]] = None,
+                          ignored: Optional[List[str]] = None):
+    """
+    Walk a submission directory, skipping excluded files and directories.
+
+    Excluded directories are pruned so their contents are never listed.
+    .gitignore and .submitignore files found along the way add rules for
+    their own subtree, on top of exclude_patterns. Symbolic links to
+    directories are followed if they lead to another directory inside
+    directory_path (so a link to the home directory cannot pull in saved
+    sessions and the like); FIFOs, sockets, devices and broken links are
+    passed over. The
+    walk uses os.scandir, so each file is stat'ed exactly once and the
+    result is handed on for the archive writer and cache to reuse.
+
+    Args:
+        directory_path: Resolved directory to walk
+        exclude_patterns: Patterns in .gitignore syntax applied everywhere
+        use_ignore_files: Whether to honour .gitignore/.submitignore files
+        skipped: List to append (arcname, reason) to for every file or
+                 directory left out for a reason other than the patterns
+        ignored: List to append the arcname of every file and directory
+                 (with a trailing '/') to that is left out by the rules of
+                 ignore files but not by exclude_patterns
+
+    Yields:
+        (file_path, arcname, os.stat_result) tuples; arcnames start with the
+        directory's name
+    """
+    if skipped is None:
+        skipped = []
+    if ignored is None:
+        ignored = []
+    root_matcher = IgnoreMatcher().extend(exclude_patterns)
+    root_st = os.stat(directory_path)
+    root_real = os.path.realpath(directory_path)
+    # (directory, relative prefix, matcher, identities of it and its parents)
+    stack = [(str(directory_path), '', root_matcher, frozenset([(root_st.st_dev, root_st.st_ino)]))]
+
+    while stack:
+        root, prefix, matcher, ancestors = stack.pop()
+        try:
+            with os.scandir(root) as it:
+                entries = list(it)
+        except OSError as e:
+            skipped.append((f'{directory_path.name}/{prefix}', f'cannot be read ({e.strerror})'))
+            continue
+
+        if use_ignore_files:
+            names = {entry.name for entry in entries}
+            for name in IGNORE_FILES:
+                if name in names:
+                    with open(os.path.join(root, name), 'r', encoding='utf-8', errors='replace') as f:
+                        matcher = matcher.extend(f.readlines(), base=prefix)
+
+        subdirs = []
+        for entry in entries:
+            arcname = f'{directory_path.name}/{prefix}{entry.name}'
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+
+            if is_dir:
+                if matcher.is_excluded(prefix + entry.name, is_dir=True):
+                    if not root_matcher.is_excluded(prefix + entry.name, is_dir=True):
+                        ignored.append(arcname + '/')
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError as e:
+                    skipped.append((arcname + '/', f'cannot be read ({e.strerror})'))
+                    continue
+                if entry.is_symlink():
+                    target = os.path.realpath(entry.path)
+                    if target != root_real and not target.startswith(os.path.join(root_real, '')):
+                        skipped.append((arcname + '/', 'symbolic link outside the directory'))
+                        continue
+                identity = (st.st_dev, st.st_ino)
+                if identity in ancestors:
+                    skipped.append((arcname + '/', 'symbolic link loop'))
+                    continue
+                subdirs.append((entry.path, f'{prefix}{entry.name}/', matcher, ancestors | {identity}))
+                continue
+
+            # Skip excluded files
+            if matcher.is_excluded(prefix + entry.name):
+                if not root_matcher.is_excluded(prefix + entry.name):
+                    ignored.append(arcname)
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                skipped.append((arcname, 'broken symbolic link'))
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                skipped.append((arcname, 'not a regular file'))
+                continue
+            yield Path(entry.path), arcname, st
+
+        # Same order as a top-down os.walk
+        stack.extend(reversed(subdirs))
+
+
+# Default budgets for the files of a submission (0 means no limit)
+DEFAULT_MAX_FILE_SIZE = 100 * 1024 * 1024
+DEFAULT_MAX_TOTAL_SIZE = 500 * 1024 * 1024
+
+# Files listed by SubmissionScan.print_report
+LARGEST_FILES_SHOWN = 5
+
+# The largest files are only listed for submissions at least this large
+LARGEST_FILES_MIN_TOTAL = 1024 * 1024
+
+
+def _format_size(size: float) -> str:
+    """Human-readable size, e.g. 3.2 MB."""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class SubmissionScan:
+    """The files of a submission directory, found and sized before archiving."""
+
+    def __init__(self, directory_path: Path):
+        self.directory_path = directory_path
+        # (file_path, arcname, os.stat_result) in archive order
+        self.files: List[tuple] = []
+        # (arcname, reason) of files and directories left out
+        self.skipped: List[tuple] = []
+        # Arcnames of files and directories (ending in '/') left out by
+        # .gitignore/.submitignore rules
+        self.ignored: List[str] = []
+        self.total_size = 0
+        self.seconds = 0.0
+
+    def largest(self, count: int = LARGEST_FILES_SHOWN) -> List[tuple]:
+        """(size, arcname) of the largest files, largest first."""
+        return heapq.nlargest(count, ((st.st_size, arcname) for _, arcname, st in self.files))
+
+    def print_report(self):
+        """Print what was found, the largest files and anything skipped."""
+        print(f"  Found {len(self.files)} file(s), {_format_size(self.total_size)}")
+        if self.total_size >= LARGEST_FILES_MIN_TOTAL and len(self.files) > 1:
+            print(f"  Largest files:")
+            for size, arcname in self.largest():
+                share = size / self.total_size * 100
+                print(f"    {_format_size(size):>9}  {share:4.0f}%  {arcname}")
+        for arcname, reason in self.skipped:
+            print(f"  ⚠ Skipped {arcname}: {reason}")
+        if self.ignored:
+            directories = sum(1 for arcname in self.ignored if arcname.endswith('/'))
+            files = len(self.ignored) - directories
+            print(f"  ⚠ Left out {files} file(s) and {directories} folder(s) listed in "
+                  f".gitignore/.submitignore (use --no-ignore-files to include them)")
+
+
+def scan_submission(directory: Union[str, Path], exclude_patterns: list = None,
+                    use_ignore_files: bool = True,
+                    max_file_size: int = DEFAULT_MAX_FILE_SIZE,
+                    max_total_size: int = DEFAULT_MAX_TOTAL_SIZE,
+                    skip_large_files: bool = False, **_: Any) -> SubmissionScan:
+    """
+    Find the files to submit and check them against the size budgets.
+
+    The walk stops with an error at the first file larger than
+    max_file_size (unless skip_large_files is set, in which case such
+    files are skipped and reported), or as soon as the files add up to
+    more than max_total_size, before anything has been compressed.
+
+    Args:
+        directory: Directory to scan
+        exclude_patterns: Patterns to exclude, in .gitignore syntax
+        use_ignore_files: Also honour .gitignore/.submitignore files
+        max_file_size: Largest file to include in bytes (0 for no limit)
+        max_total_size: Largest total size of the files in bytes (0 for no
+                        limit)
+        skip_large_files: Leave out files larger than max_file_size instead
+                          of stopping
+        **_: Other archive options, ignored
+
+    Returns:
+        The scan result
+
+    Raises:
+        ArchiveError: If the directory does not exist, is not a directory,
+                      cannot be read, holds a file larger than
+                      max_file_size or exceeds max_total_size
+    """
+    if exclude_patterns is None:
+        exclude_patterns = DEFAULT_EXCLUDE_PATTERNS
+
+    directory_path = resolve_directory(directory)
+    scan = SubmissionScan(directory_path)
+    started = time.perf_counter()
+    try:
+        for file_path, arcname, st in walk_submission_files(directory_path, exclude_patterns,
+                                                            use_ignore_files, scan.skipped,
+                                                            scan.ignored):
+            if max_file_size and st.st_size > max_file_size:
+                if not skip_large_files:
+                    raise ArchiveError(f"{arcname} ({_format_size(st.st_size)}) is larger than the "
+                                       f"{_format_size(max_file_size)} limit of --max-file-size; "
+                                       f"exclude it, raise the limit or pass --skip-large-files")
+                scan.skipped.append((arcname, f'{_format_size(st.st_size)} is more than the '
+                                              f'{_format_size(max_file_size)} limit of --max-file-size'))
+                continue
+            scan.files.append((file_path, arcname, st))
+            scan.total_size += st.st_size
+            if max_total_size and scan.total_size > max_total_size:
+                largest = ', '.join(f'{arcname} ({_format_size(size)})'
+                                    for size, arcname in scan.largest(3))
+                raise ArchiveError(f"Directory holds more than the {_format_size(max_total_size)} "
+                                   f"submission size limit (largest files: {largest}); "
+                                   f"exclude what is not needed or raise --max-total-size")
+    except OSError as e:
+        raise ArchiveError(f"Cannot read {directory}: {e}")
+    scan.seconds = time.perf_counter() - started
+    return scan
+
+
+class ArchiveError(Exception):
+    """A directory that cannot be archived (missing, unreadable, over a size budget) or volumes that cannot be joined."""
+
+
+class ArchiveStats:
+    """Summary of one build_zip_archive run."""
+
+    def __init__(self, directory_path: Path):
+        self.directory_path = directory_path
+        self.file_count = 0
+        self.total_size = 0
+        self.zip_size = 0
+        self.cache_hits: Optional[int] = None
+        # Time spent finding files (compression time is in methods)
+        self.walk_seconds = 0.0
+        # Method name -> [files, original bytes, compressed bytes, seconds]
+        self.methods: Dict[str, List[float]] = {}
+        # (notebooks, bytes before, bytes after) if notebooks were slimmed
+        self.notebooks: Optional[tuple] = None
+
+    def add(self, member: ZipMember):
+        """Account for one member written to the archive."""
+        self.file_count += 1
+        self.total_size += member.file_size
+        name = METHOD_NAMES.get(member.method, str(member.method))
+        stats = self.methods.setdefault(name, [0, 0, 0, 0.0])
+        stats[0] += 1
+        stats[1] += member.file_size
+        stats[2] += member.compress_size
+        stats[3] += member.elapsed
+
+    def print_summary(self):
+        """Print the archive statistics below a 'Zip archive created' line."""
+        print(f"  Files: {self.file_count}")
+        print(f"  Original size: {self.total_size / 1024:.1f} KB")
+        print(f"  Compressed size: {self.zip_size / 1024:.1f} KB")
+        if self.total_size > 0:
+            print(f"  Compression ratio: {(1 - self.zip_size/self.total_size)*100:.1f}%")
+        for name, (count, original, compressed, elapsed) in sorted(self.methods.items()):
+            print(f"  {name}: {count} file(s), {original / 1024:.1f} KB -> "
+                  f"{compressed / 1024:.1f} KB in {elapsed:.2f}s")
+        if self.cache_hits is not None:
+            print(f"  Reused from cache: {self.cache_hits} of {self.file_count} file(s)")
+        if self.notebooks and self.notebooks[0]:
+            count, before, after = self.notebooks
+            print(f"  Notebooks slimmed: {count} file(s), {_format_size(before)} -> "
+                  f"{_format_size(after)} ({_format_size(before - after)} saved)")
+
+
+def resolve_directory(directory: str) -> Path:
+    """
+    Resolve a directory to archive.
+
+    Raises:
+        ArchiveError: If it does not exist or is not a directory
+    """
+    directory_path = Path(directory).resolve()
+    if not directory_path.exists():
+        raise ArchiveError(f"Directory not found: {directory}")
+
+    if not directory_path.is_dir():
+        raise ArchiveError(f"Path is not a directory: {directory}")
+
+    return directory_path
+
+
+def build_zip_archive(directory: str, output_path: Union[str, BinaryIO],
+                      exclude_patterns: list = None, jobs: int = 1,
+                      use_ignore_files: bool = True, use_cache: bool = False,
+                      cache_size: int = DEFAULT_CACHE_SIZE,
+                      compression: str = 'balanced',
+                      max_file_size: int = DEFAULT_MAX_FILE_SIZE,
+                      max_total_size: int = DEFAULT_MAX_TOTAL_SIZE,
+                      skip_large_files: bool = False,
+                      slim_notebooks: Optional[int] = None,
+                      reproducible: bool = False,
+                      scan: Optional[SubmissionScan] = None) -> ArchiveStats:
+    """
+    Create a zip archive from a directory without printing anything.
+
+    Args:
+        directory: Directory to zip
+        output_path: Path for the output zip file, or a writable binary file
+                     object (which need not be seekable, e.g. a ChunkPipe)
+        exclude_patterns: Patterns to exclude, in .gitignore syntax
+        jobs: Number of files to compress in parallel. The archive bytes are
+              the same for any value.
+        use_ignore_files: Also honour .gitignore/.submitignore files found
+                          in the directory
+        use_cache: Reuse compressed members of unchanged files from the
+                   ArchiveCache and update it afterwards
+        cache_size: Size budget of the archive cache in bytes
+        compression: CompressionPolicy name (fast, balanced or max)
+        max_file_size, max_total_size, skip_large_files: Size budgets, see
+            scan_submission
+        slim_notebooks: Slim .ipynb files with a NotebookSlimmer capping
+                        outputs at this many bytes (None to keep notebooks
+                        as they are)
+        reproducible: Make the archive bytes depend only on the files'
+                      contents and executable bits: members sorted by
+                      name, with the same timestamp (reproducible_date_time)
+                      and normalized permissions
+        scan: Result of an earlier scan_submission of the directory, which
+              then is not scanned again (exclusion and budget options are
+              ignored)
+
+    Returns:
+        Statistics about the archive
+
+    Raises:
+        ArchiveError: If the directory does not exist, is not a directory
+                      or exceeds a size budget
+        Exception: On any other failure while reading or writing files
+    """
+    if scan is None:
+        scan = scan_submission(directory, exclude_patterns, use_ignore_files,
+                               max_file_size, max_total_size, skip_large_files)
+    directory_path = scan.directory_path
+    stats = ArchiveStats(directory_path)
+    stats.walk_seconds = scan.seconds
+    slimmer = NotebookSlimmer(slim_notebooks) if slim_notebooks is not None else None
+    policy = CompressionPolicy(compression, slimmer)
+    cache = ArchiveCache(directory_path, max_bytes=cache_size) if use_cache else None
+    if cache:
+        compress = functools.partial(cache.get_member, policy=policy)
+    else:
+        compress = policy.compress
+
+    is_path = isinstance(output_path, (str, os.PathLike))
+    output = open(output_path, 'wb') if is_path else output_path
+    try:
+        entries = sorted(scan.files, key=lambda entry: entry[1]) if reproducible else scan.files
+        writer = ZipStreamWriter(output, create_system=3 if reproducible else None)
+        date_time = reproducible_date_time()
+        for (_, _, st), member in zip(entries, _compress_members(entries, jobs, compress)):
+            if reproducible:
+                member.date_time = date_time
+                member.external_attr = normalized_mode(st) << 16
+            writer.add(member)
+            stats.add(member)
+        writer.close()
+    finally:
+        if is_path:
+            output.close()
+
+    if cache:
+        cache.save()
+        stats.cache_hits = cache.hits
+    if slimmer:
+        stats.notebooks = (slimmer.notebooks, slimmer.original_size, slimmer.slimmed_size)
+
+    stats.zip_size = writer.offset
+    return stats
+
+
+# Changes are sent as a delta archive only while they add up to less than
+# this fraction of the submission's total size
+DELTA_MAX_FRACTION = 0.5
+
+
+def content_manifest(scan: SubmissionScan, cache: Optional['ArchiveCache'] = None,
+                     slimmer: Optional[NotebookSlimmer] = None) -> Dict[str, str]:
+    """
+    SHA-256 of every scanned file, as it would be archived.
+
+    Args:
+        scan: Files to hash
+        cache: Archive cache whose digests are used for files that have not
+               changed since it was written, instead of reading them
+        slimmer: Notebook slimmer the archive is built with, so notebooks
+                 are hashed in their slimmed form
+
+    Returns:
+        {arcname: hex digest}
+    """
+    manifest = {}
+    for file_path, arcname, st in scan.files:
+        slim = slimmer is not None and slimmer.applies(file_path)
+        transform = slimmer.key if slim else None
+        digest = cache.known_digest(arcname, st, transform) if cache else None
+        if not digest and slim:
+            hasher = hashlib.sha256()
+            with slimmer.open(file_path) as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    hasher.update(block)
+            digest = hasher.hexdigest()
+        manifest[arcname] = digest or file_sha256(file_path)
+    return manifest
+
+
+def archive_digest(scan: SubmissionScan, compression: str = 'balanced',
+                   cache: Optional['ArchiveCache'] = None,
+                   slimmer: Optional[NotebookSlimmer] = None) -> str:
+    """
+    Digest identifying the reproducible archive of the scanned files.
+
+    It covers everything the bytes of a build_zip_archive(reproducible=True)
+    archive depend on (member names, contents and normalized modes, the
+    timestamp and the compression preset) without compressing anything,
+    so it can be compared with an earlier submission before packing.
+
+    Args:
+        scan: Files to submit
+        compression: CompressionPolicy name the archive is built with
+        cache: Archive cache to take unchanged files' digests from
+        slimmer: Notebook slimmer the archive is built with
+
+    Returns:
+        Hex SHA-256
+    """
+    manifest = content_manifest(scan, cache, slimmer)
+    digest = hashlib.sha256(f"reproducible zip 1 {compression} {slimmer.key if slimmer else ''} "
+                            f"{reproducible_date_time()}\n".encode('utf-8'))
+    for _, arcname, st in sorted(scan.files, key=lambda entry: entry[1]):
+        digest.update(f"{normalized_mode(st):o} {manifest[arcname]} {arcname}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def plan_delta(scan: SubmissionScan, previous: Dict[str, str],
+               cache: Optional['ArchiveCache'] = None,
+               slimmer: Optional[NotebookSlimmer] = None) -> tuple:
+    """
+    Work out what changed since a previous submission.
+
+    Args:
+        scan: Files to submit now
+        previous: {arcname: SHA-256} of the previously submitted archive
+        cache: Archive cache to take unchanged files' digests from
+        slimmer: Notebook slimmer the archive is built with
+
+    Returns:
+        (SubmissionScan of the changed and added files, sorted list of
+        arcnames that are no longer present)
+    """
+    current = content_manifest(scan, cache, slimmer)
+    changed = SubmissionScan(scan.directory_path)
+    changed.files = [entry for entry in scan.files if previous.get(entry[1]) != current[entry[1]]]
+    changed.total_size = sum(st.st_size for _, _, st in changed.files)
+    changed.seconds = scan.seconds
+    return changed, sorted(set(previous) - set(current))
+
+
+# Watch mode checks the directory this often, and submits once it has not
+# changed for WATCH_QUIET_SECONDS
+WATCH_POLL_INTERVAL = 1.0
+WATCH_QUIET_SECONDS = 5.0
+
+
+def tree_snapshot(directory: Union[str, Path], exclude_patterns: list = None,
+                  use_ignore_files: bool = True, **_: Any) -> Dict[str, tuple]:
+    """
+    Size and modification time of every file that would be submitted.
+
+    Args:
+        directory: Submission directory
+        exclude_patterns, use_ignore_files: As for scan_submission (other
+            archive options are ignored)
+
+    Returns:
+        {arcname: (size, mtime in ns)}; an empty dict if the directory is
+        missing
+    """
+    if exclude_patterns is None:
+        exclude_patterns = DEFAULT_EXCLUDE_PATTERNS
+    try:
+        directory_path = resolve_directory(directory)
+        return {arcname: (st.st_size, st.st_mtime_ns) for _, arcname, st in
+                walk_submission_files(directory_path, exclude_patterns, use_ignore_files)}
+    except (ArchiveError, OSError):
+        return {}
+
+
+def _describe_changes(old: Dict[str, tuple], new: Dict[str, tuple]) -> str:
+    """Summary like '2 changed, 1 added' of the difference of two snapshots."""
+    added = sum(1 for name in new if name not in old)
+    removed = sum(1 for name in old if name not in new)
+    changed = sum(1 for name, value in new.items() if name in old and old[name] != value)
+    parts = [f"{count} {label}" for count, label in
+             ((changed, 'changed'), (added, 'added'), (removed, 'removed')) if count]
+    return ', '.join(parts) or 'no files changed'
+
+
+def watch_directory(directory: str, submit: Callable[[], bool],
+                    quiet_seconds: float = WATCH_QUIET_SECONDS,
+                    poll_interval: float = WATCH_POLL_INTERVAL,
+                    deadline: Optional[float] = None,
+                    snapshot: Optional[Dict[str, tuple]] = None,
+                    succeeded: bool = True, **archive_options: Any) -> bool:
+    """
+    Submit a directory again whenever its files change, until interrupted.
+
+    The tree is polled every poll_interval seconds by comparing file sizes
+    and modification times, which costs one stat per file. A burst of
+    edits (an editor saving several files, a notebook autosaving) is
+    submitted once, after nothing has changed for quiet_seconds. Files that
+    did not change are not compressed again as long as the archive cache is
+    enabled.
+
+    Args:
+        directory: Directory to watch
+        submit: Called to submit the directory; returns True on success
+        quiet_seconds: How long the tree must be unchanged before submitting
+        poll_interval: Seconds between checks
+        deadline: Time (as from time.time()) after which watching stops
+        snapshot: tree_snapshot taken before the last submission attempt
+                  (if omitted, the directory is submitted once it is quiet)
+        succeeded: Whether that attempt succeeded
+        **archive_options: Archive options, for the exclusion rules
+
+    Returns:
+        True if the last submission attempt succeeded
+    """
+    submitted = snapshot
+    current = tree_snapshot(directory, **archive_options)
+    changed_at = None if current == submitted else time.monotonic()
+    print(f"Watching {Path(directory).resolve()} for changes (Ctrl-C to stop)...")
+    try:
+        while True:
+            if deadline is not None and time.time() > deadline:
+                print(f"⚠ The assignment is now past due; stopped watching")
+                return succeeded
+
+            time.sleep(poll_interval)
+            latest = tree_snapshot(directory, **archive_options)
+            if latest != current:
+                if changed_at is None:
+                    print(f"Change detected ({_describe_changes(current, latest)}); "
+                          f"submitting once nothing changes for {quiet_seconds:g}s")
+                current, changed_at = latest, time.monotonic()
+                continue
+            if changed_at is None or time.monotonic() - changed_at < quiet_seconds:
+                continue
+
+            changed_at = None
+            if current == submitted:
+                print("Files are back to the last submitted version; nothing to submit")
+                continue
+            print()
+            succeeded = submit()
+            submitted = current
+            if succeeded:
+                print(f"✓ Resubmitted at {datetime.now().strftime('%H:%M:%S')}")
+            else:
+                print("✗ Resubmission failed; will try again after the next change")
+            print()
+            print(f"Watching {Path(directory).resolve()} for changes (Ctrl-C to stop)...")
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+        return succeeded
+
+
+VOLUMES_SUFFIX = '.volumes.json'
+
+
+def split_archive(zip_path: Union[str, Path], volume_size: int = MAX_UPLOAD_SIZE) -> List[Path]:
+    """
+    Cut a file into numbered volumes next to it, plus a manifest.
+
+    Volumes are named <name>.001, <name>.002, ... and are plain byte ranges
+    of the original, so concatenating them in order restores it. The
+    manifest (<name>.volumes.json) lists the original name, size and SHA-256
+    and those of each volume, for join_volumes to check.
+
+    Args:
+        zip_path: File to split
+        volume_size: Largest volume in bytes
+
+    Returns:
+        Paths of the manifest followed by the volumes
+    """
+    zip_path = Path(zip_path)
+    manifest = {'archive': zip_path.name, 'size': 0, 'sha256': '', 'volumes': []}
+    paths = []
+    digest = hashlib.sha256()
+    with open(zip_path, 'rb') as source:
+        while True:
+            data = source.read(volume_size)
+            if not data:
+                break
+            path = zip_path.with_name(f'{zip_path.name}.{len(paths) + 1:03d}')
+            with open(path, 'wb') as volume:
+                volume.write(data)
+            paths.append(path)
+            digest.update(data)
+            manifest['size'] += len(data)
+            manifest['volumes'].append({'name': path.name, 'size': len(data),
+                                        'sha256': hashlib.sha256(data).hexdigest()})
+    manifest['sha256'] = digest.hexdigest()
+
+    manifest_path = zip_path.with_name(zip_path.name + VOLUMES_SUFFIX)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return [manifest_path] + paths
+
+
+def join_volumes(path: Union[str, Path], output_path: Optional[Union[str, Path]] = None) -> Path:
+    """
+    Reassemble an archive cut by split_archive.
+
+    Args:
+        path: The .volumes.json manifest or any volume; the other files are
+              looked for in the same directory. Without a manifest the
+              volumes are joined in numeric order without verification.
+        output_path: Where to write the archive (default: the original
+                     name, in the directory of the volumes)
+
+    Returns:
+        Path of the reassembled archive
+
+    Raises:
+        ArchiveError: If a volume is missing or does not match the manifest
+    """
+    path = Path(path)
+    if path.name.endswith(VOLUMES_SUFFIX):
+        manifest_path = path
+        base = path.name[:-len(VOLUMES_SUFFIX)]
+    else:
+        match = re.fullmatch(r'(.+)\.\d{3}', path.name)
+        if not match:
+            raise ArchiveError(f"Not a volume or volume manifest: {path}")
+        base = match.group(1)
+        manifest_path = path.with_name(base + VOLUMES_SUFFIX)
+
+    manifest = None
+    if manifest_path.exists():
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            base = manifest['archive']
+            volumes = [(v['name'], v['size'], v['sha256']) for v in manifest['volumes']]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise ArchiveError(f"Invalid volume manifest {manifest_path}: {e}")
+    else:
+        volumes = []
+        while path.with_name(f'{base}.{len(volumes) + 1:03d}').exists():
+            volumes.append((f'{base}.{len(volumes) + 1:03d}', None, None))
+        if not volumes:
+            raise ArchiveError(f"No volumes found for {base}")
+
+    output_path = Path(output_path) if output_path else path.with_name(Path(base).name)
+    digest = hashlib.sha256()
+    with open(output_path, 'wb') as output:
+        for name, size, sha256 in volumes:
+            volume_path = path.with_name(Path(name).name)
+            try:
+                with open(volume_path, 'rb') as f:
+                    data = f.read()
+            except OSError as e:
+                raise ArchiveError(f"Missing volume {volume_path}: {e}")
+            if size is not None and (len(data) != size or hashlib.sha256(data).hexdigest() != sha256):
+                raise ArchiveError(f"Volume {volume_path} is damaged or incomplete")
+            output.write(data)
+            digest.update(data)
+
+    if manifest and digest.hexdigest() != manifest.get('sha256'):
+        raise ArchiveError(f"Reassembled {output_path} does not match the manifest")
+    return output_path
+
+
+def estimate_archive_size(scan: SubmissionScan, compression: str = 'balanced',
+                          **_: Any) -> int:
+    """
+    Estimate the size build_zip_archive would produce, without building it.
+
+    Files the compression policy stores count in full; the others are
+    assumed to compress like their first COMPRESSION_SAMPLE_SIZE bytes do
+    with fast deflate.
+
+    Args:
+        scan: The files to archive, from scan_submission
+        compression: CompressionPolicy name (other archive options are
+                     ignored)
+
+    Returns:
+        Estimated archive size in bytes
+    """
+    policy = CompressionPolicy(compression)
+    total = 22  # end of central directory record
+    for file_path, arcname, st in scan.files:
+        size = st.st_size
+        # Local header, central directory record and data descriptor-free payload
+        total += 30 + 46 + 2 * len(arcname.encode('utf-8'))
+        if size == 0 or policy.choose(file_path)[0] == zipfile.ZIP_STORED:
+            total += size
+            continue
+        with open(file_path, 'rb') as f:
+            sample = f.read(COMPRESSION_SAMPLE_SIZE)
+        if not sample:
+            # Truncated since the scan; assume the size it had then, uncompressed
+            total += size
+            continue
+        total += int(size * len(zlib.compress(sample, 1)) / len(sample))
+    return total
+
+
+def create_zip_archive(directory: str, output_path: Union[str, BinaryIO],
+                       **archive_options: Any) -> Optional[ArchiveStats]:
+    """
+    Create a zip archive from a directory, printing progress and statistics.
+
+    Args:
+        directory: Directory to zip
+        output_path: Path for the output zip file, or a writable binary file
+                     object (which need not be seekable, e.g. a ChunkPipe)
+        **archive_options: Keyword arguments passed to build_zip_archive
+
+    Returns:
+        Statistics about the archive if successful, None otherwise
+    """
+    try:
+        print(f"Creating zip archive from: {Path(directory).resolve()}")
+        if archive_options.get('scan') is None:
+            archive_options['scan'] = scan_submission(directory, **archive_options)
+            archive_options['scan'].print_report()
+        stats = build_zip_archive(directory, output_path, **archive_options)
+
+        if isinstance(output_path, (str, os.PathLike)):
+            print(f"✓ Zip archive created: {output_path}")
+        else:
+            print(f"✓ Zip archive streamed")
+        stats.print_summary()
+        return stats
+
+    except ArchiveError as e:
+        print(f"✗ {e}")
+        return None
+    except Exception as e:
+        print(f"✗ Error creating zip archive: {e}")
+        return None
+
+
+STATS_VERSION = 1
+
+
+class RunStats:
+    """
+    Wall time, CPU time, traffic and memory of each phase of a run.
+
+    Phases are consecutive: begin() ends the phase in progress and starts
+    the next one. Requests sent through an observed ConnectionPool are
+    added to the phase in progress, archives through add_archive(). With
+    track_memory, peak Python memory is measured with tracemalloc (which
+    slows Python code down noticeably, so it is off by default).
+    """
+
+    def __init__(self, track_memory: bool = False):
+        self.track_memory = track_memory
+        self.started_at = datetime.now().astimezone()
+        self.phases: List[Dict[str, Any]] = []
+        self.details: Dict[str, Any] = {}  # extra top-level report fields
+        self._phase: Optional[Dict[str, Any]] = None
+        self._phase_started = (0.0, 0.0)
+        self._started = (time.perf_counter(), time.process_time())
+        self._lock = threading.Lock()
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def observe(self, pool: Union[ConnectionPool, AsyncConnectionPool]) -> Any:
+        """Record the requests sent through pool."""
+        pool.observer = self.record_request
+        return pool
+
+    def begin(self, name: str):
+        """End the current phase, if any, and start a new one."""
+        self.end()
+        self._phase = {'name': name, 'bytesIn': 0, 'bytesOut': 0, 'requests': []}
+        if self.track_memory and hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        self._phase_started = (time.perf_counter(), time.process_time())
+
+    def end(self):
+        """End the current phase."""
+        phase = self._phase
+        if phase is None:
+            return
+        self._phase = None
+        wall = time.perf_counter() - self._phase_started[0]
+        summary = {
+            'name': phase.pop('name'),
+            'wallSeconds': round(wall, 6),
+            'cpuSeconds': round(time.process_time() - self._phase_started[1], 6),
+        }
+        if self.track_memory:
+            # Since the last reset; cumulative on Python < 3.9
+            summary['peakMemoryBytes'] = tracemalloc.get_traced_memory()[1]
+        moved = max(phase['bytesIn'], phase['bytesOut'])
+        if moved and wall > 0:
+            summary['throughputBytesPerSecond'] = round(moved / wall)
+        summary['serverSeconds'] = round(sum(r['serverSeconds'] for r in phase['requests']), 6)
+        summary.update(phase)
+        phase = summary
+        self.phases.append(phase)
+
+    def record_request(self, method: str, url: str, status: int, sent: int, received: int,
+                       send_seconds: float, server_seconds: float):
+        """ConnectionPool observer: account for one completed request."""
+        with self._lock:
+            phase = self._phase
+            if phase is None:
+                return
+            phase['bytesOut'] += sent
+            phase['bytesIn'] += received
+            phase['requests'].append({
+                'method': method,
+                'path': urlsplit(url).path,
+                'status': status,
+                'bytesOut': sent,
+                'bytesIn': received,
+                'sendSeconds': round(send_seconds, 6),
+                'serverSeconds': round(server_seconds, 6),
+            })
+
+    def add_archive(self, stats: 'ArchiveStats'):
+        """Account for an archive built during the current phase."""
+        with self._lock:
+            phase = self._phase
+            if phase is None:
+                return
+            phase['bytesIn'] += stats.total_size
+            phase['bytesOut'] += stats.zip_size
+            phase['archive'] = {
+                'files': stats.file_count,
+                'originalBytes': stats.total_size,
+                'compressedBytes': stats.zip_size,
+                'walkSeconds': round(stats.walk_seconds, 6),
+                'cacheHits': stats.cache_hits,
+                'notebookBytesSaved': stats.notebooks[1] - stats.notebooks[2] if stats.notebooks else None,
+                'methods': {
+                    name: {'files': count, 'originalBytes': original,
+                           'compressedBytes': compressed, 'seconds': round(elapsed, 6)}
+                    for name, (count, original, compressed, elapsed) in stats.methods.items()
+                },
+            }
+
+    def report(self, **details: Any) -> Dict[str, Any]:
+        """
+        Finish the run and return the report as a JSON-serializable dict.
+
+        Args:
+            **details: Top-level fields to include (command, options, ...)
+        """
+        self.end()
+        report = {
+            'version': STATS_VERSION,
+            'startedAt': self.started_at.isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': sys.platform,
+            'cpuCount': os.cpu_count(),
+        }
+        report.update(self.details)
+        report.update(details)
+        report['wallSeconds'] = round(time.perf_counter() - self._started[0], 6)
+        report['cpuSeconds'] = round(time.process_time() - self._started[1], 6)
+        if self.track_memory:
+            report['peakMemoryBytes'] = max([p['peakMemoryBytes'] for p in self.phases] +
+                                            [tracemalloc.get_traced_memory()[1]])
+        report['phases'] = self.phases
+        return report
+
+    def write(self, destination: str, **details: Any):
+        """
+        Write the report: pretty-printed for '-' (stdout), otherwise
+        appended to the file as one JSON line, so runs can be collected
+        into a single file and aggregated.
+        """
+        report = self.report(**details)
+        if destination == '-':
+            print(json.dumps(report, indent=2))
+            return
+        try:
+            with open(destination, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(report) + '\n')
+        except OSError as e:
+            print(f"Warning: Failed to write statistics to {destination}: {e}")
+
+
+def write_profile(profiler: cProfile.Profile, path: str, limit: int = 25):
+    """Save cProfile data to path and print the functions with the most cumulative time."""
+    try:
+        profiler.dump_stats(path)
+    except OSError as e:
+        print(f"Warning: Failed to write profile to {path}: {e}")
+        return
+    print()
+    print(f"Profile saved to {path} (view with: python -m pstats {path})")
+    pstats.Stats(profiler).sort_stats('cumulative').print_stats(limit)
+
+
+# Server used unless configured otherwise. Several endpoints may be given
+# (see EndpointSelector), but by default there is one, so that runs do not
+# pay for probing the others
+DEFAULT_SERVER_URLS = ['https://aicamp.iiis.co:9443']
+
+
+def load_config() -> Dict[str, Any]:
+    """
+    Load configuration from ~/.aibootcamp/config.json if it exists.
+
+    Returns:
+        Configuration dictionary
+    """
+    config_dir = Path.home() / '.aibootcamp'
+    config_file = config_dir / 'config.json'
+
+    default_config = {
+        'server_url': DEFAULT_SERVER_URLS,
+        'email': ''
+    }
+
+    if config_file.exists():
+        try:
+            with open(config_file, 'r') as f:
+                return {**default_config, **json.load(f)}
+        except Exception as e:
+            print(f"Warning: Failed to load config from {config_file}: {e}")
+
+    return default_config
+
+
+def save_config(config: Dict[str, Any]):
+    """
+    Save configuration to ~/.aibootcamp/config.json.
+
+    Args:
+        config: Configuration dictionary to save
+    """
+    config_dir = Path.home() / '.aibootcamp'
+    config_file = config_dir / 'config.json'
+
+    try:
+        config_dir.mkdir(parents=True, exist_ok=True)
+        with open(config_file, 'w') as f:
+            json.dump(config, f, indent=2)
+    except Exception as e:
+        print(f"Warning: Failed to save config to {config_file}: {e}")
+
+
+def prompt_password() -> str:
+    """Ask for the password on the terminal (it is never saved)."""
+    return getpass.getpass("Password: ")
+
+
+def authenticate(client: SubmissionClient, email: str, save_session: bool = True) -> bool:
+    """
+    Log in, reusing a saved session when one is still valid.
+
+    Args:
+        client: Client to authenticate
+        email: Student email address
+        save_session: Save a new token for later runs
+
+    Returns:
+        True if authenticated, False otherwise
+    """
+    if save_session and client.restore_session(email):
+        user = client.user_info
+        print(f"✓ Using saved session for {user.get('firstName')} {user.get('lastName')}")
+        print(f"  Email: {email}")
+        return True
+
+    return client.login(email, prompt_password(), save_session=save_session)
+
+
+def list_assignments_command(server_url: Union[str, List[str]], email: str, save_session: bool = True,
+                             refresh: bool = False, pool: Optional[ConnectionPool] = None):
+    """List all active assignments."""
+    client = SubmissionClient(server_url, pool=pool, password_prompt=prompt_password)
+    if refresh:
+        client.catalog_ttl = 0
+
+    print("Authenticating...")
+    if not authenticate(client, email, save_session):
+        sys.exit(1)
+
+    print()
+    print("=" * 60)
+    print("Active Assignments (Not Yet Due)")
+    print("=" * 60)
+    print()
+
+    assignments = client.list_assignments(show_all=False)
+
+    if not assignments:
+        print("No active assignments found.")
+        return
+
+    now = datetime.now()
+    catalog = client.get_catalog()
+
+    for i, assignment in enumerate(assignments, 1):
+        due_date = catalog.due_date(assignment)
+        due_date_naive = due_date.replace(tzinfo=None)
+        time_left = due_date_naive - now
+
+        print(f"{i}. {assignment['title']}")
+        print(f"   Due: {due_date.strftime('%Y-%m-%d %H:%M')}", end='')
+
+        if time_left.days > 0:
+            print(f" ({time_left.days} days left)")
+        elif time_left.total_seconds() > 3600:
+            hours = int(time_left.total_seconds() / 3600)
+            print(f" ({hours} hours left)")
+        else:
+            print(f" (Due soon!)")
+
+        if assignment.get('description'):
+            desc = assignment['description']
+            if len(desc) > 70:
+                desc = desc[:67] + "..."
+            print(f"   {desc}")
+
+        if assignment.get('allowLateSubmission'):
+            print(f"   ⚠ Late submission allowed")
+
+        print()
+
+
+def status_command(server_url: Union[str, List[str]], email: str, save_session: bool = True,
+                   retries: int = 5,
+                   pool: Optional[ConnectionPool] = None,
+                   async_pool: Optional[AsyncConnectionPool] = None):
+    """
+    Show, for every assignment, whether it has been submitted and its feedback.
+
+    Logs in like the other commands, then fetches the assignments, the
+    student's submissions and their details concurrently with an
+    AsyncSubmissionClient.
+    """
+    client = SubmissionClient(server_url, pool=pool, password_prompt=prompt_password)
+
+    print("Authenticating...")
+    if not authenticate(client, email, save_session):
+        sys.exit(1)
+
+    async def fetch() -> List[Dict[str, Any]]:
+        # The asyncio client goes to the endpoint the login went to
+        endpoint = client.endpoints.route(client.server_url, client.pool)
+        async with AsyncSubmissionClient(endpoint, client.token, pool=async_pool,
+                                         session_url=client.server_url) as async_client:
+            async_client.retry.retries = retries
+            return await async_client.get_status()
+
+    try:
+        try:
+            rows = asyncio.run(fetch())
+        except APIError as e:
+            # A saved session the server no longer accepts
+            if e.status != 401 or not client._reauthenticate():
+                raise
+            rows = asyncio.run(fetch())
+    except Exception as e:
+        print(f"✗ Error fetching submission status: {e}")
+        sys.exit(1)
+
+    print()
+    print("=" * 60)
+    print("Submission Status")
+    print("=" * 60)
+    print()
+
+    if not rows:
+        print("No assignments found.")
+        return
+
+    now = datetime.now()
+    catalog = AssignmentCatalog([row['assignment'] for row in rows])
+    owed = []
+    for row in rows:
+        assignment, submission = row['assignment'], row['submission']
+        due_date = catalog.due_date(assignment)
+        past_due = due_date.replace(tzinfo=None) < now
+        submitted = submission is not None and submission.get('status') != 'draft'
+        if submitted:
+            icon = '✓'
+        elif past_due and not assignment.get('allowLateSubmission'):
+            icon = '✗'
+        else:
+            icon = '⚠'
+            owed.append(assignment['title'])
+
+        print(f"{icon} {assignment['title']}")
+        print(f"   Due: {due_date.strftime('%Y-%m-%d %H:%M')}", end='')
+        if not past_due:
+            print()
+        elif assignment.get('allowLateSubmission'):
+            print(" (past due, late submission allowed)")
+        else:
+            print(" (past due)")
+
+        if submission is None:
+            print("   Not submitted")
+        elif not submitted:
+            print("   Draft saved, not submitted")
+        else:
+            attachments = len(submission.get('attachments', []))
+            if submission.get('submittedAt'):
+                submitted_at = parse_timestamp(submission['submittedAt'])
+                late = ' (late)' if submitted_at > due_date else ''
+                print(f"   Submitted: {submitted_at.strftime('%Y-%m-%d %H:%M')}{late}, "
+                      f"{attachments} file(s)")
+            else:
+                print(f"   Submitted: {attachments} file(s)")
+
+        if submission is not None:
+            feedback = submission.get('feedback') or []
+            if submission.get('grade') is not None:
+                print(f"   Grade: {submission['grade']}")
+            if feedback:
+                # The server lists the newest feedback first
+                latest = feedback[0]
+                print(f"   Feedback: {len(feedback)} comment(s), latest from "
+                      f"{latest.get('reviewerName', 'a reviewer')} on "
+                      f"{parse_timestamp(latest['createdAt']).strftime('%Y-%m-%d %H:%M')}")
+                content = ' '.join(str(latest.get('content', '')).split())
+                if len(content) > 70:
+                    content = content[:67] + "..."
+                print(f"     {content}")
+            elif submitted:
+                print("   Feedback: none yet")
+
+        print()
+
+    if owed:
+        print(f"Still to submit: {', '.join(owed)}")
+    else:
+        print("✓ Nothing left to submit")
+
+
+def download_command(server_url: Union[str, List[str]], email: str, assignment_name: str,
+                     output_dir: Optional[str] = None, workers: int = 4,
+                     save_session: bool = True, retries: int = 5,
+                     pool: Optional[ConnectionPool] = None) -> bool:
+    """
+    Download all submissions to an assignment (for TAs and instructors).
+
+    Returns:
+        True if every attachment is now on disk
+    """
+    client = SubmissionClient(server_url, pool=pool or ConnectionPool(max_idle_per_host=workers),
+                              password_prompt=prompt_password)
+    client.retry.retries = retries
+
+    print("Authenticating...")
+    if not authenticate(client, email, save_session):
+        return False
+    print()
+
+    assignment = client.find_assignment(assignment_name)
+    if not assignment:
+        return False
+    output_dir = Path(output_dir or safe_filename(assignment['title']))
+    print(f"Downloading submissions to {assignment['title']} into {output_dir.resolve()}")
+
+    started = time.perf_counter()
+    try:
+        stats = client.download_assignment(assignment['id'], output_dir, workers)
+    except APIError as e:
+        if e.status == 403:
+            print("✗ Only TAs, instructors and admins can download all submissions")
+        else:
+            print(f"✗ Error listing submissions: {e}")
+        return False
     except Exception as e:
-        print(f"✗ Error creating zip archive: {e}")
+        print(f"✗ Error listing submissions: {e}")
         return False
+    finally:
+        client.close()
 
+    seconds = time.perf_counter() - started
+    print()
+    print(f"{'✓' if not stats.failed else '⚠'} {stats.submissions} submission(s) in {seconds:.1f}s: "
+          f"{stats.downloaded} file(s) downloaded ({_format_size(stats.bytes)}"
+          f"{f', {stats.resumed} resumed' if stats.resumed else ''}), "
+          f"{stats.skipped} already present, {len(stats.failed)} failed")
+    if stats.failed:
+        print("  Run the same command again to retry the failed downloads")
+    return not stats.failed
 
-def load_config() -> Dict[str, str]:
-    """
-    Load configuration from ~/.aibootcamp/config.json if it exists.
 
-    Returns:
-        Configuration dictionary
+def load_batch_manifest(path: str) -> List[Dict[str, str]]:
     """
-    config_dir = Path.home() / '.aibootcamp'
-    config_file = config_dir / 'config.json'
+    Read a batch manifest.
 
-    default_config = {
-        'server_url': 'https://aicamp.iiis.co:9443',
-        'email': ''
-    }
-
-    if config_file.exists():
-        try:
-            with open(config_file, 'r') as f:
-                return {**default_config, **json.load(f)}
-        except Exception as e:
-            print(f"Warning: Failed to load config from {config_file}: {e}")
+    A .jsonl file holds one JSON object per line; anything else is read as
+    CSV with a header row. Each row needs 'assignment', 'directory' and
+    either 'email' (logged in with 'password', a saved session, or a
+    prompt) or 'token'. 'comment' is optional.
 
-    return default_config
+    Args:
+        path: Manifest file
 
+    Returns:
+        Rows as dictionaries of strings
 
-def save_config(config: Dict[str, str]):
+    Raises:
+        ValueError: If a row is malformed or misses a required column
     """
-    Save configuration to ~/.aibootcamp/config.json.
-
-    Args:
-        config: Configuration dictionary to save
+    rows = []
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.jsonl'):
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{line_number}: {e}")
+                rows.append((line_number, row))
+        else:
+            rows = [(reader_line, row) for reader_line, row in enumerate(csv.DictReader(f), 2)]
+
+    manifest = []
+    for line_number, row in rows:
+        if not isinstance(row, dict):
+            raise ValueError(f"{path}:{line_number}: expected an object")
+        row = {key.strip().lower(): str(value or '').strip() for key, value in row.items() if key}
+        for column in ('assignment', 'directory'):
+            if not row.get(column):
+                raise ValueError(f"{path}:{line_number}: missing '{column}'")
+        if not row.get('email') and not row.get('token'):
+            raise ValueError(f"{path}:{line_number}: needs 'email' or 'token'")
+        manifest.append(row)
+    return manifest
+
+
+class ThreadOutput(io.TextIOBase):
     """
-    config_dir = Path.home() / '.aibootcamp'
-    config_file = config_dir / 'config.json'
+    Stand-in for sys.stdout that collects what some threads print.
 
-    try:
-        config_dir.mkdir(parents=True, exist_ok=True)
-        with open(config_file, 'w') as f:
-            json.dump(config, f, indent=2)
-    except Exception as e:
-        print(f"Warning: Failed to save config to {config_file}: {e}")
+    Output of a thread between capture() and release() goes to a list of
+    its own; everything else is written to the real stdout.
+    """
 
+    def __init__(self, stdout: Any):
+        self.stdout = stdout
+        self.local = threading.local()
 
-def list_assignments_command(server_url: str, email: str, password: str):
-    """List all active assignments."""
-    client = SubmissionClient(server_url)
+    def capture(self) -> List[str]:
+        """Start collecting the calling thread's output, into the list returned."""
+        self.local.lines = []
+        return self.local.lines
 
-    print("Authenticating...")
-    if not client.login(email, password):
-        sys.exit(1)
+    def release(self):
+        """Stop collecting the calling thread's output."""
+        self.local.lines = None
 
-    print()
-    print("=" * 60)
-    print("Active Assignments (Not Yet Due)")
-    print("=" * 60)
-    print()
+    def write(self, text: str) -> int:
+        lines = getattr(self.local, 'lines', None)
+        if lines is None:
+            return self.stdout.write(text)
+        lines.append(text)
+        return len(text)
 
-    assignments = client.list_assignments(show_all=False)
+    def flush(self):
+        self.stdout.flush()
 
-    if not assignments:
-        print("No active assignments found.")
-        return
 
-    now = datetime.now()
+def batch_command(server_url: Union[str, List[str]], manifest_path: str, workers: int = 4,
+                  archive_options: Optional[Dict[str, Any]] = None,
+                  save_session: bool = True, retries: int = 5,
+                  limiter: Optional[RateLimiter] = None,
+                  volume_size: int = MAX_UPLOAD_SIZE, delta: bool = True) -> bool:
+    """
+    Submit every row of a batch manifest, several at a time.
+
+    Accounts are authenticated once, up front and one after another (a
+    password may have to be typed). Rows are then submitted by a pool of
+    workers with submit_directory, like a single submission: archives are
+    streamed without a temporary file unless they have to be split into
+    volumes, and unchanged or partly changed directories are handled as
+    --reproducible and delta submissions are. What a row prints is
+    collected and summed up in one line. All clients share one
+    ConnectionPool and endpoint choice, and rows for the same account and
+    assignment are submitted in manifest order.
 
-    for i, assignment in enumerate(assignments, 1):
-        due_date = datetime.fromisoformat(assignment['dueDate'].replace('Z', '+00:00'))
-        due_date_naive = due_date.replace(tzinfo=None)
-        time_left = due_date_naive - now
+    Args:
+        server_url: Server URL, or several URLs of the same server
+        manifest_path: CSV or JSONL manifest (see load_batch_manifest)
+        workers: Number of submissions in flight at once
+        archive_options: Keyword arguments passed to build_zip_archive
+        save_session: Save tokens of accounts that log in with a password
+        retries: Times to retry a row's upload after a transient failure
+        limiter: Shapes the uploads of all workers together, see RateLimiter
+        volume_size: Split archives larger than this many bytes into volumes
+        delta: Upload only the changed files where the server supports it
 
-        print(f"{i}. {assignment['title']}")
-        print(f"   Due: {due_date.strftime('%Y-%m-%d %H:%M')}", end='')
+    Returns:
+        True if every row was submitted
+    """
+    try:
+        rows = load_batch_manifest(manifest_path)
+    except (OSError, ValueError) as e:
+        print(f"✗ Invalid batch manifest: {e}")
+        return False
 
-        if time_left.days > 0:
-            print(f" ({time_left.days} days left)")
-        elif time_left.total_seconds() > 3600:
-            hours = int(time_left.total_seconds() / 3600)
-            print(f" ({hours} hours left)")
+    pool = ConnectionPool(max_idle_per_host=workers)
+    pool.limiter = limiter
+    endpoints = EndpointSelector(server_urls(server_url))
+    clients: Dict[str, Optional[SubmissionClient]] = {}
+
+    print(f"Authenticating {len({row.get('token') or row['email'] for row in rows})} account(s)...")
+    for row in rows:
+        account = row.get('token') or row['email']
+        if account in clients:
+            continue
+        client = SubmissionClient(server_url, pool=pool)
+        client.endpoints = endpoints
+        client.retry.retries = retries
+        client.volume_size = volume_size
+        if row.get('token'):
+            client.token = row['token']
+            ok = True
+        elif row.get('password'):
+            ok = client.login(row['email'], row['password'], save_session=save_session)
         else:
-            print(f" (Due soon!)")
-
-        if assignment.get('description'):
-            desc = assignment['description']
-            if len(desc) > 70:
-                desc = desc[:67] + "..."
-            print(f"   {desc}")
+            ok = authenticate(client, row['email'], save_session)
+        clients[account] = client if ok else None
 
-        if assignment.get('allowLateSubmission'):
-            print(f"   ⚠ Late submission allowed")
+    print()
+    print(f"Submitting {len(rows)} row(s) with {workers} worker(s)...")
+
+    locks: Dict[tuple, threading.Lock] = collections.defaultdict(threading.Lock)
+    output = ThreadOutput(sys.stdout)
+
+    def submit_row(row: Dict[str, str]) -> tuple:
+        account = row.get('token') or row['email']
+        client = clients[account]
+        if client is None:
+            raise Exception('Login failed')
+
+        catalog = client.get_catalog()
+        assignment = catalog.lookup(row['assignment']) or \
+            client.get_catalog(refresh=True).lookup(row['assignment'])
+        if assignment is None:
+            raise Exception(f"Assignment '{row['assignment']}' not found")
+
+        run = RunStats()
+        lines = output.capture()
+        started = time.perf_counter()
+        try:
+            with locks[(account, assignment['id'])]:
+                ok = submit_directory(client, assignment, row['directory'], archive_options or {},
+                                      run, row.get('comment', ''), pipeline=True, delta=delta)
+        finally:
+            output.release()
+            run.end()
+        if not ok:
+            errors = [line.strip()[1:].strip() for line in ''.join(lines).splitlines()
+                      if line.strip().startswith('✗')]
+            raise Exception(errors[-1] if errors else 'Submission failed')
+        archives = [phase['archive'] for phase in run.phases if 'archive' in phase]
+        return assignment, archives, time.perf_counter() - started
+
+    started = time.perf_counter()
+    succeeded = 0
+    uploaded = 0
+    with contextlib.redirect_stdout(output), ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(submit_row, row): (i, row) for i, row in enumerate(rows, 1)}
+        for future in as_completed(futures):
+            i, row = futures[future]
+            who = row.get('email') or 'token'
+            try:
+                assignment, archives, elapsed = future.result()
+            except Exception as e:
+                print(f"✗ [{i}/{len(rows)}] {who} -> {row['assignment']}: {e}")
+                continue
+            succeeded += 1
+            if not archives:
+                print(f"✓ [{i}/{len(rows)}] {who} -> {assignment['title']}: "
+                      f"unchanged since the last submission, not uploaded again")
+                continue
+            size = archives[-1]['compressedBytes']
+            uploaded += size
+            print(f"✓ [{i}/{len(rows)}] {who} -> {assignment['title']}: "
+                  f"{archives[-1]['files']} file(s), {size / 1024:.1f} KB in {elapsed:.1f}s")
+
+    elapsed = time.perf_counter() - started
+    pool.close()
 
-        print()
+    print()
+    print("=" * 60)
+    print(f"Batch finished: {succeeded} succeeded, {len(rows) - succeeded} failed")
+    print(f"  Elapsed: {elapsed:.1f}s")
+    print(f"  Uploaded: {uploaded / 1024 / 1024:.1f} MB "
+          f"({uploaded / 1024 / 1024 / max(elapsed, 1e-9):.2f} MB/s)")
+    print(f"  Throughput: {succeeded / max(elapsed, 1e-9):.2f} submission(s)/s")
+    print("=" * 60)
+    return succeeded == len(rows)
 
 
 def main():
@@ -500,6 +5203,11 @@ Examples:
   %(prog)s -d ./homework1 -a "Assignment 1"
   %(prog)s --directory ./project --assignment "Final Project" --server https://aicamp.iiis.co
   %(prog)s -d ./hw2 -a "Homework 2" --comment "Completed all bonus problems"
+  %(prog)s -d ./project -a "Final Project" --pipeline --jobs 4
+
+  # Submit many directories/accounts from a CSV or JSONL manifest
+  # (columns: email or token, password, assignment, directory, comment)
+  %(prog)s --batch submissions.csv --workers 8
 
 Configuration:
   The script saves your server URL and email to ~/.aibootcamp/config.json
@@ -513,6 +5221,12 @@ Configuration:
         help='List all active assignments and exit'
     )
 
+    parser.add_argument(
+        '--status',
+        action='store_true',
+        help='Show which assignments you have submitted and their feedback, and exit'
+    )
+
     parser.add_argument(
         '-d', '--directory',
         help='Directory to submit (will be zipped)'
@@ -520,12 +5234,40 @@ Configuration:
 
     parser.add_argument(
         '-a', '--assignment',
-        help='Assignment name (must match exactly)'
+        help='Assignment name (must match exactly) or ID'
+    )
+
+    parser.add_argument(
+        '--batch',
+        metavar='MANIFEST',
+        help='Submit every row of a CSV or JSONL manifest concurrently'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='Number of concurrent submissions in --batch mode, or downloads '
+             'with --download-assignment (default: 4)'
+    )
+
+    parser.add_argument(
+        '--download-assignment',
+        metavar='ASSIGNMENT',
+        help='Download all submissions to an assignment (TAs and instructors), '
+             'skipping files already downloaded, and exit'
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        metavar='DIR',
+        help='Directory for --download-assignment (default: named after the assignment)'
     )
 
     parser.add_argument(
         '-s', '--server',
-        help='Server URL (default: from config or https://aicamp.iiis.co:9443)'
+        help='Server URL, or several comma-separated URLs of the same server to use '
+             f'the fastest of (default: from config or {",".join(DEFAULT_SERVER_URLS)})'
     )
 
     parser.add_argument(
@@ -542,16 +5284,278 @@ Configuration:
     parser.add_argument(
         '--no-save',
         action='store_true',
-        help='Do not save email and server URL to config file'
+        help='Do not save email and server URL to config file, or the login session'
+    )
+
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Check the assignment list with the server even if it was cached recently'
+    )
+
+    parser.add_argument(
+        '--logout',
+        action='store_true',
+        help='Forget the saved login session for this server and email, then exit'
+    )
+
+    parser.add_argument(
+        '--pipeline',
+        action='store_true',
+        help='Compress and upload at the same time without writing a temporary zip file'
+    )
+
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='Number of files to compress in parallel (default: 1)'
+    )
+
+    parser.add_argument(
+        '--no-ignore-files',
+        action='store_true',
+        help='Do not apply .gitignore/.submitignore files found in the directory'
+    )
+
+    parser.add_argument(
+        '--compression',
+        choices=sorted(CompressionPolicy.PRESETS),
+        default='balanced',
+        help='fast (deflate level 1), balanced (deflate level 6) or max (LZMA); '
+             'already compressed files such as images and checkpoints are always '
+             'stored (default: balanced)'
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Compress every file again instead of reusing ~/.aibootcamp/cache'
+    )
+
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=DEFAULT_CACHE_SIZE // (1024 * 1024),
+        metavar='MB',
+        help='Size limit of the compressed file cache in MB (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=RetryPolicy().retries,
+        help='Times to retry an upload after a server or network error (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--max-rate',
+        type=float,
+        metavar='KB/s',
+        help='Upload at most this many KB per second, so machines sharing a '
+             'network connection do not crowd each other out'
+    )
+
+    parser.add_argument(
+        '--adaptive-rate',
+        action='store_true',
+        help='Slow uploads down while the network looks congested and speed them up '
+             'again (up to --max-rate, if given) when it clears'
+    )
+
+    parser.add_argument(
+        '--max-file-size',
+        type=float,
+        default=DEFAULT_MAX_FILE_SIZE / (1024 * 1024),
+        metavar='MB',
+        help='Refuse to submit files larger than this (default: %(default)g, 0 for no limit)'
+    )
+
+    parser.add_argument(
+        '--skip-large-files',
+        action='store_true',
+        help='Leave out files larger than --max-file-size instead of refusing to submit'
+    )
+
+    parser.add_argument(
+        '--max-total-size',
+        type=float,
+        default=DEFAULT_MAX_TOTAL_SIZE / (1024 * 1024),
+        metavar='MB',
+        help='Refuse to submit more than this in total, before compression '
+             '(default: %(default)g, 0 for no limit)'
+    )
+
+    parser.add_argument(
+        '--slim-notebooks',
+        nargs='?',
+        type=float,
+        const=NOTEBOOK_MAX_OUTPUT / 1024,
+        metavar='KB',
+        help='Shrink Jupyter notebooks: replace outputs larger than KB (default: '
+             f'{NOTEBOOK_MAX_OUTPUT // 1024:g}, 0 removes all outputs), duplicate images '
+             'and editor metadata'
+    )
+
+    parser.add_argument(
+        '--reproducible',
+        action='store_true',
+        help='Build the same archive bytes for the same files (sorted, fixed timestamps '
+             'and permissions), name it after its content, and skip the upload if the '
+             'last submission was that archive'
+    )
+
+    parser.add_argument(
+        '--no-delta',
+        action='store_true',
+        help='Upload all files even if the server can take just the changes '
+             'since the previous submission'
+    )
+
+    parser.add_argument(
+        '--volume-size',
+        type=float,
+        default=MAX_UPLOAD_SIZE / (1024 * 1024),
+        metavar='MB',
+        help='Split archives larger than this into volumes (default: %(default)g, '
+             'the largest file the server accepts)'
+    )
+
+    parser.add_argument(
+        '--watch',
+        type=float,
+        nargs='?',
+        const=WATCH_QUIET_SECONDS,
+        metavar='SECONDS',
+        help='After submitting, keep watching the directory and submit again '
+             'once it has been unchanged for SECONDS (default: %(const)g)'
+    )
+
+    parser.add_argument(
+        '--join',
+        metavar='FILE',
+        help='Reassemble a downloaded split submission from its .volumes.json '
+             'file or first volume, then exit'
+    )
+
+    parser.add_argument(
+        '--stats',
+        metavar='FILE',
+        help='Record the time, CPU, traffic and memory of each phase as JSON: '
+             'appended to FILE as one line per run, or printed with "-"'
+    )
+
+    parser.add_argument(
+        '--profile',
+        metavar='FILE',
+        help='Profile the run with cProfile, save the data to FILE and print the '
+             'slowest functions (compression in other threads is not included; '
+             'use --jobs 1 without --pipeline to profile it)'
     )
 
     args = parser.parse_args()
 
+    run = RunStats(track_memory=bool(args.stats))
+    profiler = cProfile.Profile() if args.profile else None
+    exit_code: Any = 0
+    try:
+        if profiler:
+            profiler.enable()
+        run_command(parser, args, run)
+    except SystemExit as e:
+        exit_code = e.code
+        raise
+    finally:
+        if profiler:
+            profiler.disable()
+            write_profile(profiler, args.profile)
+        if args.stats:
+            run.write(args.stats, command=_command_name(args), exitCode=exit_code or 0,
+                      success=not exit_code, options={
+                          'jobs': args.jobs, 'compression': args.compression,
+                          'pipeline': args.pipeline, 'cache': not args.no_cache,
+                          'ignoreFiles': not args.no_ignore_files, 'retries': args.retries,
+                          'maxRate': args.max_rate, 'adaptiveRate': args.adaptive_rate,
+                      })
+
+
+def _command_name(args: argparse.Namespace) -> str:
+    if args.join:
+        return 'join'
+    if args.batch:
+        return 'batch'
+    if args.logout:
+        return 'logout'
+    if args.list_assignments:
+        return 'list'
+    if args.status:
+        return 'status'
+    if args.download_assignment:
+        return 'download'
+    return 'submit'
+
+
+def run_command(parser: argparse.ArgumentParser, args: argparse.Namespace, run: RunStats):
+    """Carry out the command selected by the parsed arguments, timing its phases in run."""
+    # Reassembling volumes needs neither configuration nor server
+    if args.join:
+        try:
+            output_path = join_volumes(args.join)
+        except ArchiveError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+        print(f"✓ Reassembled {output_path} ({output_path.stat().st_size / 1024 / 1024:.1f} MB)")
+        sys.exit(0)
+
     # Load configuration
+    run.begin('config')
     config = load_config()
 
-    # Determine server URL
-    server_url = args.server or config.get('server_url', 'https://aicamp.iiis.co:9443')
+    # Determine server URL, or several endpoints of the same server (see EndpointSelector)
+    server_url = server_urls(args.server or config.get('server_url') or DEFAULT_SERVER_URLS)
+    if not server_url:
+        parser.error("--server needs at least one URL")
+    run.details['server'] = ','.join(server_url)
+
+    # Archive settings shared by single and batch submissions
+    archive_options = {
+        'jobs': args.jobs,
+        'use_ignore_files': not args.no_ignore_files,
+        'use_cache': not args.no_cache,
+        'cache_size': args.cache_size * 1024 * 1024,
+        'compression': args.compression,
+        'max_file_size': int(args.max_file_size * 1024 * 1024),
+        'max_total_size': int(args.max_total_size * 1024 * 1024),
+        'skip_large_files': args.skip_large_files,
+        'slim_notebooks': int(args.slim_notebooks * 1024) if args.slim_notebooks is not None else None,
+        'reproducible': args.reproducible,
+    }
+
+    # Upload bandwidth shaping, shared by all uploads of this run
+    limiter = None
+    if args.max_rate is not None and args.max_rate <= 0:
+        parser.error("--max-rate must be positive")
+    if args.max_rate or args.adaptive_rate:
+        limiter = RateLimiter(args.max_rate * 1024 if args.max_rate else None,
+                              adaptive=args.adaptive_rate)
+
+    volume_size = max(int(args.volume_size * 1024 * 1024), 1)
+
+    # Handle batch submissions
+    if args.batch:
+        run.begin('batch')
+        ok = batch_command(server_url, args.batch, max(args.workers, 1), archive_options,
+                           save_session=not args.no_save, retries=max(args.retries, 0),
+                           limiter=limiter, volume_size=volume_size, delta=not args.no_delta)
+        sys.exit(0 if ok else 1)
+
+    # Handle logout command
+    if args.logout:
+        client = SubmissionClient(server_url)
+        client.email = args.email or config.get('email', '')
+        client.clear_session()
+        print(f"✓ Logged out of {client.server_url}")
+        sys.exit(0)
 
     # Handle list assignments command
     if args.list_assignments:
@@ -559,24 +5563,49 @@ Configuration:
         email = args.email or config.get('email', '')
         if not email:
             email = input("Email: ").strip()
-        password = getpass.getpass("Password: ")
 
         print()
-        list_assignments_command(server_url, email, password)
+        run.begin('list')
+        list_assignments_command(server_url, email, save_session=not args.no_save,
+                                 refresh=args.refresh, pool=run.observe(ConnectionPool()))
+        sys.exit(0)
+
+    # Handle download command
+    if args.download_assignment:
+        email = args.email or config.get('email', '')
+        if not email:
+            email = input("Email: ").strip()
+
+        print()
+        run.begin('download')
+        ok = download_command(server_url, email, args.download_assignment, args.output,
+                              workers=max(args.workers, 1), save_session=not args.no_save,
+                              retries=max(args.retries, 0),
+                              pool=run.observe(ConnectionPool(max_idle_per_host=max(args.workers, 1))))
+        sys.exit(0 if ok else 1)
+
+    # Handle status command
+    if args.status:
+        email = args.email or config.get('email', '')
+        if not email:
+            email = input("Email: ").strip()
+
+        print()
+        run.begin('status')
+        status_command(server_url, email, save_session=not args.no_save,
+                       retries=max(args.retries, 0), pool=run.observe(ConnectionPool()),
+                       async_pool=run.observe(AsyncConnectionPool()))
         sys.exit(0)
 
     # For submission, require directory and assignment
     if not args.directory or not args.assignment:
-        parser.error("--directory and --assignment are required for submission (or use --list-assignments to list assignments)")
+        parser.error("--directory and --assignment are required for submission (or use --list-assignments to list assignments, --status to check submissions)")
 
     # Determine email
     email = args.email or config.get('email', '')
     if not email:
         email = input("Email: ").strip()
 
-    # Get password (never saved)
-    password = getpass.getpass("Password: ")
-
     print()
     print("=" * 60)
     print("AI+ Bootcamp Assignment Submission")
@@ -584,23 +5613,34 @@ Configuration:
     print()
 
     # Create submission client
-    client = SubmissionClient(server_url)
-
-    # Login
+    run.begin('login')
+    pool = run.observe(ConnectionPool())
+    pool.limiter = limiter
+    client = SubmissionClient(server_url, pool=pool, password_prompt=prompt_password)
+    client.retry.retries = max(args.retries, 0)
+    if args.refresh:
+        client.catalog_ttl = 0
+
+    # Login (the password is never saved, only the session token)
     print("Authenticating...")
-    if not client.login(email, password):
+    if not authenticate(client, email, save_session=not args.no_save):
         sys.exit(1)
 
     print()
 
     # Find assignment
+    run.begin('lookup')
     print(f"Looking for assignment: {args.assignment}")
     assignment = client.find_assignment(args.assignment)
     if not assignment:
         sys.exit(1)
 
     print(f"✓ Found assignment: {assignment['title']}")
-    due_date = datetime.fromisoformat(assignment['dueDate'].replace('Z', '+00:00'))
+    due_date = client.get_catalog().due_date(assignment)
+    if due_date.replace(tzinfo=None) < datetime.now() and not assignment.get('allowLateSubmission'):
+        # The cached list may predate a deadline extension; check with the server
+        assignment = client.get_catalog(refresh=True).by_id.get(assignment['id'], assignment)
+        due_date = parse_timestamp(assignment['dueDate'])
     print(f"  Assignment ID: {assignment['id']}")
     print(f"  Due date: {due_date.strftime('%Y-%m-%d %H:%M')}")
 
@@ -619,42 +5659,222 @@ Configuration:
 
     print()
 
-    # Create zip archive
+    # Snapshot the files before the first upload, so edits made during it
+    # are submitted again in watch mode
+    if args.watch is not None:
+        snapshot = tree_snapshot(args.directory, **archive_options)
+
+    client.volume_size = volume_size
+    if limiter is not None:
+        if limiter.rate is None:
+            print("Adapting the upload rate to the network")
+        else:
+            print(f"Limiting uploads to {_format_size(limiter.rate)}/s"
+                  f"{' (adaptive)' if limiter.adaptive else ''}")
+    submitted = submit_directory(client, assignment, args.directory, archive_options, run,
+                                 args.comment, pipeline=args.pipeline, delta=not args.no_delta)
+    run.end()
+    if submitted and not args.no_save:
+        # Save configuration
+        config['server_url'] = server_url[0] if len(server_url) == 1 else server_url
+        config['email'] = email
+        save_config(config)
+        print(f"\n✓ Configuration saved to ~/.aibootcamp/config.json")
+
+    if submitted:
+        print()
+        print("=" * 60)
+        print("Submission completed successfully!")
+        print("=" * 60)
+
+    if args.watch is not None:
+        deadline = None if assignment.get('allowLateSubmission') else due_date.timestamp()
+        print()
+        submitted = watch_directory(
+            args.directory,
+            lambda: submit_directory(client, assignment, args.directory, archive_options, run,
+                                     args.comment, pipeline=args.pipeline, delta=not args.no_delta),
+            quiet_seconds=max(args.watch, 0), deadline=deadline,
+            snapshot=snapshot, succeeded=submitted, **archive_options
+        )
+        run.end()
+
+    sys.exit(0 if submitted else 1)
+
+
+@contextlib.contextmanager
+def temporary_archive(zip_filename: str):
+    """
+    Path for an archive named zip_filename that is removed afterwards.
+
+    Each archive gets a directory of its own under ~/.aibootcamp/temp, so
+    batch rows packing directories of the same name do not collide.
+    """
     temp_dir = Path.home() / '.aibootcamp' / 'temp'
     temp_dir.mkdir(parents=True, exist_ok=True)
+    zip_path = Path(tempfile.mkdtemp(dir=temp_dir)) / zip_filename
+    try:
+        yield zip_path
+    finally:
+        shutil.rmtree(zip_path.parent, ignore_errors=True)
+
+
+def submit_directory(client: SubmissionClient, assignment: Dict[str, Any], directory: str,
+                     archive_options: Dict[str, Any], run: RunStats, comment: str = "",
+                     pipeline: bool = False, delta: bool = True) -> bool:
+    """
+    Scan, package and upload a directory once.
 
+    Args:
+        client: Authenticated client (with volume_size set)
+        assignment: Assignment to submit to
+        directory: Directory to submit
+        archive_options: Keyword arguments for build_zip_archive
+        run: Phase timings to add to
+        comment: Text submitted with the archive
+        pipeline: Compress straight onto the connection, unless the archive
+                  has to be split into volumes
+        delta: Upload only the changed files where the server supports it
+
+    Returns:
+        True if the submission succeeded
+    """
+    # Package and submit
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    directory_name = Path(args.directory).name
+    directory_name = Path(directory).name
     zip_filename = f"{directory_name}_{timestamp}.zip"
-    zip_path = temp_dir / zip_filename
-
-    if not create_zip_archive(args.directory, str(zip_path)):
-        sys.exit(1)
 
+    # Find the files first, so size problems show up before anything is compressed
+    run.begin('scan')
+    try:
+        scan = scan_submission(directory, **archive_options)
+    except ArchiveError as e:
+        print(f"✗ {e}")
+        return False
+    print(f"Checking files in: {scan.directory_path}")
+    scan.print_report()
     print()
+    archive_options = {**archive_options, 'scan': scan}
+
+    if archive_options.get('reproducible'):
+        # Name the archive after its content, so an unchanged one is recognized
+        cache = ArchiveCache(scan.directory_path) if archive_options.get('use_cache') else None
+        slim_notebooks = archive_options.get('slim_notebooks')
+        digest = archive_digest(scan, archive_options.get('compression', 'balanced'), cache,
+                                NotebookSlimmer(slim_notebooks) if slim_notebooks is not None else None)
+        zip_filename = f"{directory_name}_{digest[:16]}.zip"
+        print(f"Content digest: {digest}")
+        try:
+            unchanged = client.is_latest_upload(assignment['id'], zip_filename, comment)
+        except Exception as e:
+            print(f"Warning: Could not look up the previous submission: {e}")
+            unchanged = False
+        if unchanged:
+            print(f"✓ Already submitted as {zip_filename}; nothing has changed, so not uploading again")
+            return True
 
-    # Submit
-    if client.create_submission(assignment['id'], str(zip_path), args.comment):
-        # Save configuration
-        if not args.no_save:
-            config['server_url'] = server_url
-            config['email'] = email
-            save_config(config)
-            print(f"\n✓ Configuration saved to ~/.aibootcamp/config.json")
+    if delta:
+        submitted = submit_changes(client, assignment, directory, archive_options, zip_filename,
+                                   run, comment)
+        if submitted is not None:
+            return submitted
+
+    if pipeline:
+        # An archive that has to be split cannot be streamed as one file
+        estimate = estimate_archive_size(scan, archive_options.get('compression', 'balanced'))
+        if estimate > client.volume_size:
+            print(f"Archive will be about {estimate / 1024 / 1024:.1f} MB, more than fits in one upload; "
+                  f"creating it before uploading instead of streaming it")
+            pipeline = False
+
+    if pipeline:
+        # Compress straight onto the connection
+        run.begin('archive+upload')
+        submitted = client.stream_submission(assignment['id'], directory, zip_filename,
+                                             comment, **archive_options)
+        if submitted:
+            run.add_archive(submitted)
+        return bool(submitted)
 
-        # Clean up temp file
-        try:
-            os.remove(zip_path)
-        except:
-            pass
+    # Create zip archive
+    with temporary_archive(zip_filename) as zip_path:
+        run.begin('archive')
+        archive_stats = create_zip_archive(directory, str(zip_path), **archive_options)
+        if not archive_stats:
+            return False
+        run.add_archive(archive_stats)
 
         print()
-        print("=" * 60)
-        print("Submission completed successfully!")
-        print("=" * 60)
-        sys.exit(0)
-    else:
-        sys.exit(1)
+
+        run.begin('upload')
+        return client.create_submission(assignment['id'], str(zip_path), comment)
+
+
+def submit_changes(client: SubmissionClient, assignment: Dict[str, Any], directory: str,
+                   archive_options: Dict[str, Any], zip_filename: str, run: RunStats,
+                   comment: str = "") -> Optional[bool]:
+    """
+    Upload only the files that changed since the previous submission.
+
+    Used when the server keeps content manifests of submitted archives and
+    there is a previous submission whose files mostly still match.
+
+    Args:
+        client: Authenticated client
+        assignment: Assignment to submit to
+        directory: Directory to submit
+        archive_options: Keyword arguments for build_zip_archive, including
+                         the scan of the directory
+        zip_filename: Name for the archive
+        run: Phase timings to add to
+        comment: Text submitted with the archive
+
+    Returns:
+        True or False for the outcome of a delta submission, or None if
+        all files have to be submitted instead
+    """
+    run.begin('delta')
+    scan = archive_options['scan']
+    try:
+        previous = client.get_archive_manifest(assignment['id'])
+    except Exception as e:
+        print(f"Warning: Could not look up the previous submission: {e}")
+        return None
+    if previous is None:
+        return None
+
+    cache = ArchiveCache(scan.directory_path) if archive_options.get('use_cache') else None
+    slim_notebooks = archive_options.get('slim_notebooks')
+    slimmer = NotebookSlimmer(slim_notebooks) if slim_notebooks is not None else None
+    changed, deletions = plan_delta(scan, previous['files'], cache, slimmer)
+    if not changed.files and not deletions:
+        if previous['textContent'] != comment:
+            # Only the comment changed, which a delta cannot carry without a file
+            return None
+        print("✓ Nothing changed since the last submission, so not uploading again")
+        return True
+    if changed.total_size > scan.total_size * DELTA_MAX_FRACTION:
+        return None
+    print(f"Changes since the last submission: {len(changed.files)} file(s) changed or added "
+          f"({_format_size(changed.total_size)}), {len(deletions)} removed, "
+          f"{len(scan.files) - len(changed.files)} unchanged")
+
+    with temporary_archive(zip_filename) as zip_path:
+        run.begin('archive')
+        # The changed files are new to the cache anyway, and leaving it alone
+        # keeps its record of the unchanged ones
+        archive_stats = create_zip_archive(directory, str(zip_path),
+                                           **{**archive_options, 'scan': changed, 'use_cache': False})
+        if not archive_stats:
+            return False
+        run.add_archive(archive_stats)
+        if archive_stats.zip_size > client.volume_size:
+            return None
+
+        print()
+        run.begin('upload')
+        return client.create_delta_submission(assignment['id'], str(zip_path), previous['base'],
+                                              deletions, comment)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,52 @@
+"""Regression checks for walk_submission_files (run with python -m unittest or pytest)."""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import submit  # noqa: E402
+
+
+@unittest.skipUnless(hasattr(os, 'symlink'), 'needs symbolic links')
+class SymlinkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = Path(self.tmp.name).resolve()
+        self.outside = base / 'home'
+        (self.outside / '.aibootcamp').mkdir(parents=True)
+        (self.outside / '.aibootcamp' / 'sessions.json').write_text('{"token": "secret"}')
+        self.hw = base / 'hw'
+        (self.hw / 'src').mkdir(parents=True)
+        (self.hw / 'src' / 'main.py').write_text('print(1)\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def walk(self):
+        skipped = []
+        files = list(submit.walk_submission_files(self.hw, [], skipped=skipped))
+        return files, skipped
+
+    def test_link_outside_directory_is_not_followed(self):
+        os.symlink(self.outside, self.hw / 'home', target_is_directory=True)
+        files, skipped = self.walk()
+        for file_path, arcname, _ in files:
+            self.assertTrue(os.path.realpath(file_path).startswith(str(self.hw) + os.sep), arcname)
+        self.assertEqual([arcname for _, arcname, _ in files], ['hw/src/main.py'])
+        self.assertIn(('hw/home/', 'symbolic link outside the directory'), skipped)
+
+    def test_link_inside_directory_is_followed(self):
+        os.symlink(self.hw / 'src', self.hw / 'alias', target_is_directory=True)
+        files, skipped = self.walk()
+        self.assertEqual(sorted(arcname for _, arcname, _ in files),
+                         ['hw/alias/main.py', 'hw/src/main.py'])
+        self.assertEqual(skipped, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Reproducible benchmarks for packing and uploading with submit.py
+
+Generates synthetic submission trees (many tiny files, a few large
+binaries, deep nesting, notebook-heavy projects and trees that are mostly
+excluded), then times the directory walk, exclude matching,
+build_zip_archive with and without the archive cache, and uploads through
+SubmissionClient against the local stand-in server (tools/standin_server.py).
+
+Trees are generated from fixed seeds with fixed modification times, so every
+run archives the same bytes; they are kept in --workdir and only regenerated
+when the tree specification or --scale changes. Each benchmark runs in its own
+process so its peak RSS can be measured, with one untimed warm-up round.
+
+Usage:
+    python tools/benchmark.py                        # full suite
+    python tools/benchmark.py --quick -k archive     # 1/10 scale, archive benchmarks only
+    python tools/benchmark.py --save-baseline base.json
+    python tools/benchmark.py --baseline base.json   # exit status 1 on regressions
+
+A benchmark regresses when its median time exceeds the baseline by more than
+--tolerance, or its peak RSS by more than --rss-tolerance. Baselines are only
+comparable on the same machine and Python version.
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TOOLS_DIR = Path(__file__).resolve().parent
+REPO_DIR = TOOLS_DIR.parent
+
+# Bump when the generated trees change, so cached trees are rebuilt
+TREE_VERSION = 1
+
+# Fixed modification time of generated files (2024-01-01 00:00 UTC)
+FIXED_MTIME = 1704067200
+
+DEFAULT_WORKDIR = Path(tempfile.gettempdir()) / 'submit-benchmark'
+
+
+# Tree generation
+
+def _write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def _source_text(rng: random.Random, size: int) -> bytes:
+    """Python-looking text of roughly size bytes."""
+    words = ['def', 'return', 'self', 'value', 'result', 'import', 'numpy', 'for', 'in',
+             'range', 'if', 'else', 'data', 'model', 'loss', 'train', '(', ')', ':', '=']
+    lines = []
+    total = 0
+    while total < size:
+        line = '    ' * rng.randint(0, 3) + ' '.join(rng.choice(words) for _ in range(rng.randint(3, 12)))
+        lines.append(line)
+        total += len(line) + 1
+    return '\n'.join(lines).encode('utf-8')[:size]
+
+
+def gen_tiny(root: Path, rng: random.Random, scale: float):
+    """50k files of 64-512 bytes, 100 per directory."""
+    for i in range(int(50000 * scale)):
+        _write(root / f'pkg{i // 100:04d}' / f'mod{i % 100:03d}.py', _source_text(rng, rng.randint(64, 512)))
+
+
+def gen_large(root: Path, rng: random.Random, scale: float):
+    """A few large files: random bytes, compressible CSV and a sparse array."""
+    size = int(24 * 1024 * 1024 * scale)
+    _write(root / 'weights.bin', rng.getrandbits(8 * size).to_bytes(size, 'little'))
+    rows = []
+    total = 0
+    while total < size:
+        row = ','.join(f'{rng.gauss(0, 1):.6f}' for _ in range(8))
+        rows.append(row)
+        total += len(row) + 1
+    _write(root / 'data' / 'measurements.csv', '\n'.join(rows).encode('ascii')[:size])
+    sparse = bytearray(size // 2)
+    for _ in range(len(sparse) // 64):
+        sparse[rng.randrange(len(sparse))] = rng.randrange(256)
+    _write(root / 'data' / 'features.npy', bytes(sparse))
+    _write(root / 'train.py', _source_text(rng, 4096))
+
+
+def gen_deep(root: Path, rng: random.Random, scale: float):
+    """A chain of 120 nested directories with 20 files at each level."""
+    directory = root
+    for depth in range(max(int(120 * scale), 2)):
+        directory = directory / f'level{depth:03d}'
+        for i in range(20):
+            _write(directory / f'file{i:02d}.py', _source_text(rng, 2048))
+
+
+def gen_notebooks(root: Path, rng: random.Random, scale: float):
+    """Notebooks with text outputs and ~100 KB base64 PNG outputs."""
+    for n in range(max(int(200 * scale), 2)):
+        cells = []
+        for c in range(6):
+            outputs = [{'output_type': 'stream', 'name': 'stdout',
+                        'text': [_source_text(rng, 300).decode('ascii') + '\n']}]
+            if c % 2:
+                image = b'\x89PNG\r\n\x1a\n' + rng.getrandbits(8 * 75000).to_bytes(75000, 'little')
+                outputs.append({'output_type': 'display_data', 'metadata': {},
+                                'data': {'image/png': base64.b64encode(image).decode('ascii'),
+                                         'text/plain': ['<Figure size 640x480 with 1 Axes>']}})
+            cells.append({'cell_type': 'code', 'execution_count': c + 1, 'metadata': {},
+                          'source': [_source_text(rng, 400).decode('ascii')], 'outputs': outputs})
+        notebook = {'cells': cells, 'metadata': {'kernelspec': {'name': 'python3'}},
+                    'nbformat': 4, 'nbformat_minor': 5}
+        _write(root / f'notebook{n:03d}.ipynb', json.dumps(notebook, indent=1).encode('utf-8'))
+
+
+def gen_excluded(root: Path, rng: random.Random, scale: float):
+    """300 real files next to node_modules, a virtualenv, caches and gitignored output."""
+    for i in range(max(int(300 * scale), 1)):
+        _write(root / 'src' / f'module{i:03d}.py', _source_text(rng, 1024))
+    for i in range(int(20000 * scale)):
+        _write(root / 'node_modules' / f'pkg{i // 50:03d}' / f'index{i % 50}.js', b'module.exports = {};\n')
+    for i in range(int(5000 * scale)):
+        _write(root / '.venv' / 'lib' / f'site{i // 100:02d}' / f'mod{i % 100}.py', b'pass\n')
+    for i in range(int(2000 * scale)):
+        _write(root / 'src' / '__pycache__' / f'module{i:04d}.cpython-311.pyc', b'\0' * 256)
+        _write(root / 'build' / f'out{i:04d}.o', b'\0' * 256)
+        _write(root / 'logs' / f'run{i:04d}.log', b'log line\n')
+    _write(root / 'logs' / 'keep.log', b'kept by a negated rule\n')
+    _write(root / '.gitignore', b'build/\n*.log\n!keep.log\n/dist\n*.tmp\n**/checkpoints/\n')
+
+
+TREES: Dict[str, Callable[[Path, random.Random, float], None]] = {
+    'tiny': gen_tiny,
+    'large': gen_large,
+    'deep': gen_deep,
+    'notebooks': gen_notebooks,
+    'excluded': gen_excluded,
+}
+
+
+def ensure_tree(workdir: Path, name: str, scale: float) -> Path:
+    """Generate a tree unless an identical one is already in workdir."""
+    root = workdir / 'trees' / name
+    marker = workdir / 'trees' / f'{name}.json'
+    spec = {'version': TREE_VERSION, 'scale': scale}
+    try:
+        if json.loads(marker.read_text()) == spec and root.is_dir():
+            return root
+    except (OSError, ValueError):
+        pass
+
+    print(f'Generating {name} tree...', flush=True)
+    shutil.rmtree(root, ignore_errors=True)
+    root.mkdir(parents=True)
+    TREES[name](root, random.Random(f'{name}-{TREE_VERSION}'), scale)
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            os.utime(os.path.join(dirpath, filename), (FIXED_MTIME, FIXED_MTIME))
+    marker.write_text(json.dumps(spec))
+    return root
+
+
+# Benchmarks (run in a child process)
+
+def peak_rss() -> Optional[int]:
+    """Peak resident set size of this process in bytes."""
+    try:
+        # Unlike ru_maxrss, VmHWM is not inherited from the parent process
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def setup_benchmark(kind: str, root: Path, workdir: Path, server_url: Optional[str]) -> tuple:
+    """
+    Prepare one benchmark.
+
+    Returns:
+        (function to time, bytes processed per call, items processed per call)
+    """
+    import submit
+
+    if kind == 'walk':
+        files = sum(1 for _ in submit.walk_submission_files(root, submit.DEFAULT_EXCLUDE_PATTERNS))
+
+        def run():
+            for _ in submit.walk_submission_files(root, submit.DEFAULT_EXCLUDE_PATTERNS):
+                pass
+        return run, 0, files
+
+    if kind == 'exclude':
+        paths = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            rel = os.path.relpath(dirpath, root)
+            prefix = '' if rel == '.' else rel.replace(os.sep, '/') + '/'
+            paths.extend((prefix + d, True) for d in dirnames)
+            paths.extend((prefix + f, False) for f in filenames)
+        rules = list(submit.DEFAULT_EXCLUDE_PATTERNS)
+        if (root / '.gitignore').exists():
+            rules += (root / '.gitignore').read_text().splitlines()
+
+        def run():
+            matcher = submit.IgnoreMatcher().extend(rules)
+            for path, is_dir in paths:
+                matcher.is_excluded(path, is_dir)
+        return run, 0, len(paths)
+
+    # Throughput of the remaining benchmarks counts the files that are archived
+    entries = list(submit.walk_submission_files(root, submit.DEFAULT_EXCLUDE_PATTERNS))
+    files = len(entries)
+    size = sum(st.st_size for _, _, st in entries)
+    output = workdir / 'output.zip'
+
+    if kind in ('archive', 'archive-cached'):
+        cached = kind == 'archive-cached'
+        if cached:
+            submit.build_zip_archive(str(root), str(output), use_cache=True)
+
+        def run():
+            submit.build_zip_archive(str(root), str(output), use_cache=cached)
+        return run, size, files
+
+    client = submit.SubmissionClient(server_url)
+    client.retry.retries = 0
+    client.token = client._make_request(f'{server_url}/api/auth/login', method='POST',
+                                        data={'email': 'bench@example.com', 'password': 'bench'})['token']
+
+    if kind == 'upload':
+        submit.build_zip_archive(str(root), str(output))
+        archive_size = output.stat().st_size
+        fields = {'assignmentId': 'a1', 'textContent': '', 'status': 'submitted'}
+        files_part = {'files': ('bench.zip', str(output), 'application/zip')}
+
+        def run():
+            client._multipart_request(f'{server_url}/api/submissions', fields, files_part,
+                                      headers=client.get_headers())
+        return run, archive_size, 1
+
+    if kind == 'pipeline':
+        def run():
+            client.upload_directory('a1', str(root), 'bench.zip')
+        return run, size, files
+
+    raise ValueError(f'Unknown benchmark kind: {kind}')
+
+
+def run_child(args: argparse.Namespace):
+    """Run one benchmark and print its result as JSON (child process entry point)."""
+    sys.path.insert(0, str(REPO_DIR))
+    kind, tree = args.child.split(':')
+    root = args.workdir / 'trees' / tree
+    run, size, items = setup_benchmark(kind, root, Path(os.environ['HOME']), args.server)
+
+    for _ in range(args.warmup):
+        run()
+    times = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+
+    print(json.dumps({'name': args.child, 'times': times, 'bytes': size, 'items': items,
+                      'peakRss': peak_rss()}))
+
+
+# Suite (parent process)
+
+KINDS = ['walk', 'exclude', 'archive', 'archive-cached', 'upload', 'pipeline']
+
+
+def summarize(result: Dict[str, Any]) -> Dict[str, Any]:
+    median = statistics.median(result['times'])
+    summary = {
+        'name': result['name'],
+        'medianSeconds': round(median, 6),
+        'minSeconds': round(min(result['times']), 6),
+        'times': [round(t, 6) for t in result['times']],
+        'bytes': result['bytes'],
+        'items': result['items'],
+        'peakRss': result['peakRss'],
+    }
+    if median > 0:
+        summary['mbPerSecond'] = round(result['bytes'] / median / 1024 / 1024, 3)
+        summary['itemsPerSecond'] = round(result['items'] / median, 1)
+    return summary
+
+
+def compare(summary: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+            rss_tolerance: float) -> tuple:
+    """Return (regressed, note) for one benchmark against its baseline entry."""
+    ratio = summary['medianSeconds'] / baseline['medianSeconds'] if baseline['medianSeconds'] else 1.0
+    note = f'{(ratio - 1) * 100:+.0f}%'
+    regressed = ratio > 1 + tolerance
+    if summary['peakRss'] and baseline.get('peakRss'):
+        rss_ratio = summary['peakRss'] / baseline['peakRss']
+        if rss_ratio > 1 + rss_tolerance:
+            regressed = True
+            note += f' RSS {(rss_ratio - 1) * 100:+.0f}%'
+    return regressed, note + (' REGRESSION' if regressed else '')
+
+
+def environment() -> Dict[str, Any]:
+    return {'python': sys.version.split()[0], 'platform': sys.platform, 'cpuCount': os.cpu_count()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark packing and uploading with submit.py')
+    parser.add_argument('-k', '--filter', action='append', default=[],
+                        help='Only run benchmarks whose name contains this (repeatable), '
+                             'e.g. archive or :tiny')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Scale factor for tree sizes (default: 1.0)')
+    parser.add_argument('--quick', action='store_true', help='Same as --scale 0.1 --repeat 1')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed rounds per benchmark (default: 3)')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed rounds per benchmark (default: 1)')
+    parser.add_argument('--workdir', type=Path, default=DEFAULT_WORKDIR,
+                        help=f'Where generated trees are kept (default: {DEFAULT_WORKDIR})')
+    parser.add_argument('--json', type=Path, help='Write the results to this file')
+    parser.add_argument('--baseline', type=Path, help='Compare against results saved earlier')
+    parser.add_argument('--save-baseline', type=Path, help='Save the results as a baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown of the median time vs. the baseline (default: 0.25)')
+    parser.add_argument('--rss-tolerance', type=float, default=0.25,
+                        help='Allowed growth of peak RSS vs. the baseline (default: 0.25)')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--server', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    args.workdir = args.workdir.resolve()
+    if args.child:
+        run_child(args)
+        return
+
+    if args.quick:
+        args.scale = 0.1
+        args.repeat = 1
+
+    names = [f'{kind}:{tree}' for tree in TREES for kind in KINDS]
+    if args.filter:
+        names = [name for name in names if any(f in name for f in args.filter)]
+    if not names:
+        parser.error('no benchmark matches --filter')
+
+    baseline = {}
+    if args.baseline:
+        saved = json.loads(args.baseline.read_text())
+        if saved.get('environment') != environment():
+            print(f"Warning: baseline was recorded on {saved.get('environment')}, "
+                  f"this is {environment()}")
+        if saved.get('scale') != args.scale:
+            print(f"Warning: baseline was recorded with --scale {saved.get('scale')}")
+        baseline = {b['name']: b for b in saved['benchmarks']}
+
+    args.workdir.mkdir(parents=True, exist_ok=True)
+    for tree in sorted({name.split(':')[1] for name in names}):
+        ensure_tree(args.workdir, tree, args.scale)
+
+    sys.path.insert(0, str(TOOLS_DIR))
+    import standin_server
+    server = standin_server.start_server(password='bench', discard=True, max_file_size=1 << 40)
+
+    print()
+    print(f"{'benchmark':<26} {'median':>9} {'min':>9} {'MB/s':>9} {'items/s':>11} {'peak RSS':>10}  baseline")
+    results = []
+    regressions = 0
+    try:
+        for name in names:
+            # Each benchmark gets an empty home directory for the archive cache and other state
+            home = args.workdir / 'home'
+            shutil.rmtree(home, ignore_errors=True)
+            home.mkdir()
+            command = [sys.executable, __file__, '--child', name, '--workdir', str(args.workdir),
+                       '--server', server.url, '--repeat', str(args.repeat), '--warmup', str(args.warmup)]
+            completed = subprocess.run(command, env=dict(os.environ, HOME=str(home), USERPROFILE=str(home)),
+                                       stdout=subprocess.PIPE, universal_newlines=True)
+            if completed.returncode != 0:
+                print(f'{name:<26} failed (exit status {completed.returncode})')
+                regressions += 1
+                continue
+            summary = summarize(json.loads(completed.stdout.strip().splitlines()[-1]))
+            results.append(summary)
+
+            note = ''
+            if name in baseline:
+                regressed, note = compare(summary, baseline[name], args.tolerance, args.rss_tolerance)
+                regressions += regressed
+            rss = f"{summary['peakRss'] / 1024 / 1024:.1f} MB" if summary['peakRss'] else '-'
+            mb = f"{summary['mbPerSecond']:.1f}" if summary.get('mbPerSecond') else '-'
+            print(f"{name:<26} {summary['medianSeconds']:>8.3f}s {summary['minSeconds']:>8.3f}s "
+                  f"{mb:>9} {summary.get('itemsPerSecond', 0):>11,.0f} {rss:>10}  {note}", flush=True)
+    finally:
+        server.shutdown()
+
+    report = {'environment': environment(), 'scale': args.scale, 'repeat': args.repeat,
+              'benchmarks': results}
+    for path in (args.json, args.save_baseline):
+        if path:
+            path.write_text(json.dumps(report, indent=2) + '\n')
+            print(f'Results written to {path}')
+
+    if baseline:
+        print(f'{regressions} regression(s) against {args.baseline}')
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Deadline-rush load test for submit.py
+
+Simulates many students running submit.py at once: each one logs in, looks
+up the assignment, zips a generated project with create_zip_archive and
+uploads it with SubmissionClient, exactly as the script does for a real
+student. Runs against the local stand-in server (tools/standin_server.py),
+started in-process with the given latency and fault injection, or against
+a stand-in started separately (--server).
+
+Projects are generated before the rush, one per student, with sizes drawn
+from --size and a mix of compressible source text and incompressible data.
+Students then start within --ramp seconds of each other, each on its own
+thread with its own connection pool and retry policy.
+
+Usage:
+    python tools/loadtest.py                                  # 100 students, 1 MB median
+    python tools/loadtest.py -n 300 --ramp 10 --latency 0.2 --error-rate 0.1
+    python tools/loadtest.py --size uniform:2MB:30MB --drop-rate 0.05 --retries 3
+    python tools/loadtest.py --server http://127.0.0.1:3001 --password password
+
+Reports p50/p95/p99 latency of every phase, throughput and failure and
+retry rates. Exit status 1 if more than --max-failure-rate of the students
+failed to submit.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable
+
+TOOLS_DIR = Path(__file__).resolve().parent
+REPO_DIR = TOOLS_DIR.parent
+
+DEFAULT_WORKDIR = Path(tempfile.gettempdir()) / 'submit-loadtest'
+
+PHASES = ['login', 'lookup', 'archive', 'upload']
+
+SIZE_UNITS = {'': 1, 'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+
+# Size distributions
+
+def parse_size(text: str) -> int:
+    """Parse a size such as 512KB or 2.5MB into bytes."""
+    match = re.fullmatch(r'\s*([0-9.]+)\s*([KMG]?B?)\s*', text, re.IGNORECASE)
+    if not match:
+        raise ValueError(f'invalid size: {text!r}')
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+def size_distribution(spec: str) -> Callable[[random.Random], int]:
+    """
+    Parse a --size specification into a sampler of project sizes in bytes.
+
+    Specifications:
+        fixed:SIZE               every project has SIZE bytes
+        uniform:MIN:MAX          uniformly distributed between MIN and MAX
+        lognormal:MEDIAN:SIGMA   log-normally distributed around MEDIAN; SIGMA
+                                 is the standard deviation of the log (a long
+                                 tail of large projects, as in real courses)
+    """
+    kind, _, rest = spec.partition(':')
+    params = rest.split(':') if rest else []
+    try:
+        if kind == 'fixed' and len(params) == 1:
+            size = parse_size(params[0])
+            return lambda rng: size
+        if kind == 'uniform' and len(params) == 2:
+            low, high = parse_size(params[0]), parse_size(params[1])
+            return lambda rng: rng.randint(low, high)
+        if kind == 'lognormal' and len(params) == 2:
+            median, sigma = parse_size(params[0]), float(params[1])
+            return lambda rng: int(median * rng.lognormvariate(0, sigma))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    raise argparse.ArgumentTypeError(
+        f'invalid size distribution: {spec!r} (use fixed:SIZE, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA)')
+
+
+# Project generation
+
+def generate_project(root: Path, rng: random.Random, size: int, incompressible: float):
+    """Write about size bytes of Python sources, plus random data for the incompressible fraction."""
+    if root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+    binary = int(size * incompressible)
+    text = size - binary
+
+    words = [b'def', b'return', b'self', b'value', b'import', b'numpy', b'for', b'in', b'range',
+             b'data', b'model', b'loss', b'train', b'(', b')', b':', b'=']
+    written = 0
+    i = 0
+    while written < text:
+        chunk = min(text - written, rng.randint(2, 64) * 1024)
+        line = b' '.join(rng.choice(words) for _ in range(12)) + b'\n'
+        data = (line * (chunk // len(line) + 1))[:chunk]
+        path = root / ('src' if i % 4 else '') / f'module_{i}.py'
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(data)
+        written += chunk
+        i += 1
+
+    written = 0
+    i = 0
+    while written < binary:
+        chunk = min(binary - written, rng.randint(256, 4096) * 1024)
+        (root / 'data').mkdir(exist_ok=True)
+        (root / 'data' / f'weights_{i}.bin').write_bytes(rng.getrandbits(chunk * 8).to_bytes(chunk, 'little'))
+        written += chunk
+        i += 1
+
+
+# Running students
+
+def failure_reason(output: List[str], default: str) -> str:
+    """The last error line a student's run printed."""
+    for line in reversed(''.join(output).splitlines()):
+        if line.strip().startswith('✗'):
+            return line.strip()[1:].strip()
+    return default
+
+
+def run_student(submit, index: int, args: argparse.Namespace, project: Path,
+                started: float, output) -> Dict[str, Any]:
+    """Go through login, lookup, archive and upload like one run of submit.py."""
+    lines = output.capture()
+    result: Dict[str, Any] = {'student': index, 'times': {}, 'retries': 0, 'bytes': 0}
+    retries = [0]
+
+    class CountingRetryPolicy(submit.RetryPolicy):
+        def delay(self, attempt: int, error: BaseException) -> float:
+            retries[0] += 1
+            return super().delay(attempt, error)
+
+    client = submit.SubmissionClient(args.server)
+    client.retry = CountingRetryPolicy(args.retries, args.base_delay, args.max_delay)
+    # Revalidate the catalog like a student whose cached copy has expired
+    client.catalog_ttl = 0
+    zip_path = project.with_suffix('.zip')
+
+    def phase(name: str, operation: Callable[[], Any]) -> Any:
+        phase_started = time.perf_counter()
+        try:
+            value = operation()
+        except Exception as e:
+            print(f'✗ {e}')
+            value = None
+        result['times'][name] = time.perf_counter() - phase_started
+        if not value:
+            result['failed'] = name
+            result['error'] = failure_reason(lines, f'{name} failed')
+        return value
+
+    try:
+        time.sleep(max(0.0, started + random.uniform(0, args.ramp) - time.perf_counter()))
+        begun = time.perf_counter()
+        assignment = (phase('login', lambda: client.login(f'student{index:04d}@example.com', args.password))
+                      and phase('lookup', lambda: client.find_assignment(args.assignment)))
+        stats = assignment and phase('archive', lambda: submit.create_zip_archive(
+            str(project), str(zip_path), jobs=args.jobs, compression=args.compression))
+        if stats and phase('upload', lambda: client.create_submission(assignment['id'], str(zip_path))):
+            result['bytes'] = zip_path.stat().st_size
+        result['times']['total'] = time.perf_counter() - begun
+        result['finished'] = time.perf_counter() - started
+    finally:
+        result['retries'] = retries[0]
+        client.close()
+        try:
+            os.remove(zip_path)
+        except OSError:
+            pass
+        output.release()
+    if args.verbose and 'failed' in result:
+        output.stdout.write(f"--- student {index} failed during {result['failed']}:\n{''.join(lines)}\n")
+    return result
+
+
+# Report
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile of values (0 < p <= 100)."""
+    ordered = sorted(values)
+    return ordered[max(0, -(-len(ordered) * p // 100) - 1)]
+
+
+def summarize(results: List[Dict[str, Any]], wall: float) -> Dict[str, Any]:
+    phases = {}
+    for name in PHASES + ['total']:
+        times = [r['times'][name] for r in results if name in r['times']]
+        if name == 'total':
+            failed = sum(1 for r in results if 'failed' in r)
+        else:
+            failed = sum(1 for r in results if r.get('failed') == name)
+        entry: Dict[str, Any] = {'count': len(times), 'failed': failed}
+        if times:
+            entry.update({f'p{p}': round(percentile(times, p), 4) for p in (50, 95, 99)})
+            entry['max'] = round(max(times), 4)
+        phases[name] = entry
+
+    submitted = [r for r in results if 'failed' not in r]
+    errors: Dict[str, int] = {}
+    for r in results:
+        if 'failed' in r:
+            key = f"{r['failed']}: {r['error']}"
+            errors[key] = errors.get(key, 0) + 1
+    uploaded = sum(r['bytes'] for r in submitted)
+    return {
+        'students': len(results),
+        'submitted': len(submitted),
+        'failureRate': round(1 - len(submitted) / len(results), 4) if results else 0.0,
+        'wallSeconds': round(wall, 3),
+        'submissionsPerSecond': round(len(submitted) / wall, 3) if wall else 0.0,
+        'uploadedBytes': uploaded,
+        'mbPerSecond': round(uploaded / wall / 1024 / 1024, 3) if wall else 0.0,
+        'retries': sum(r['retries'] for r in results),
+        'studentsRetrying': sum(1 for r in results if r['retries']),
+        'phases': phases,
+        'errors': dict(sorted(errors.items(), key=lambda item: -item[1])),
+    }
+
+
+def print_report(submit, summary: Dict[str, Any], server_stats: Optional[Dict[str, Any]]):
+    print()
+    print(f"{'phase':<9} {'ok':>6} {'failed':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for name, entry in summary['phases'].items():
+        if 'p50' in entry:
+            times = ' '.join(f"{entry[k]:>8.3f}s" for k in ('p50', 'p95', 'p99', 'max'))
+        else:
+            times = ' '.join(f"{'-':>9}" for _ in range(4))
+        print(f"{name:<9} {entry['count'] - entry['failed']:>6} {entry['failed']:>7} {times}")
+
+    print()
+    print(f"Submitted: {summary['submitted']}/{summary['students']} students "
+          f"({summary['failureRate'] * 100:.1f}% failed) in {summary['wallSeconds']:.1f}s")
+    print(f"Throughput: {summary['submissionsPerSecond']:.2f} submissions/s, "
+          f"{summary['mbPerSecond']:.2f} MB/s ({submit._format_size(summary['uploadedBytes'])} uploaded)")
+    print(f"Retries: {summary['retries']} by {summary['studentsRetrying']} students")
+    if server_stats:
+        print('Server: ' + ', '.join(f'{key} {value}' for key, value in sorted(server_stats.items())))
+    if summary['errors']:
+        print('Failures:')
+        for error, count in summary['errors'].items():
+            print(f'  {count:>5} × {error}')
+
+
+def fetch_server_stats(server_url: str) -> Optional[Dict[str, Any]]:
+    """The stand-in's /_stats counters, or None if the server has none."""
+    try:
+        with urllib.request.urlopen(f'{server_url}/_stats', timeout=5) as response:
+            return json.loads(response.read().decode('utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate a deadline rush of submit.py runs')
+    parser.add_argument('-n', '--students', type=int, default=100,
+                        help='Number of students submitting (default: 100)')
+    parser.add_argument('--ramp', type=float, default=5.0,
+                        help='Students start at random times within this many seconds (default: 5)')
+    parser.add_argument('--size', type=size_distribution, default='lognormal:1MB:1.0',
+                        help='Project size distribution: fixed:SIZE, uniform:MIN:MAX or '
+                             'lognormal:MEDIAN:SIGMA (default: lognormal:1MB:1.0)')
+    parser.add_argument('--incompressible', type=float, default=0.3,
+                        help='Fraction of each project that is random data (default: 0.3)')
+    parser.add_argument('-a', '--assignment', default='Homework 1',
+                        help='Assignment to submit to (default: Homework 1)')
+    parser.add_argument('--jobs', type=int, default=1, help='--jobs of each student (default: 1)')
+    parser.add_argument('--compression', default='balanced',
+                        help='--compression of each student (default: balanced)')
+    parser.add_argument('--retries', type=int, default=5, help='Retries per request (default: 5)')
+    parser.add_argument('--base-delay', type=float, default=1.0,
+                        help='Upper bound of the first retry delay in seconds (default: 1.0)')
+    parser.add_argument('--max-delay', type=float, default=30.0,
+                        help='Upper bound of any retry delay in seconds (default: 30)')
+    parser.add_argument('--server', help='URL of a running stand-in server (default: start one)')
+    parser.add_argument('--password', default='loadtest',
+                        help='Password of the students (default: loadtest)')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Mean added latency per request in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with 503 Service Unavailable')
+    parser.add_argument('--retry-after', type=int, default=0,
+                        help='Retry-After seconds sent with injected 503 errors')
+    parser.add_argument('--drop-rate', type=float, default=0.0,
+                        help='Fraction of uploads whose connection is dropped halfway through')
+    parser.add_argument('--no-resumable', action='store_true',
+                        help='Answer 404 to resumable upload requests, like the real backend')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Random seed for project sizes and fault injection (default: 0)')
+    parser.add_argument('--workdir', type=Path, default=DEFAULT_WORKDIR,
+                        help=f'Where projects are generated (default: {DEFAULT_WORKDIR})')
+    parser.add_argument('--json', type=Path, help='Write the results to this file')
+    parser.add_argument('--max-failure-rate', type=float, default=0.0,
+                        help='Exit with status 1 if more students than this fraction failed (default: 0)')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="Print the output of students who failed")
+    args = parser.parse_args()
+    if args.students < 1:
+        parser.error('--students must be at least 1')
+
+    args.workdir = args.workdir.resolve()
+    # A fresh home directory for sessions, the catalog cache and upload state
+    home = args.workdir / 'home'
+    shutil.rmtree(home, ignore_errors=True)
+    home.mkdir(parents=True)
+    os.environ['HOME'] = os.environ['USERPROFILE'] = str(home)
+    sys.path.insert(0, str(REPO_DIR))
+    sys.path.insert(0, str(TOOLS_DIR))
+    import submit
+    import standin_server
+
+    random.seed(args.seed)
+    rng = random.Random(args.seed)
+    sizes = [max(1, args.size(rng)) for _ in range(args.students)]
+    print(f"Generating {args.students} projects ({submit._format_size(sum(sizes))}, "
+          f"median {submit._format_size(percentile(sizes, 50))}, "
+          f"largest {submit._format_size(max(sizes))})...")
+    projects = []
+    for i, size in enumerate(sizes):
+        project = args.workdir / 'students' / f'student{i:04d}'
+        generate_project(project, random.Random(f'{args.seed}:{i}'), size, args.incompressible)
+        projects.append(project)
+
+    server = None
+    if not args.server:
+        server = standin_server.start_server(
+            password=args.password, discard=True, latency=args.latency, error_rate=args.error_rate,
+            drop_rate=args.drop_rate, retry_after=args.retry_after, resumable=not args.no_resumable)
+        args.server = server.url
+    print(f"Starting {args.students} students within {args.ramp:g}s against {args.server}...")
+
+    output = submit.ThreadOutput(sys.stdout)
+    results: List[Optional[Dict[str, Any]]] = [None] * args.students
+    sys.stdout = output
+    try:
+        started = time.perf_counter()
+
+        def student(i: int):
+            results[i] = run_student(submit, i, args, projects[i], started, output)
+
+        threads = [threading.Thread(target=student, args=(i,), name=f'student-{i}', daemon=True)
+                   for i in range(args.students)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = max(r['finished'] for r in results)
+        server_stats = fetch_server_stats(args.server)
+    finally:
+        sys.stdout = output.stdout
+        if server:
+            server.shutdown()
+
+    summary = summarize(results, wall)
+    print_report(submit, summary, server_stats)
+    if args.json:
+        report = {'options': {key: value for key, value in vars(args).items()
+                              if isinstance(value, (int, float, str, bool, type(None)))},
+                  'serverStats': server_stats, **summary}
+        args.json.write_text(json.dumps(report, indent=2) + '\n')
+    sys.exit(1 if summary['failureRate'] > args.max_failure_rate else 0)
+
+
+if __name__ == '__main__':
+    main()
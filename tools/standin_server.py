@@ -0,0 +1,762 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the AI+ Bootcamp API, for developing and testing submit.py
+
+Implements the parts of the backend that submit.py talks to (login,
+assignments, submissions and attachments) in memory, plus the resumable
+upload endpoints submit.py uses when a server offers them, and can inject
+latency and failures to reproduce a saturated server. Uses only the Python
+standard library.
+
+Usage:
+    python tools/standin_server.py --port 3001
+    python tools/standin_server.py --port 3001 --error-rate 0.2 --drop-rate 0.1
+    python submit.py -s http://127.0.0.1:3001 -e student@example.com -d ./hw -a "Homework 1"
+
+Any email logs in with the password given by --password, as a student
+unless it is listed with --staff (which makes it a TA). Uploaded files are
+kept in memory unless --storage (or --discard) is given. Downloads honour
+single Range requests, like Express's res.download.
+
+Resumable upload protocol (not part of the real backend):
+    POST  /api/uploads       {filename, size, sha256, contentType} -> 201 {id, offset, size}
+    GET   /api/uploads/:id   -> {id, offset, size}
+    PATCH /api/uploads/:id   Upload-Offset header, raw bytes -> {id, offset, size};
+                             409 {offset} if Upload-Offset is not the current offset
+    POST  /api/submissions   {assignmentId, textContent, status, uploadIds} attaches
+                             completed uploads; repeating it for the same upload is a no-op
+
+Delta submission protocol (not part of the real backend either):
+    GET   /api/submissions/:id/manifest  -> {base, files: {arcname: sha256}} of the
+                             zip archive (or volumes) last submitted; base is null
+                             if that was not an archive the stand-in could read
+    POST  /api/submissions   multipart with a deltaBase field (the manifest's base),
+                             a deletions field (JSON list of arcnames) and one zip of
+                             changed and added files; the stand-in rebuilds the full
+                             archive from the previous one and attaches that.
+                             409 if deltaBase is no longer the latest archive.
+"""
+
+import argparse
+import base64
+import email.parser
+import email.policy
+import hashlib
+import http.server
+import io
+import json
+import mimetypes
+import random
+import re
+import threading
+import time
+import uuid
+import zipfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+from urllib.parse import urlsplit, parse_qs
+
+
+MAX_FILE_SIZE = 10 * 1024 * 1024
+MAX_FILES = 10
+PAGE_SIZE = 20
+TOKEN_LIFETIME = 24 * 3600
+
+
+def iso_timestamp(when: Optional[datetime] = None) -> str:
+    """Format a time the way the backend's JSON does."""
+    when = when or datetime.now(timezone.utc)
+    return when.strftime('%Y-%m-%dT%H:%M:%S.') + f'{when.microsecond // 1000:03d}Z'
+
+
+def default_assignments() -> List[Dict[str, Any]]:
+    """A small catalog with an open, a closed and a late-allowed assignment."""
+    now = datetime.now(timezone.utc)
+    return [
+        {'id': 'a1', 'title': 'Homework 1', 'description': 'Warm-up exercises',
+         'dueDate': iso_timestamp(now + timedelta(days=7)), 'allowLateSubmission': False},
+        {'id': 'a2', 'title': 'Homework 2', 'description': 'Past due',
+         'dueDate': iso_timestamp(now - timedelta(days=1)), 'allowLateSubmission': False},
+        {'id': 'a3', 'title': 'Final Project', 'description': 'Late submission allowed',
+         'dueDate': iso_timestamp(now - timedelta(days=1)), 'allowLateSubmission': True},
+    ]
+
+
+class StandInState:
+    """In-memory data shared by all request handlers."""
+
+    def __init__(self, password: str, storage: Optional[Path] = None,
+                 assignments: Optional[List[Dict[str, Any]]] = None, discard: bool = False,
+                 staff: Optional[List[str]] = None):
+        self.password = password
+        self.staff = set(staff or [])  # emails that log in as TAs
+        self.storage = storage
+        self.discard = discard  # keep attachment records but not their contents
+        self.assignments = assignments or default_assignments()
+        self.tokens: Dict[str, str] = {}            # token -> email
+        self.submissions: Dict[str, Dict[str, Any]] = {}
+        self.attachments: Dict[str, Dict[str, Any]] = {}
+        self.uploads: Dict[str, Dict[str, Any]] = {}
+        self.counters: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def issue_token(self, email: str) -> str:
+        """Create an unsigned JWT-shaped token with the usual 24 hour expiry."""
+        def encode(data: Dict[str, Any]) -> str:
+            return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).rstrip(b'=').decode('ascii')
+
+        payload = {'userId': email, 'email': email, 'jti': uuid.uuid4().hex,
+                   'exp': int(time.time()) + TOKEN_LIFETIME}
+        token = f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode(payload)}.standin"
+        with self.lock:
+            self.tokens[token] = email
+        return token
+
+    def assignments_etag(self) -> str:
+        digest = hashlib.sha1(json.dumps(self.assignments, sort_keys=True).encode('utf-8'))
+        return f'W/"{digest.hexdigest()[:16]}"'
+
+    def store_file(self, name: str, data: bytes) -> Dict[str, Any]:
+        """Keep an uploaded file and return its attachment record."""
+        attachment_id = uuid.uuid4().hex
+        attachment = {'id': attachment_id, 'fileName': name, 'fileSize': len(data),
+                      'fileType': mimetypes.guess_type(name)[0] or 'application/octet-stream',
+                      'uploadedAt': iso_timestamp(), 'data': data, 'path': None}
+        if self.discard:
+            attachment['data'] = b''
+        elif self.storage is not None:
+            attachment['path'] = self.storage / f'{attachment_id}-{Path(name).name}'
+            attachment['path'].write_bytes(data)
+            attachment['data'] = None
+        with self.lock:
+            self.attachments[attachment_id] = attachment
+        return attachment
+
+    def file_bytes(self, attachment: Dict[str, Any]) -> bytes:
+        return attachment['data'] if attachment['path'] is None else attachment['path'].read_bytes()
+
+    def archive_bytes(self, attachments: List[Dict[str, Any]]) -> Optional[bytes]:
+        """The zip archive among attachments: a single .zip, or the volumes of the newest manifest."""
+        by_name = {attachment['fileName']: attachment for attachment in attachments}
+        for attachment in reversed(attachments):
+            if attachment['fileName'].endswith('.volumes.json'):
+                try:
+                    volumes = json.loads(self.file_bytes(attachment))['volumes']
+                    return b''.join(self.file_bytes(by_name[volume['name']]) for volume in volumes)
+                except (ValueError, KeyError, TypeError):
+                    return None
+        archives = [a for a in attachments if a['fileName'].endswith('.zip')]
+        return self.file_bytes(archives[0]) if len(archives) == 1 else None
+
+    def record_archive(self, submission: Dict[str, Any], attachments: List[Dict[str, Any]]):
+        """Remember the content manifest of the archive a submission request carried."""
+        record = None
+        if any(attachment['fileName'].endswith('.volumes.json') for attachment in attachments):
+            # The volumes may have come in earlier requests, one per request
+            with self.lock:
+                attachments_used = [self.attachments[attachment_id]
+                                    for attachment_id in submission['attachments']]
+        else:
+            attachments_used = attachments
+        data = self.archive_bytes(attachments_used)
+        if data:
+            try:
+                with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                    files = {info.filename: hashlib.sha256(archive.read(info)).hexdigest()
+                             for info in archive.infolist() if not info.is_dir()}
+                record = {'base': attachments[0]['id'], 'files': files,
+                          'attachmentIds': [attachment['id'] for attachment in attachments_used]}
+            except (zipfile.BadZipFile, ValueError, NotImplementedError):
+                pass
+        with self.lock:
+            submission['archive'] = record
+
+    def submit(self, email: str, assignment_id: str, text_content: str, status: str,
+               attachments: List[Dict[str, Any]]) -> tuple:
+        """Create or update the student's submission, appending attachments like the backend."""
+        with self.lock:
+            key = f'{email} {assignment_id}'
+            submission = self.submissions.get(key)
+            created = submission is None
+            if created:
+                submission = {'id': uuid.uuid4().hex, 'assignmentId': assignment_id,
+                              'studentId': email, 'submittedAt': None, 'grade': None,
+                              'attachments': [], 'createdAt': iso_timestamp()}
+                self.submissions[key] = submission
+            if status == 'submitted' and not submission['submittedAt']:
+                submission['submittedAt'] = iso_timestamp()
+            submission.update(textContent=text_content, status=status, updatedAt=iso_timestamp())
+            for attachment in attachments:
+                attachment['submissionId'] = submission['id']
+                submission['attachments'].append(attachment['id'])
+        return submission, created
+
+    def submission_json(self, submission: Dict[str, Any]) -> Dict[str, Any]:
+        data = {key: value for key, value in submission.items() if key not in ('attachments', 'archive', 'feedback')}
+        data['attachments'] = [
+            {key: value for key, value in self.attachments[attachment_id].items()
+             if key not in ('data', 'path', 'submissionId')}
+            for attachment_id in submission['attachments']
+        ]
+        return data
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    """Routes requests to the stand-in API; state and fault settings live on the server."""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'StandIn/1.0'
+    # Headers and body are written separately; like Node, don't let Nagle delay the body
+    disable_nagle_algorithm = True
+
+    @property
+    def state(self) -> StandInState:
+        return self.server.state
+
+    def log_message(self, format: str, *args: Any):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # Plumbing
+
+    def send_json(self, status: int, data: Any, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def read_body(self, drop_after: Optional[int] = None) -> Optional[bytes]:
+        """
+        Read the request body (Content-Length or chunked).
+
+        With drop_after, stop after that many bytes and close the connection,
+        simulating a connection reset in the middle of an upload; the bytes
+        read so far are returned and the caller must not reply.
+        """
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            parts = []
+            received = 0
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip(), 16)
+                if size == 0:
+                    while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                parts.append(self.rfile.read(size))
+                self.rfile.readline()
+                received += size
+                if drop_after is not None and received >= drop_after:
+                    self.close_connection = True
+                    return b''.join(parts)[:drop_after]
+            return b''.join(parts)
+
+        length = int(self.headers.get('Content-Length') or 0)
+        if drop_after is not None and drop_after < length:
+            data = self.rfile.read(drop_after)
+            self.close_connection = True
+            return data
+        return self.rfile.read(length)
+
+    def authenticated_email(self) -> Optional[str]:
+        authorization = self.headers.get('Authorization', '')
+        token = authorization[7:] if authorization.startswith('Bearer ') else ''
+        email = self.state.tokens.get(token)
+        if email is None:
+            self.send_json(401, {'error': 'Invalid or expired token'})
+        return email
+
+    def inject_faults(self) -> bool:
+        """Apply configured latency and errors; True if the request was answered."""
+        server = self.server
+        if server.latency:
+            time.sleep(random.expovariate(1 / server.latency))
+        if self.path not in ('/health', '/_stats') and random.random() < server.error_rate:
+            self.state.count('injected_errors')
+            # Discard the body so the connection can be reused
+            if self.command in ('POST', 'PATCH', 'PUT'):
+                self.read_body()
+            self.send_json(503, {'error': 'Service temporarily unavailable'},
+                           {'Retry-After': str(server.retry_after)} if server.retry_after else None)
+            return True
+        return False
+
+    def dispatch(self):
+        self.state.count('requests')
+        if self.inject_faults():
+            return
+        parts = urlsplit(self.path)
+        self.query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        for method, pattern, handler in self.ROUTES:
+            if method != self.command:
+                continue
+            match = re.fullmatch(pattern, parts.path)
+            if match:
+                handler(self, *match.groups())
+                return
+        if self.command in ('POST', 'PATCH', 'PUT'):
+            self.read_body()
+        self.send_json(404, {'error': 'Not found'})
+
+    do_GET = do_POST = do_PATCH = do_HEAD = dispatch
+
+    # Endpoints
+
+    def health(self):
+        self.send_json(200, {'status': 'healthy', 'timestamp': iso_timestamp(),
+                             'uptime': time.time() - self.server.started})
+
+    def login(self):
+        try:
+            data = json.loads(self.read_body() or b'{}')
+        except ValueError:
+            return self.send_json(400, {'error': 'Invalid JSON'})
+        if not data.get('email') or data.get('password') != self.state.password:
+            return self.send_json(401, {'error': 'Invalid credentials'})
+        email = data['email']
+        staff = email in self.state.staff
+        self.send_json(200, {'token': self.state.issue_token(email), 'user': {
+            'id': email, 'email': email, 'firstName': email.split('@')[0],
+            'lastName': 'TA' if staff else 'Student', 'role': 'ta' if staff else 'student'}})
+
+    def list_assignments(self):
+        if self.authenticated_email() is None:
+            return
+        etag = self.state.assignments_etag()
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        page = max(int(self.query.get('page', 1)), 1)
+        limit = max(int(self.query.get('limit', PAGE_SIZE)), 1)
+        assignments = self.state.assignments
+        self.send_json(200, {
+            'assignments': assignments[(page - 1) * limit:page * limit],
+            'total': len(assignments), 'page': page,
+            'totalPages': (len(assignments) + limit - 1) // limit,
+        }, {'ETag': etag})
+
+    def create_submission(self):
+        email = self.authenticated_email()
+        if email is None:
+            return self.read_body()
+
+        content_type = self.headers.get('Content-Type', '')
+        drop = self.server.drop_rate and random.random() < self.server.drop_rate
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.read_body(drop_after=(length or self.server.max_file_size) // 2 if drop else None)
+        if drop:
+            self.state.count('dropped_uploads')
+            self.close_connection = True
+            return
+
+        if content_type.startswith('application/json'):
+            data = json.loads(body or b'{}')
+            fields = {key: data.get(key) or '' for key in ('assignmentId', 'textContent', 'status')}
+            files = []
+            for upload_id in data.get('uploadIds', []):
+                upload = self.state.uploads.get(upload_id)
+                if upload is None or upload['offset'] != upload['size']:
+                    return self.send_json(400, {'error': f'Upload {upload_id} is not complete'})
+                files.append(upload)
+        else:
+            fields, files = self.parse_multipart(content_type, body)
+            if fields is None:
+                return self.send_json(400, {'error': 'Malformed multipart body'})
+            if len(files) > MAX_FILES:
+                return self.send_json(400, {'error': 'Unexpected field'})
+            if any(len(f['data']) > self.server.max_file_size for f in files):
+                return self.send_json(400, {'error': 'File too large'})
+
+        assignment_id = fields.get('assignmentId')
+        if not assignment_id:
+            return self.send_json(400, {'error': 'Assignment ID is required'})
+        assignment = next((a for a in self.state.assignments if a['id'] == assignment_id), None)
+        if assignment is None:
+            return self.send_json(404, {'error': 'Assignment not found'})
+        due = datetime.strptime(assignment['dueDate'][:19], '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc)
+        if fields.get('status') == 'submitted' and datetime.now(timezone.utc) > due \
+                and not assignment.get('allowLateSubmission'):
+            return self.send_json(400, {'error': 'Submission deadline has passed'})
+
+        received = sum(len(f['data']) for f in files if 'attachmentId' not in f)
+        if fields.get('deltaBase'):
+            merged = self.merge_delta(email, assignment_id, fields, files)
+            if merged is None:
+                return
+            self.state.count('delta_submissions')
+            files = [{'filename': files[0]['filename'], 'data': merged}]
+
+        attachments = []
+        for f in files:
+            if 'attachmentId' in f:
+                continue  # upload already attached by an earlier, retried request
+            attachment = self.state.store_file(f['filename'], f['data'])
+            f['attachmentId'] = attachment['id']
+            attachments.append(attachment)
+        submission, created = self.state.submit(email, assignment_id, fields.get('textContent', ''),
+                                                fields.get('status') or 'draft', attachments)
+        if attachments:
+            self.state.record_archive(submission, attachments)
+        self.state.count('submissions')
+        self.state.count('uploaded_bytes', received)
+        self.send_json(201 if created else 200, self.state.submission_json(submission))
+
+    def merge_delta(self, email: str, assignment_id: str, fields: Dict[str, str],
+                    files: List[Dict[str, Any]]) -> Optional[bytes]:
+        """Rebuild the full archive from the previous one and a delta, or send an error."""
+        with self.state.lock:
+            submission = self.state.submissions.get(f'{email} {assignment_id}')
+            record = submission and submission.get('archive')
+        if not record or record['base'] != fields['deltaBase']:
+            self.send_json(409, {'error': 'The previous submission has changed'})
+            return None
+        try:
+            deletions = set(json.loads(fields.get('deletions') or '[]'))
+        except ValueError:
+            deletions = None
+        if deletions is None or len(files) != 1:
+            self.send_json(400, {'error': 'A delta needs one archive and a JSON deletions list'})
+            return None
+
+        base_data = self.state.archive_bytes([self.state.attachments[attachment_id]
+                                              for attachment_id in record['attachmentIds']])
+        output = io.BytesIO()
+        try:
+            with zipfile.ZipFile(io.BytesIO(base_data)) as base, \
+                    zipfile.ZipFile(io.BytesIO(files[0]['data'])) as delta, \
+                    zipfile.ZipFile(output, 'w') as merged:
+                replaced = set(delta.namelist())
+                for info in base.infolist():
+                    if info.filename not in deletions and info.filename not in replaced:
+                        merged.writestr(info, base.read(info))
+                for info in delta.infolist():
+                    merged.writestr(info, delta.read(info))
+        except zipfile.BadZipFile:
+            self.send_json(400, {'error': 'Delta is not a zip archive'})
+            return None
+        return output.getvalue()
+
+    @staticmethod
+    def parse_multipart(content_type: str, body: bytes) -> tuple:
+        """Split a multipart/form-data body into ({name: value}, [{filename, data}])."""
+        match = re.search(r'boundary="?([^";]+)"?', content_type)
+        if not match:
+            return None, None
+        delimiter = b'--' + match.group(1).encode('latin-1')
+        header_parser = email.parser.BytesHeaderParser(policy=email.policy.HTTP)
+        fields, files = {}, []
+        position = body.find(delimiter)
+        while position >= 0:
+            position += len(delimiter)
+            if body[position:position + 2] == b'--':
+                return fields, files
+            header_end = body.find(b'\r\n\r\n', position)
+            part_end = body.find(b'\r\n' + delimiter, max(header_end, 0))
+            if header_end < 0 or part_end < 0:
+                break
+            headers = header_parser.parsebytes(body[position + 2:header_end + 4])
+            content = body[header_end + 4:part_end]
+            if headers.get_filename() is not None:
+                files.append({'filename': headers.get_filename(), 'data': content})
+            else:
+                fields[headers.get_param('name', header='content-disposition')] = content.decode('utf-8')
+            position = part_end + 2
+        return None, None
+
+    def my_submissions(self):
+        email = self.authenticated_email()
+        if email is None:
+            return
+        assignment_id = self.query.get('assignmentId')
+        self.send_json(200, [
+            self.state.submission_json(s) for s in self.state.submissions.values()
+            if s['studentId'] == email and (not assignment_id or s['assignmentId'] == assignment_id)
+        ])
+
+    def get_submission(self, submission_id: str):
+        email = self.authenticated_email()
+        if email is None:
+            return
+        for submission in self.state.submissions.values():
+            if submission['id'] == submission_id:
+                if submission['studentId'] != email and email not in self.state.staff:
+                    return self.send_json(403, {'error': 'Forbidden'})
+                # Only the details carry feedback (newest first), as in the backend
+                return self.send_json(200, {**self.state.submission_json(submission),
+                                            'feedback': submission.get('feedback', [])})
+        self.send_json(404, {'error': 'Submission not found'})
+
+    def submission_manifest(self, submission_id: str):
+        email = self.authenticated_email()
+        if email is None:
+            return
+        for submission in self.state.submissions.values():
+            if submission['id'] == submission_id and submission['studentId'] == email:
+                record = submission.get('archive')
+                return self.send_json(200, {'base': record['base'] if record else None,
+                                            'files': record['files'] if record else {}})
+        self.send_json(404, {'error': 'Submission not found'})
+
+    def submissions_by_assignment(self, assignment_id: str):
+        email = self.authenticated_email()
+        if email is None:
+            return
+        if email not in self.state.staff:
+            return self.send_json(403, {'error': 'Insufficient permissions'})
+        page = max(int(self.query.get('page', 1)), 1)
+        limit = max(int(self.query.get('limit', PAGE_SIZE)), 1)
+        submissions = sorted((s for s in self.state.submissions.values() if s['assignmentId'] == assignment_id),
+                             key=lambda s: s['submittedAt'] or '', reverse=True)
+        self.send_json(200, {
+            'submissions': [
+                {**{key: value for key, value in self.state.submission_json(s).items()
+                    if key not in ('attachments', 'textContent')},
+                 'studentName': f"{s['studentId'].split('@')[0]} Student"}
+                for s in submissions[(page - 1) * limit:page * limit]
+            ],
+            'total': len(submissions), 'page': page,
+            'totalPages': (len(submissions) + limit - 1) // limit,
+        })
+
+    def download_attachment(self, attachment_id: str):
+        email = self.authenticated_email()
+        if email is None:
+            return
+        attachment = self.state.attachments.get(attachment_id)
+        if attachment is None:
+            return self.send_json(404, {'error': 'Attachment not found'})
+        submission = next((s for s in self.state.submissions.values()
+                           if s['id'] == attachment.get('submissionId')), None)
+        if submission and submission['studentId'] != email and email not in self.state.staff:
+            return self.send_json(403, {'error': 'Forbidden'})
+        data = self.state.file_bytes(attachment)
+        start, end = 0, len(data)
+        match = re.fullmatch(r'bytes=(\d*)-(\d*)', self.headers.get('Range', ''))
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)) + 1, len(data)) if match.group(2) else len(data)
+            else:
+                start = max(len(data) - int(match.group(2)), 0)
+            if start >= end:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(data)}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+        partial = (start, end) != (0, len(data))
+        self.send_response(206 if partial else 200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Disposition', f'attachment; filename="{attachment["fileName"]}"')
+        self.send_header('Accept-Ranges', 'bytes')
+        if partial:
+            self.send_header('Content-Range', f'bytes {start}-{end - 1}/{len(data)}')
+        self.send_header('Content-Length', str(end - start))
+        self.end_headers()
+        if self.command == 'HEAD':
+            return
+        self.state.count('downloaded_bytes', end - start)
+        if self.server.drop_rate and random.random() < self.server.drop_rate:
+            # Cut the connection halfway through, like a dropped download
+            self.state.count('dropped_downloads')
+            self.wfile.write(data[start:start + (end - start) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(data[start:end])
+
+    # Resumable uploads
+
+    def upload_json(self, upload: Dict[str, Any]) -> Dict[str, Any]:
+        return {'id': upload['id'], 'offset': upload['offset'], 'size': upload['size']}
+
+    def find_upload(self, upload_id: str, email: str) -> Optional[Dict[str, Any]]:
+        upload = self.state.uploads.get(upload_id)
+        if upload is None or upload['email'] != email:
+            self.send_json(404, {'error': 'Upload not found'})
+            return None
+        return upload
+
+    def create_upload(self):
+        email = self.authenticated_email()
+        if email is None:
+            return self.read_body()
+        if not self.server.resumable:
+            self.read_body()
+            return self.send_json(404, {'error': 'Not found'})
+        data = json.loads(self.read_body() or b'{}')
+        size = int(data.get('size', -1))
+        if not 0 <= size <= self.server.max_file_size:
+            return self.send_json(400, {'error': 'File too large'})
+        upload = {'id': uuid.uuid4().hex, 'email': email, 'filename': data.get('filename') or 'upload',
+                  'sha256': data.get('sha256'), 'size': size, 'offset': 0, 'buffer': bytearray()}
+        with self.state.lock:
+            self.state.uploads[upload['id']] = upload
+        self.send_json(201, self.upload_json(upload))
+
+    def upload_status(self, upload_id: str):
+        email = self.authenticated_email()
+        if email is None:
+            return
+        upload = self.find_upload(upload_id, email)
+        if upload is not None:
+            self.send_json(200, self.upload_json(upload))
+
+    def append_upload(self, upload_id: str):
+        email = self.authenticated_email()
+        if email is None:
+            return self.read_body()
+        upload = self.find_upload(upload_id, email)
+        if upload is None:
+            return self.read_body()
+        offset = int(self.headers.get('Upload-Offset', -1))
+        length = int(self.headers.get('Content-Length') or 0)
+        drop = self.server.drop_rate and length and random.random() < self.server.drop_rate
+        chunk = self.read_body(drop_after=length // 2 if drop else None)
+        with self.state.lock:
+            if offset != upload['offset']:
+                conflict = True
+            else:
+                conflict = False
+                # Like a tus server, keep whatever arrived, even from a dropped request
+                chunk = chunk[:upload['size'] - offset]
+                upload['buffer'] += chunk
+                upload['offset'] += len(chunk)
+                if upload['offset'] == upload['size']:
+                    upload['data'] = bytes(upload.pop('buffer'))
+                    if upload['sha256'] and hashlib.sha256(upload['data']).hexdigest() != upload['sha256']:
+                        upload['offset'] = 0
+                        upload['buffer'] = bytearray()
+                        del upload['data']
+        if drop:
+            self.state.count('dropped_uploads')
+            self.close_connection = True
+            return
+        if conflict:
+            return self.send_json(409, {'error': 'Upload-Offset mismatch', 'offset': upload['offset']})
+        self.send_json(200, self.upload_json(upload))
+
+    def stats(self):
+        with self.state.lock:
+            self.send_json(200, dict(self.state.counters))
+
+    ROUTES = [
+        ('GET', r'/health', health),
+        ('GET', r'/_stats', stats),
+        ('POST', r'/api/auth/login', login),
+        ('GET', r'/api/assignments', list_assignments),
+        ('POST', r'/api/submissions', create_submission),
+        ('GET', r'/api/submissions/my', my_submissions),
+        ('GET', r'/api/submissions/by-assignment/([^/]+)', submissions_by_assignment),
+        ('GET', r'/api/submissions/attachments/([^/]+)/download', download_attachment),
+        ('HEAD', r'/api/submissions/attachments/([^/]+)/download', download_attachment),
+        ('GET', r'/api/submissions/([^/]+)/manifest', submission_manifest),
+        ('GET', r'/api/submissions/([^/]+)', get_submission),
+        ('POST', r'/api/uploads', create_upload),
+        ('GET', r'/api/uploads/([^/]+)', upload_status),
+        ('PATCH', r'/api/uploads/([^/]+)', append_upload),
+    ]
+
+
+class StandInServer(http.server.ThreadingHTTPServer):
+    """Threaded HTTP server holding the stand-in state and fault settings."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple, state: StandInState, latency: float = 0.0,
+                 error_rate: float = 0.0, drop_rate: float = 0.0, retry_after: int = 0,
+                 resumable: bool = True, max_file_size: int = MAX_FILE_SIZE,
+                 verbose: bool = False):
+        super().__init__(address, StandInHandler)
+        self.state = state
+        self.latency = latency
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.retry_after = retry_after
+        self.resumable = resumable
+        self.max_file_size = max_file_size
+        self.verbose = verbose
+        self.started = time.time()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+
+def start_server(port: int = 0, **options: Any) -> StandInServer:
+    """
+    Run a stand-in server on a background thread.
+
+    Args:
+        port: Port on 127.0.0.1 (0 picks a free one; see server.url)
+        **options: password, storage, discard, staff and the StandInServer settings
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    state = StandInState(options.pop('password', 'password'), options.pop('storage', None),
+                         discard=options.pop('discard', False), staff=options.pop('staff', None))
+    server = StandInServer(('127.0.0.1', port), state, **options)
+    threading.Thread(target=server.serve_forever, name='standin-server', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stand-in AI+ Bootcamp API server for testing submit.py')
+    parser.add_argument('--port', type=int, default=3001, help='Port to listen on (default: 3001)')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind (default: 127.0.0.1)')
+    parser.add_argument('--password', default='password', help='Password accepted for every email')
+    parser.add_argument('--staff', action='append', default=[], metavar='EMAIL',
+                        help='Email that logs in as a TA and may download all submissions (repeatable)')
+    parser.add_argument('--storage', type=Path, help='Directory to save uploaded files in')
+    parser.add_argument('--discard', action='store_true',
+                        help="Don't keep the contents of uploaded files (for load tests)")
+    parser.add_argument('--max-file-size', type=int, default=MAX_FILE_SIZE // (1024 * 1024),
+                        metavar='MB', help='Largest accepted file in MB (default: %(default)s)')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Mean added latency per request in seconds (exponentially distributed)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with 503 Service Unavailable')
+    parser.add_argument('--retry-after', type=int, default=0,
+                        help='Retry-After seconds sent with injected 503 errors')
+    parser.add_argument('--drop-rate', type=float, default=0.0,
+                        help='Fraction of uploads and downloads whose connection is dropped halfway through')
+    parser.add_argument('--no-resumable', action='store_true',
+                        help='Answer 404 to resumable upload requests, like the real backend')
+    parser.add_argument('--seed', type=int, help='Random seed for fault injection')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    if args.storage:
+        args.storage.mkdir(parents=True, exist_ok=True)
+
+    state = StandInState(args.password, args.storage, discard=args.discard, staff=args.staff)
+    server = StandInServer((args.host, args.port), state, latency=args.latency,
+                           error_rate=args.error_rate, drop_rate=args.drop_rate,
+                           retry_after=args.retry_after, resumable=not args.no_resumable,
+                           max_file_size=args.max_file_size * 1024 * 1024, verbose=args.verbose)
+    print(f'Stand-in server listening on {server.url} (password: {args.password!r})')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()